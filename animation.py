@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+from collections import deque
+
+DEFAULT_FPS = 60
+
+# Finished animations kept for stats()
+HISTORY_SIZE = 50
+
+# Set to print animation frame statistics when the widget quits
+REPORT_ENV_VAR = "DESKTOP_WIDGET_ANIMATION_REPORT"
+
+def linear(t):
+    return t
+
+def ease_in_out_cubic(t):
+    return 4 * t ** 3 if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+EASINGS = {
+    "linear": linear,
+    "ease_in_out": ease_in_out_cubic,
+    "ease_out": ease_out_cubic,
+}
+
+class Animation:
+    """One animation: a callback fed eased progress from 0 to 1 over a duration."""
+    def __init__(self, name, duration_ms, on_frame, on_done=None, easing="ease_in_out", started=0.0):
+        self.name = name
+        self.duration_ms = duration_ms
+        self.on_frame = on_frame  # on_frame(eased progress)
+        self.on_done = on_done
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.started = started
+        self.finished = False
+
+        # Counters
+        self.frames = 0
+        self.dropped_frames = 0
+        self.worst_frame_ms = 0.0
+        self._last_frame = started
+
+    def progress(self, now):
+        """Get the linear progress from 0 to 1 at a clock time."""
+        if self.duration_ms <= 0:
+            return 1.0
+        return min(1.0, (now - self.started) * 1000 / self.duration_ms)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "worst_frame_ms": round(self.worst_frame_ms, 1),
+        }
+
+
+class AnimationEngine:
+    """Runs animations on one frame clock at a target frame rate.
+
+    Progress comes from elapsed time rather than a frame count, so when
+    the event loop is busy an animation skips ahead (counting the frames
+    it dropped) instead of stretching out. All running animations share
+    one timer and get their frame callbacks back to back, and starting an
+    animation under a running one's name replaces it.
+    """
+    def __init__(self, schedule, cancel, fps=DEFAULT_FPS, clock=time.perf_counter):
+        self.schedule = schedule  # schedule(delay_ms, callback) -> token, e.g. Tk.after
+        self.cancel = cancel  # cancel(token), e.g. Tk.after_cancel
+        self.frame_ms = 1000 / fps
+        self.clock = clock
+        self.running = {}  # name -> Animation
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._job = None
+
+    def start(self, name, duration_ms, on_frame, on_done=None, easing="ease_in_out"):
+        """Start an animation; its first frame is drawn right away."""
+        self.running.pop(name, None)
+        animation = Animation(name, duration_ms, on_frame, on_done, easing, self.clock())
+        self.running[name] = animation
+        self._draw(animation, animation.started)
+        self._arm()
+        return animation
+
+    def stop(self, name, finish=False):
+        """Stop an animation, optionally jumping to its last frame first."""
+        animation = self.running.pop(name, None)
+        if animation is not None and finish:
+            animation.on_frame(1.0)
+            self._finish(animation)
+        if not self.running:
+            self._cancel()
+
+    def is_running(self, name):
+        return name in self.running
+
+    def _arm(self):
+        if self._job is None and self.running:
+            self._job = self.schedule(int(self.frame_ms), self._tick)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        now = self.clock()
+        for animation in list(self.running.values()):
+            if self.running.get(animation.name) is animation:
+                self._draw(animation, now)
+        self._arm()
+
+    def _draw(self, animation, now):
+        gap_ms = (now - animation._last_frame) * 1000
+        if animation.frames:
+            animation.worst_frame_ms = max(animation.worst_frame_ms, gap_ms)
+            animation.dropped_frames += max(0, round(gap_ms / self.frame_ms) - 1)
+        animation._last_frame = now
+        animation.frames += 1
+
+        progress = animation.progress(now)
+        animation.on_frame(animation.easing(progress))
+        if progress >= 1.0 and self.running.get(animation.name) is animation:
+            del self.running[animation.name]
+            self._finish(animation)
+
+    def _finish(self, animation):
+        animation.finished = True
+        self.history.append(animation.stats())
+        if animation.on_done:
+            animation.on_done()
+
+    def stats(self):
+        """Get the frame statistics of recently finished animations, oldest first."""
+        return list(self.history)
+
+    def print_report(self, force=False):
+        """Print the frame statistics if they were asked for."""
+        if force or os.environ.get(REPORT_ENV_VAR):
+            for stats in self.history:
+                print(f"animation {stats['name']}: {stats['frames']} frames in {stats['duration_ms']} ms, "
+                      f"{stats['dropped_frames']} dropped, worst frame {stats['worst_frame_ms']} ms",
+                      file=sys.stderr)
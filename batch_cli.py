@@ -0,0 +1,402 @@
+import argparse
+import io
+import json
+import shlex
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from storage import get_storage, new_id
+from record_index import RecordIndex
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1  # An operation failed, e.g. an unknown todo
+EXIT_USAGE = 2  # A command could not be parsed
+
+class CommandError(Exception):
+    """An operation that cannot be applied."""
+    def __init__(self, message, exit_code=EXIT_FAILED):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+class _Parser(argparse.ArgumentParser):
+    """Raises CommandError instead of exiting, so batch lines can be reported."""
+    def error(self, message):
+        raise CommandError(f"{self.prog}: {message}", EXIT_USAGE)
+
+    def exit(self, status=0, message=None):
+        # Reached after --help has been printed
+        raise CommandError((message or "").strip(), status)
+
+
+class Session:
+    """Todos and URL groups loaded once, changed in memory and committed once."""
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self._todos = None
+        self._urls = None
+        self._changed = {"todos": {}, "urls": {}}
+        self._deleted = {"todos": {}, "urls": {}}
+        self._full_save = set()
+        self.to_open = []  # (result, URL group) opened once the session is committed
+
+    @property
+    def todos(self):
+        """Get the todos, by id and in order."""
+        if self._todos is None:
+            self._todos = RecordIndex()
+            if self._todos.load(self.storage.load_todos()):
+                self._full_save.add("todos")
+        return self._todos
+
+    @property
+    def urls(self):
+        """Get the URL groups, by id and in order."""
+        if self._urls is None:
+            from url_index import canonicalize_groups
+            self._urls = RecordIndex()
+            if self._urls.load(self.storage.load_urls()):
+                self._full_save.add("urls")
+            for group in canonicalize_groups(self._urls):
+                self.mark_changed("urls", group)
+        return self._urls
+
+    def mark_changed(self, collection, record):
+        """Remember a record to write on commit."""
+        self._changed[collection][record["id"]] = record
+
+    def mark_deleted(self, collection, record):
+        """Remember a record to delete on commit."""
+        self._changed[collection].pop(record["id"], None)
+        self._deleted[collection][record["id"]] = record
+
+    @property
+    def dirty(self):
+        return bool(self._full_save or any(self._changed.values()) or any(self._deleted.values()))
+
+    def commit(self):
+        """Write every change made in this session."""
+        writers = {
+            "todos": (self.storage.save_todos, self.storage.commit_todos, self._todos),
+            "urls": (self.storage.save_urls, self.storage.commit_urls, self._urls),
+        }
+        for collection, (save, commit, index) in writers.items():
+            if index is None:
+                continue
+            records = index.records
+            changed = list(self._changed[collection].values())
+            deleted = list(self._deleted[collection].values())
+            if collection in self._full_save:
+                save(records)
+            elif changed or deleted:
+                commit(records, changed=changed, deleted=deleted)
+        self._changed = {"todos": {}, "urls": {}}
+        self._deleted = {"todos": {}, "urls": {}}
+        self._full_save = set()
+
+    def open_url_groups(self):
+        """Open the URL groups asked for in this session and wait until they are done."""
+        if not self.to_open:
+            return
+        from url_launcher import get_url_launcher
+        launcher = get_url_launcher()
+        for result, group in self.to_open:
+            result["job"] = launcher.launch(group.get("urls", []), group.get("name"))
+        for result, _ in self.to_open:
+            launcher.wait(result["job"])
+        self.to_open = []
+
+
+def find_record(index, ref, kind):
+    """Find a record by id, by its 1-based position, or (for URL groups) by name."""
+    record = index.get(ref)
+    if record is not None:
+        return record
+    if ref.isdigit() and 1 <= int(ref) <= len(index):
+        return index.records[int(ref) - 1]
+    if kind == "URL group":
+        for record in index:
+            if record.get("name") == ref:
+                return record
+    raise CommandError(f"No {kind} {ref!r}")
+
+def parse_datetime(text):
+    """Parse a reminder given as an ISO date and time."""
+    try:
+        return datetime.fromisoformat(text).isoformat()
+    except ValueError:
+        raise CommandError(f"Invalid date and time: {text!r} (expected YYYY-MM-DD HH:MM)")
+
+def todo_text(todo):
+    """Get the text of a todo added by the CLI, the widget or the todo manager."""
+    return todo.get("text") or todo.get("title", "")
+
+def todo_view(todo, index):
+    """Get the fields of a todo shown by ls."""
+    view = {"index": index, "id": todo["id"], "text": todo_text(todo), "completed": todo.get("completed", False)}
+    for key in ("due_date", "reminder"):
+        if todo.get(key):
+            view[key] = todo[key]
+    return view
+
+# Commands: each takes the session and parsed arguments and returns a result dict
+
+def todo_add(session, args):
+    todo = {
+        "id": new_id(),
+        "text": args.text,
+        "completed": False,
+        "created": datetime.now().isoformat()
+    }
+    if args.due:
+        todo["due_date"] = args.due
+    if args.reminder:
+        todo["reminder"] = parse_datetime(args.reminder)
+    session.todos.add(todo)
+    session.mark_changed("todos", todo)
+    return {"id": todo["id"]}
+
+def todo_done(session, args):
+    todos = [find_record(session.todos, ref, "todo") for ref in args.todos]
+    for todo in todos:
+        todo["completed"] = not args.undo
+        session.mark_changed("todos", todo)
+    return {"ids": [todo["id"] for todo in todos]}
+
+def todo_rm(session, args):
+    # Resolve every reference before removing, so positions refer to the same list
+    todos = [find_record(session.todos, ref, "todo") for ref in args.todos]
+    for todo in todos:
+        session.todos.remove(todo["id"])
+        session.mark_deleted("todos", todo)
+    return {"ids": [todo["id"] for todo in todos]}
+
+def todo_ls(session, args):
+    todos = []
+    for index, todo in enumerate(session.todos, start=1):
+        completed = todo.get("completed", False)
+        if (args.open and completed) or (args.done and not completed):
+            continue
+        todos.append(todo_view(todo, index))
+    return {"todos": todos}
+
+def url_add(session, args):
+    from url_index import canonicalize_urls
+    urls, invalid, _ = canonicalize_urls(args.urls)
+    if invalid:
+        raise CommandError(f"Invalid URLs: {', '.join(invalid)}")
+    if not urls:
+        raise CommandError("A URL group needs at least one URL")
+    group = {"id": new_id(), "name": args.name, "urls": urls}
+    session.urls.add(group)
+    session.mark_changed("urls", group)
+    return {"id": group["id"], "urls": urls}
+
+def url_rm(session, args):
+    group = find_record(session.urls, args.group, "URL group")
+    session.urls.remove(group["id"])
+    session.mark_deleted("urls", group)
+    return {"id": group["id"]}
+
+def url_ls(session, args):
+    return {"groups": [
+        {"index": index, "id": group["id"], "name": group.get("name", ""), "urls": group.get("urls", [])}
+        for index, group in enumerate(session.urls, start=1)
+    ]}
+
+def url_open(session, args):
+    group = find_record(session.urls, args.group, "URL group")
+    result = {"id": group["id"], "urls": len(group.get("urls", []))}
+    session.to_open.append((result, group))
+    return result
+
+def transfer(session, args):
+    """Import or export a whole collection, streaming it to or from a file."""
+    from import_export import import_records, export_records
+    collection = "todos" if args.area == "todo" else "urls"
+    action = import_records if args.command == "import" else export_records
+    try:
+        result = action(args.file, collection, storage=session.storage, fmt=args.format)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    return {"summary": result.summary(), **result.as_dict()}
+
+def add_transfer_commands(commands, output, kind):
+    """Add the import and export commands of a collection."""
+    for name, help_text in (("import", f"add {kind} from a file"), ("export", f"write all {kind} to a file")):
+        command = commands.add_parser(name, help=help_text, parents=[output])
+        command.add_argument("file", help="NDJSON (.ndjson, .jsonl) or CSV (.csv) file, or - for stdin/stdout")
+        command.add_argument("--format", choices=["ndjson", "csv"], help="file format when the extension does not tell")
+        command.set_defaults(handler=transfer, streaming=True)
+
+def build_parser():
+    """Build the parser for one command line."""
+    parser = _Parser(prog="main.py", description="Manage todos and URL groups without the widget.")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per operation")
+    # Also accepted after the command, e.g. main.py todo ls --json
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    parser.add_argument("--batch", metavar="FILE", nargs="?", const="-",
+                        help="read one command per line from FILE (default: stdin) and commit them all at once")
+    areas = parser.add_subparsers(dest="area")
+
+    todo = areas.add_parser("todo", help="manage todos").add_subparsers(dest="command", required=True)
+    add = todo.add_parser("add", help="add a todo", parents=[output])
+    add.add_argument("text")
+    add.add_argument("--due", help="due date, e.g. 2030-01-31")
+    add.add_argument("--reminder", help="reminder time, e.g. '2030-01-31 09:00'")
+    add.set_defaults(handler=todo_add)
+    done = todo.add_parser("done", help="mark todos as completed", parents=[output])
+    done.add_argument("todos", nargs="+", metavar="TODO", help="id or number shown by ls")
+    done.add_argument("--undo", action="store_true", help="mark them as not completed")
+    done.set_defaults(handler=todo_done)
+    rm = todo.add_parser("rm", help="delete todos", parents=[output])
+    rm.add_argument("todos", nargs="+", metavar="TODO", help="id or number shown by ls")
+    rm.set_defaults(handler=todo_rm)
+    ls = todo.add_parser("ls", help="list todos", parents=[output])
+    status = ls.add_mutually_exclusive_group()
+    status.add_argument("--open", action="store_true", help="only open todos")
+    status.add_argument("--done", action="store_true", help="only completed todos")
+    ls.set_defaults(handler=todo_ls)
+    add_transfer_commands(todo, output, "todos")
+
+    url = areas.add_parser("url", help="manage URL groups").add_subparsers(dest="command", required=True)
+    add = url.add_parser("add", help="add a URL group", parents=[output])
+    add.add_argument("name")
+    add.add_argument("urls", nargs="+", metavar="URL")
+    add.set_defaults(handler=url_add)
+    rm = url.add_parser("rm", help="delete a URL group", parents=[output])
+    rm.add_argument("group", help="id, name or number shown by ls")
+    rm.set_defaults(handler=url_rm)
+    ls = url.add_parser("ls", help="list URL groups", parents=[output])
+    ls.set_defaults(handler=url_ls)
+    open_group = url.add_parser("open", help="open the URLs of a group", parents=[output])
+    open_group.add_argument("group", help="id, name or number shown by ls")
+    open_group.set_defaults(handler=url_open)
+    add_transfer_commands(url, output, "URL groups")
+    return parser
+
+def format_result(label, result):
+    """Format a result for people reading the terminal."""
+    if "todos" in result:
+        lines = []
+        for todo in result["todos"]:
+            line = f"{todo['index']}. {'[x]' if todo['completed'] else '[ ]'} {todo['text']}"
+            if todo.get("due_date"):
+                line += f" (due {todo['due_date']})"
+            if todo.get("reminder"):
+                line += f" (reminder {todo['reminder']})"
+            lines.append(line)
+        return "\n".join(lines) or "No todos."
+    if "groups" in result:
+        lines = [f"{group['index']}. {group['name']} ({len(group['urls'])} URLs)" for group in result["groups"]]
+        return "\n".join(lines) or "No URL groups."
+    if "summary" in result:
+        lines = [result["summary"]] + [f"  line {e['line']}: {e['error']}" for e in result["errors"]]
+        return "\n".join(lines)
+    if "ids" in result:
+        return f"{label}: {', '.join(result['ids'])}"
+    return f"{label}: {result['id']}"
+
+def read_batch(name):
+    """Yield (line number, arguments) for each command in a batch file."""
+    stream = sys.stdin if name == "-" else open(name, encoding="utf-8")
+    try:
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield number, shlex.split(line)
+            except ValueError as e:
+                raise CommandError(f"line {number}: {e}", EXIT_USAGE)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def parse_batch_line(parser, line_args):
+    """Parse the arguments of one batch line; asking for help fails the line."""
+    try:
+        with redirect_stdout(io.StringIO()):
+            return parser.parse_args(line_args)
+    except CommandError as e:
+        if e.exit_code == EXIT_OK:
+            raise CommandError("--help cannot be used in --batch", EXIT_USAGE)
+        raise
+
+def run_command(argv, storage=None, out=None):
+    """Run main.py with arguments and return the exit code.
+
+    A single command, or all commands of a batch, are applied in memory
+    and committed with one write per collection. A batch is only
+    committed if every command in it succeeds.
+    """
+    out = out or sys.stdout
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except CommandError as e:
+        if str(e):
+            print(e, file=sys.stderr)
+        return e.exit_code
+
+    if args.batch is None and args.area is None:
+        parser.print_usage(sys.stderr)
+        return EXIT_USAGE
+
+    session = Session(storage)
+    results = []  # (label, result)
+
+    def apply(label, command):
+        if command.batch is not None or command.area is None:
+            raise CommandError("expected a todo or url command", EXIT_USAGE)
+        if args.batch is not None and getattr(command, "streaming", False):
+            raise CommandError(f"{command.command} cannot be used in --batch", EXIT_USAGE)
+        results.append((label, command.handler(session, command)))
+
+    label = None
+    try:
+        if args.batch is None:
+            label = f"{args.area} {args.command}"
+            apply(label, args)
+        elif args.area is not None:
+            raise CommandError("--batch cannot be combined with a command", EXIT_USAGE)
+        else:
+            for number, line_args in read_batch(args.batch):
+                label = f"line {number}"
+                apply(label, parse_batch_line(parser, line_args))
+    except CommandError as e:
+        message = f"{label}: {e}" if label else str(e)
+        if args.json:
+            print(json.dumps({"ok": False, "error": message, "committed": False}), file=out)
+        else:
+            print(f"Error: {message}; nothing was saved", file=sys.stderr)
+        return e.exit_code
+    except OSError as e:
+        print(f"Error reading batch: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    if session.dirty:
+        session.commit()
+
+    # Nothing is opened unless the whole batch was applied
+    session.open_url_groups()
+    exit_code = EXIT_OK
+    for label, result in results:
+        job = result.pop("job", None)
+        if job is not None:
+            result["opened"] = job.opened
+            result["failures"] = [{"url": url, "error": error} for url, error in job.failures]
+            if job.failures:
+                exit_code = EXIT_FAILED
+
+        if args.json:
+            print(json.dumps({"command": label, "ok": True, **result}), file=out)
+        elif job is not None:
+            print(job.summary(), file=out)
+        elif args.batch is None or "todos" in result or "groups" in result:
+            print(format_result(label, result), file=out)
+    if args.batch is not None and not args.json:
+        print(f"Applied {len(results)} commands.", file=out)
+    return exit_code
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import time
+from reconcile import diff, record_signature
+
+SIZES = [100, 1000, 10000]
+REPEATS = 20
+
+def make_todos(count):
+    """Create a list of sample todos."""
+    return [{"id": str(i), "text": f"Todo {i}", "completed": False} for i in range(count)]
+
+def time_ms(func):
+    """Return the average run time of func in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) * 1000 / REPEATS
+
+def bench_diff(count):
+    """Time diffing a list after one todo was toggled."""
+    todos = make_todos(count)
+    old = [(todo["id"], record_signature(todo)) for todo in todos]
+    todos[count // 2]["completed"] = True
+    new = [(todo["id"], record_signature(todo)) for todo in todos]
+    return time_ms(lambda: diff(old, new))
+
+def bench_todo_manager(root, count):
+    """Time refreshing the todo manager after one todo was toggled."""
+    from todo_manager_tk import TodoManager
+    from due_index import DueIndex
+    from record_index import RecordIndex
+
+    manager = TodoManager.__new__(TodoManager)
+    manager.todo_index = RecordIndex(make_todos(count))
+    manager.todo_rows = {}
+    manager.rendered_keys = []
+    manager.rendered_signatures = {}
+    manager.due_index = DueIndex(manager.todos)
+    manager._tooltip = None
+    manager.scrollable_frame = __import__("tkinter").Frame(root)
+    manager.refresh_todos()
+
+    todo = manager.todos[count // 2]
+    def toggle():
+        todo["completed"] = not todo["completed"]
+        manager.refresh_todos(changed=[todo])
+        root.update_idletasks()
+
+    elapsed = time_ms(toggle)
+    manager.scrollable_frame.destroy()
+    return elapsed
+
+def main():
+    print("=== REFRESH BENCHMARK (one toggled todo) ===")
+    for count in SIZES:
+        print(f"diff, {count:>6} todos: {bench_diff(count):8.3f} ms")
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Skipping widget benchmark: {e}")
+        return
+
+    root.withdraw()
+    for count in SIZES[:2]:
+        print(f"TodoManager, {count:>6} todos: {bench_todo_manager(root, count):8.3f} ms")
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,122 @@
 import tkinter as tk
 import calendar
 import datetime
-from PIL import Image, ImageTk
+from day_aggregates import DayAggregates
+
+# Months cached on each side of the one being shown
+CACHE_RADIUS = 3
+
+def shift_month(year, month, offset):
+    """Get the (year, month) offset months away."""
+    index = year * 12 + month - 1 + offset
+    return index // 12, index % 12 + 1
+
+class TodoBuckets:
+    """Todos bucketed by due date, kept in step with a DayAggregates as todos change."""
+    def __init__(self, aggregates):
+        self.aggregates = aggregates  # Parses the due dates
+        self.by_date = {}  # date -> {todo key: todo}
+        self.dates = {}  # todo key -> date
+
+    def load(self, todos):
+        """Parse every todo's due date and bucket the todos by it."""
+        self.aggregates.load(todos)
+        self.by_date = {}
+        self.dates = {}
+        for todo in todos:
+            self._add(todo)
+
+    def _add(self, todo):
+        date = self.aggregates.date_of(todo)
+        if date is None:
+            return None
+        key = self.aggregates.todo_key(todo)
+        self.by_date.setdefault(date, {})[key] = todo
+        self.dates[key] = date
+        return date
+
+    def _remove(self, todo):
+        key = self.aggregates.todo_key(todo)
+        date = self.dates.pop(key, None)
+        if date is not None:
+            bucket = self.by_date[date]
+            del bucket[key]
+            if not bucket:
+                del self.by_date[date]
+        return date
+
+    def update(self, todo):
+        """Re-bucket a todo that was added or edited; returns its (old, new) due dates."""
+        old = self._remove(todo)
+        self.aggregates.update(todo)
+        return old, self._add(todo)
+
+    def remove(self, todo):
+        """Drop a deleted todo; returns the date it was due on."""
+        date = self._remove(todo)
+        self.aggregates.remove(todo)
+        return date
+
+    def todos_on(self, date):
+        """Get the todos due on a date."""
+        bucket = self.by_date.get(date)
+        return list(bucket.values()) if bucket else []
+
+class MonthLayoutCache:
+    """Day cell layouts of the months around the shown one.
+
+    Layouts are built on first use. prefetch() builds the CACHE_RADIUS
+    months on each side of the shown month and drops the rest, so paging
+    to a neighbouring month only applies cached cells. Every layout is
+    dropped when the day changes, since the today marker moves, and a
+    month's layout when a todo due in it changes.
+    """
+    def __init__(self, build, radius=CACHE_RADIUS, today=datetime.date.today):
+        self.build = build  # build(year, month, today) -> cells
+        self.radius = radius
+        self.today = today
+        self.layouts = {}  # (year, month) -> cells
+        self.layout_day = today()
+
+        # Counters
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, year, month):
+        """Get the cells of a month, building them if they are not cached."""
+        today = self.today()
+        if today != self.layout_day:
+            self.layout_day = today
+            self.layouts.clear()
+
+        cells = self.layouts.get((year, month))
+        if cells is None:
+            cells = self.layouts[(year, month)] = self.build(year, month, today)
+            self.builds += 1
+        else:
+            self.hits += 1
+        return cells
+
+    def prefetch(self, year, month):
+        """Build the months around a month and drop those further away."""
+        window = {shift_month(year, month, offset) for offset in range(-self.radius, self.radius + 1)}
+        for key in list(self.layouts):
+            if key not in window:
+                del self.layouts[key]
+        for key in window:
+            if key not in self.layouts:
+                self.get(*key)
+
+    def invalidate(self, date):
+        """Forget the cached layout of the month a date falls in."""
+        if date is not None:
+            self.layouts.pop((date.year, date.month), None)
+
+    def clear(self):
+        self.layouts.clear()
+
+    def stats(self):
+        return {"cached_months": len(self.layouts), "hits": self.hits, "builds": self.builds}
 
 class ModernCalendarView(tk.Frame):
     """A modern calendar widget with todo item integration."""
@@ -11,6 +126,18 @@ class ModernCalendarView(tk.Frame):
         self.todos = todos if todos else []
         self.callback = callback  # Called when a day with todos is clicked
         
+        # Per-day open/completed/overdue counts, shared with the year view
+        self.aggregates = DayAggregates()
+        
+        # Todos bucketed by due date
+        self.buckets = TodoBuckets(self.aggregates)
+        self.index_todos()
+        
+        # Day cell states per (year, month), and the states currently shown
+        self.month_layouts = MonthLayoutCache(self.build_month_layout)
+        self.applied_cells = []
+        self.prefetch_job = None
+        
         super().__init__(
             parent,
             bg=theme.card_bg,
@@ -29,6 +156,15 @@ class ModernCalendarView(tk.Frame):
         
         # Create todo preview
         self.create_todo_preview()
+        theme.register(self)
+    
+    def apply_theme(self):
+        """Rebuild the day cells in the current theme colors."""
+        self.month_layouts.clear()
+        self.applied_cells = [None] * len(self.day_buttons)
+        self.render_calendar()
+        if self.year_view is not None:
+            self.year_view.apply_theme()
     
     def create_widgets(self):
         """Create the calendar widgets."""
@@ -58,6 +194,8 @@ class ModernCalendarView(tk.Frame):
             font=self.theme.get_font(self.theme.large_text_size, bold=True)
         )
         self.month_year_label.pack(side=tk.LEFT)
+        self.month_year_label.bind("<Button-1>", self.show_year_view)
+        self.year_view = None
         
         # Navigation buttons
         self.prev_btn = tk.Label(
@@ -107,6 +245,8 @@ class ModernCalendarView(tk.Frame):
         self.calendar_frame.place(relx=0.05, rely=0.2, relwidth=0.9, relheight=0.5)
         
         # Create day buttons
+        self.day_font = self.theme.get_font(self.theme.normal_text_size)
+        self.bold_day_font = self.theme.get_font(self.theme.normal_text_size, bold=True)
         self.day_buttons = []
         for row in range(6):
             for col in range(7):
@@ -124,12 +264,13 @@ class ModernCalendarView(tk.Frame):
                     text="",
                     bg=self.theme.card_bg,
                     fg=self.theme.text_color,
-                    font=self.theme.get_font(self.theme.normal_text_size)
+                    font=self.day_font
                 )
                 day_button.place(relx=0.5, rely=0.5, anchor="center")
                 day_button.bind("<Button-1>", lambda e, r=row, c=col: self.day_clicked(r, c))
                 
                 self.day_buttons.append(day_button)
+                self.applied_cells.append(None)
     
     def create_todo_preview(self):
         """Create a preview of todos for the selected date."""
@@ -161,105 +302,119 @@ class ModernCalendarView(tk.Frame):
         self.selected_date_label.config(text="")
     
     def render_calendar(self):
-        """Render the calendar for the current month/year."""
+        """Render the calendar for the current month/year from the month cache."""
         # Update the month/year label
         month_name = self.current_date.strftime("%B %Y")
         self.month_year_label.config(text=month_name)
         
-        # Get calendar for current month
-        cal = calendar.monthcalendar(self.current_date.year, self.current_date.month)
-        
-        # Clear all day buttons
-        for button in self.day_buttons:
-            button.config(text="", fg=self.theme.text_color, bg=self.theme.card_bg)
+        # Only reconfigure the day labels whose state changed
+        cells = self.get_month_layout(self.current_date.year, self.current_date.month)
+        for index, cell in enumerate(cells):
+            if cell != self.applied_cells[index]:
+                text, bg, fg, bold = cell
+                self.day_buttons[index].config(
+                    text=text, bg=bg, fg=fg,
+                    font=self.bold_day_font if bold else self.day_font
+                )
+                self.applied_cells[index] = cell
         
-        # Fill in the days
-        day_index = 0
-        for week in cal:
+        # Build the neighbouring months once the UI is idle
+        if self.prefetch_job is None:
+            self.prefetch_job = self.after_idle(self.prefetch_months)
+    
+    def get_month_layout(self, year, month):
+        """Get the (text, bg, fg, bold) state of all 42 day cells of a month."""
+        return self.month_layouts.get(year, month)
+    
+    def build_month_layout(self, year, month, today):
+        """Compute the day cell states of a month."""
+        empty = ("", self.theme.card_bg, self.theme.text_color, False)
+        cells = []
+        for week in calendar.monthcalendar(year, month):
             for day in week:
                 if day == 0:
-                    # Empty cell
-                    self.day_buttons[day_index].config(text="")
-                else:
-                    # Day cell
-                    self.day_buttons[day_index].config(text=str(day))
-                    
+                    cells.append(empty)
+                    continue
+                
+                date = datetime.date(year, month, day)
+                if date == today:
                     # Highlight current day
-                    if (day == self.current_date.day and 
-                        datetime.date.today().month == self.current_date.month and 
-                        datetime.date.today().year == self.current_date.year):
-                        
-                        self.day_buttons[day_index].config(
-                            bg=self.theme.accent_color,
-                            fg=self.theme.text_color
-                        )
-                    
+                    cells.append((str(day), self.theme.accent_color, self.theme.text_color, False))
+                elif self.aggregates.total(date):
                     # Highlight days with todos
-                    elif self.has_todos_on_date(day):
-                        self.day_buttons[day_index].config(
-                            fg=self.theme.accent_color,
-                            font=self.theme.get_font(self.theme.normal_text_size, bold=True)
-                        )
-                
-                day_index += 1
+                    cells.append((str(day), self.theme.card_bg, self.theme.accent_color, True))
+                else:
+                    cells.append((str(day), self.theme.card_bg, self.theme.text_color, False))
+        
+        return cells + [empty] * (len(self.day_buttons) - len(cells))
+    
+    def prefetch_months(self):
+        """Build the months around the current one and drop those further away."""
+        self.prefetch_job = None
+        self.month_layouts.prefetch(self.current_date.year, self.current_date.month)
+    
+    def index_todos(self):
+        """Parse every todo's due date and bucket the todos by it."""
+        self.buckets.load(self.todos)
+    
+    def update_todo(self, todo):
+        """Re-bucket a todo that was added or edited and redraw."""
+        for date in self.buckets.update(todo):
+            self.month_layouts.invalidate(date)
+        self.render_calendar()
+        self.refresh_year_view()
+    
+    def remove_todo(self, todo):
+        """Drop a deleted todo and redraw."""
+        self.month_layouts.invalidate(self.buckets.remove(todo))
+        self.render_calendar()
+        self.refresh_year_view()
     
     def has_todos_on_date(self, day):
         """Check if there are todos for the given day."""
-        if not self.todos:
-            return False
-        
-        date_str = f"{self.current_date.month}/{day}/{self.current_date.year}"
-        
-        for todo in self.todos:
-            # Check for date formats MM/DD/YYYY
-            if 'due_date' in todo and todo['due_date']:
-                if date_str in todo['due_date']:
-                    return True
-        
-        return False
+        return self.aggregates.total(self.current_date.replace(day=day)) > 0
     
     def get_todos_for_date(self, day):
         """Get todos for the given day."""
-        if not self.todos:
-            return []
-        
-        date_str = f"{self.current_date.month}/{day}/{self.current_date.year}"
-        todos_for_date = []
-        
-        for todo in self.todos:
-            # Check for date formats MM/DD/YYYY
-            if 'due_date' in todo and todo['due_date']:
-                if date_str in todo['due_date']:
-                    todos_for_date.append(todo)
-        
-        return todos_for_date
+        return self.buckets.todos_on(self.current_date.replace(day=day))
     
     def next_month(self, event=None):
         """Go to next month."""
-        year, month = self.current_date.year, self.current_date.month
-        
-        if month == 12:
-            month = 1
-            year += 1
-        else:
-            month += 1
-        
+        year, month = shift_month(self.current_date.year, self.current_date.month, 1)
         self.current_date = self.current_date.replace(year=year, month=month, day=1)
         self.render_calendar()
     
     def previous_month(self, event=None):
         """Go to previous month."""
-        year, month = self.current_date.year, self.current_date.month
-        
-        if month == 1:
-            month = 12
-            year -= 1
-        else:
-            month -= 1
-        
+        year, month = shift_month(self.current_date.year, self.current_date.month, -1)
         self.current_date = self.current_date.replace(year=year, month=month, day=1)
         self.render_calendar()
     
+    def show_year_view(self, event=None):
+        """Show the year heatmap over the month grid."""
+        if self.year_view is None:
+            self.year_view = YearHeatmapView(
+                self.container, self.theme, self.aggregates,
+                year=self.current_date.year, callback=self.hide_year_view
+            )
+        else:
+            self.year_view.show_year(self.current_date.year)
+        self.year_view.place(relx=0, rely=0, relwidth=1, relheight=1)
+    
+    def refresh_year_view(self):
+        """Reshade the year heatmap after todos changed."""
+        if self.year_view is not None:
+            self.year_view.render()
+    
+    def hide_year_view(self, date=None):
+        """Go back to the month grid, optionally at the month of a date."""
+        if self.year_view is not None:
+            self.year_view.place_forget()
+        if date is not None:
+            self.current_date = date
+            self.render_calendar()
+            self.update_todo_preview(date)
+    
     def day_clicked(self, row, col):
         """Handle day click event."""
         day_index = row * 7 + col
@@ -347,7 +502,10 @@ class ModernCalendarView(tk.Frame):
     def set_todos(self, todos):
         """Update the todos list."""
         self.todos = todos
+        self.index_todos()
+        self.month_layouts.clear()
         self.render_calendar()
+        self.refresh_year_view()
         
         # Update preview if showing
         if self.selected_date_label['text']:
@@ -361,6 +519,133 @@ class ModernCalendarView(tk.Frame):
                 except:
                     pass
 
+
+def blend_color(color, background, amount):
+    """Mix a hex color into a background color by amount (0..1)."""
+    rgb = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    bg = [int(background[i:i + 2], 16) for i in (1, 3, 5)]
+    mixed = [round(b + (c - b) * amount) for c, b in zip(rgb, bg)]
+    return "#{:02x}{:02x}{:02x}".format(*mixed)
+
+class YearHeatmapView(tk.Frame):
+    """A year of days shaded by their number of open, completed and overdue todos."""
+    CELL_SIZE = 12
+    CELL_GAP = 2
+    LEVELS = 4  # Shades per color; days with more todos use the darkest
+    
+    def __init__(self, parent, theme, aggregates, year=None, callback=None):
+        self.theme = theme
+        self.aggregates = aggregates
+        self.year = year or datetime.date.today().year
+        self.callback = callback  # Called with the date of a clicked day
+        
+        super().__init__(parent, bg=theme.card_bg)
+        self.build_palette()
+        
+        # Header with year navigation
+        header = tk.Frame(self, bg=theme.card_bg)
+        header.pack(fill=tk.X, pady=(0, 5))
+        self.year_label = tk.Label(
+            header, text="", bg=theme.card_bg, fg=theme.text_color,
+            font=theme.get_font(theme.large_text_size, bold=True)
+        )
+        self.year_label.pack(side=tk.LEFT)
+        for text, step in ((">", 1), ("<", -1)):
+            button = tk.Label(
+                header, text=text, bg=theme.card_bg, fg=theme.secondary_text,
+                font=theme.get_font(theme.large_text_size)
+            )
+            button.pack(side=tk.RIGHT, padx=(0, 10))
+            button.bind("<Button-1>", lambda e, s=step: self.show_year(self.year + s))
+        
+        # One rectangle per week day slot, created once and recolored per year
+        pitch = self.CELL_SIZE + self.CELL_GAP
+        self.canvas = tk.Canvas(
+            self, bg=theme.card_bg, highlightthickness=0,
+            width=54 * pitch, height=7 * pitch
+        )
+        self.canvas.pack()
+        self.cells = []
+        for column in range(54):
+            for row in range(7):
+                x, y = column * pitch, row * pitch
+                self.cells.append(self.canvas.create_rectangle(
+                    x, y, x + self.CELL_SIZE, y + self.CELL_SIZE,
+                    fill=self.empty_color, width=0, state=tk.HIDDEN
+                ))
+        self.cell_colors = [None] * len(self.cells)
+        self.canvas.bind("<Button-1>", self.on_click)
+        
+        self.render()
+    
+    def build_palette(self):
+        """Compute the shades of each status in the current theme, lightest first."""
+        theme = self.theme
+        self.palette = {
+            color: [blend_color(color, theme.card_bg, (level + 1) / self.LEVELS)
+                    for level in range(self.LEVELS)]
+            for color in (theme.accent_color, theme.success_color, theme.error_color)
+        }
+        self.empty_color = theme.border_color
+    
+    def apply_theme(self):
+        """Reshade every day in the current theme colors."""
+        self.build_palette()
+        self.cell_colors = [None] * len(self.cells)
+        self.render()
+    
+    def first_cell_date(self):
+        """Get the Sunday on or before January 1st, shown in the first cell."""
+        january_first = datetime.date(self.year, 1, 1)
+        return january_first - datetime.timedelta(days=(january_first.weekday() + 1) % 7)
+    
+    def day_color(self, counts):
+        """Get the shade of a day from its (open, completed, overdue) counts."""
+        open_count, completed, overdue = counts
+        total = open_count + completed + overdue
+        if not total:
+            return self.empty_color
+        if overdue:
+            color = self.theme.error_color
+        elif open_count:
+            color = self.theme.accent_color
+        else:
+            color = self.theme.success_color
+        return self.palette[color][min(total, self.LEVELS) - 1]
+    
+    def render(self):
+        """Shade every day of the year, only touching cells whose color changed."""
+        self.year_label.config(text=str(self.year))
+        start = datetime.date(self.year, 1, 1)
+        end = datetime.date(self.year + 1, 1, 1)
+        first_index = (start - self.first_cell_date()).days
+        
+        counts = self.aggregates.range_counts(start, end)
+        colors = [None] * first_index + [self.day_color(c) for c in counts]
+        colors += [None] * (len(self.cells) - len(colors))
+        
+        for index, color in enumerate(colors):
+            if color != self.cell_colors[index]:
+                if color is None:
+                    self.canvas.itemconfig(self.cells[index], state=tk.HIDDEN)
+                else:
+                    self.canvas.itemconfig(self.cells[index], fill=color, state=tk.NORMAL)
+                self.cell_colors[index] = color
+    
+    def show_year(self, year):
+        """Show a different year."""
+        self.year = year
+        self.render()
+    
+    def on_click(self, event):
+        """Report the day under the pointer."""
+        pitch = self.CELL_SIZE + self.CELL_GAP
+        index = (event.x // pitch) * 7 + event.y // pitch
+        if 0 <= index < len(self.cells) and self.cell_colors[index] is not None:
+            date = self.first_cell_date() + datetime.timedelta(days=index)
+            if self.callback:
+                self.callback(date)
+
 # Example usage
 if __name__ == "__main__":
     from modern_widget_tk import MinimalTheme
@@ -0,0 +1,8 @@
+import pytest
+import storage
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    """Point the storage module at a temporary data directory and return it."""
+    monkeypatch.setattr(storage, "get_data_path", lambda filename: str(tmp_path / filename))
+    return tmp_path
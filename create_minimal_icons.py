@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import os
+import json
 import math
+from icon_cache import ATLAS_IMAGE, ATLAS_INDEX
 
 # Create directories if they don't exist
 os.makedirs("assets", exist_ok=True)
 
-def create_minimal_icon(size=(64, 64), icon_type="link", theme="dark"):
-    """Create a minimal icon for the widget."""
+ICON_TYPES = ["link", "todo", "edit", "close", "checkbox_empty", 
+              "checkbox_checked", "calendar", "remind", "menu"]
+THEMES = ["dark", "light"]
+
+# Pre-rendered atlas sizes: the icons drawn on 24, 30, 36 and 40 px buttons
+ATLAS_SIZES = [8, 14, 20, 24]
+
+def icon_filename(icon_type, theme):
+    """Get the file an icon is saved to."""
+    return f"assets/minimal_{icon_type}_icon_{theme}.png"
+
+def draw_minimal_icon(size=(64, 64), icon_type="link", theme="dark"):
+    """Draw a minimal icon for the widget."""
     # Define colors based on theme
     if theme == "dark":
         bg_color = (27, 30, 46, 0)  # Transparent dark navy
@@ -271,23 +284,57 @@ def create_minimal_icon(size=(64, 64), icon_type="link", theme="dark"):
             )
     
     # Apply a slight blur for smoother edges
-    img = img.filter(ImageFilter.GaussianBlur(0.5))
+    return img.filter(ImageFilter.GaussianBlur(0.5))
+
+def create_minimal_icon(size=(64, 64), icon_type="link", theme="dark"):
+    """Create a minimal icon for the widget."""
+    img = draw_minimal_icon(size, icon_type, theme)
     
     # Save high-quality icon
-    output_file = f"assets/minimal_{icon_type}_icon_{theme}.png"
+    output_file = icon_filename(icon_type, theme)
     img.save(output_file, quality=95)
     print(f"Created minimal {icon_type} icon ({theme}): {output_file}")
     return output_file
 
+def create_icon_atlas(icon_types=ICON_TYPES, themes=THEMES, sizes=ATLAS_SIZES):
+    """Render every icon at each atlas size into one image plus a JSON index.
+    
+    Each size gets its own row. The index maps an icon's file name and size
+    to its (x, y, width, height) region in the atlas.
+    """
+    icons = [(icon_type, theme) for theme in themes for icon_type in icon_types]
+    atlas = Image.new('RGBA', (len(icons) * max(sizes), sum(sizes)), (0, 0, 0, 0))
+    regions = {}
+    
+    # Draw at full size and scale down, as the widget used to at runtime
+    full_size = [draw_minimal_icon((64, 64), icon_type, theme) for icon_type, theme in icons]
+    
+    y = 0
+    for size in sizes:
+        for column, (icon_type, theme) in enumerate(icons):
+            img = full_size[column].resize((size, size), Image.LANCZOS)
+            x = column * size
+            atlas.paste(img, (x, y))
+            
+            name = os.path.basename(icon_filename(icon_type, theme))
+            regions.setdefault(name, {})[str(size)] = [x, y, size, size]
+        y += size
+    
+    atlas.save(ATLAS_IMAGE)
+    with open(ATLAS_INDEX, 'w') as f:
+        json.dump({"image": os.path.basename(ATLAS_IMAGE), "regions": regions}, f, indent=2)
+    print(f"Created icon atlas: {ATLAS_IMAGE}")
+    return ATLAS_IMAGE
+
 def main():
     """Create all minimal icons."""
     # Create all minimal icons
-    icon_types = ["link", "todo", "edit", "close", "checkbox_empty", 
-                "checkbox_checked", "calendar", "remind", "menu"]
-    
-    for theme in ["dark", "light"]:
-        for icon_type in icon_types:
+    for theme in THEMES:
+        for icon_type in ICON_TYPES:
             create_minimal_icon(size=(64, 64), icon_type=icon_type, theme=theme)
+    
+    # And the atlas the widget loads them from
+    create_icon_atlas()
             
     print("All minimal icons created successfully!")
 
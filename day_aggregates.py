@@ -0,0 +1,178 @@
+import datetime
+import time
+from array import array
+from due_index import due_text, parse_due
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; counts are then summed in plain Python
+    np = None
+
+OPEN, COMPLETED, OVERDUE = range(3)
+
+class DayAggregates:
+    """Per-day counts of open, completed and overdue todos.
+
+    Each todo's due value is parsed once into a day ordinal, due epoch and
+    completed flag, stored as one row of three typed array columns that
+    are updated in place; a removed row is filled with the last one. The
+    counts for every day are then built in one pass (a numpy bincount
+    over views of the columns when numpy is installed) and are rebuilt
+    lazily after todos change or the time moves past a due date.
+    """
+    def __init__(self, todos=(), clock=time.time):
+        self.clock = clock
+        self._counts = None  # [open, completed, overdue] per day since _first_day
+        self._first_day = 0
+        self._next_overdue = None  # Due time of the next open todo to become overdue
+        self.load(todos)
+
+    @staticmethod
+    def todo_key(todo):
+        """Get the key a todo is tracked under."""
+        return todo.get("id") or id(todo)
+
+    def load(self, todos):
+        """Re-parse every todo."""
+        self._rows = {}  # todo key -> row in the columns
+        self._keys = []  # row -> todo key
+        self._days = array("q")  # day ordinal
+        self._due = array("d")  # due epoch
+        self._completed = array("b")
+        for todo in todos:
+            self._parse(todo)
+        self._counts = None
+
+    def _parse(self, todo):
+        """Store a todo's row; returns False if it has no due date."""
+        due, _ = parse_due(due_text(todo))
+        if due is None:
+            return False
+        key = self.todo_key(todo)
+        day = datetime.date.fromtimestamp(due).toordinal()
+        completed = bool(todo.get("completed", False))
+        row = self._rows.get(key)
+        if row is None:
+            self._rows[key] = len(self._keys)
+            self._keys.append(key)
+            self._days.append(day)
+            self._due.append(due)
+            self._completed.append(completed)
+        else:
+            self._days[row] = day
+            self._due[row] = due
+            self._completed[row] = completed
+        return True
+
+    def _drop(self, key):
+        """Remove a todo's row by moving the last row into its place."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            self._days[row] = self._days[last]
+            self._due[row] = self._due[last]
+            self._completed[row] = self._completed[last]
+        self._keys.pop()
+        self._days.pop()
+        self._due.pop()
+        self._completed.pop()
+        return True
+
+    def date_of(self, todo):
+        """Get the date a todo is due on, or None."""
+        row = self._rows.get(self.todo_key(todo))
+        return datetime.date.fromordinal(self._days[row]) if row is not None else None
+
+    def update(self, todo):
+        """Re-parse a todo that was added or edited."""
+        if not self._parse(todo):
+            self._drop(self.todo_key(todo))
+        self._counts = None
+
+    def remove(self, todo):
+        """Drop a deleted todo."""
+        if self._drop(self.todo_key(todo)):
+            self._counts = None
+
+    def _stale(self):
+        if self._counts is None:
+            return True
+        # An open todo became overdue since the counts were built
+        return self._next_overdue is not None and self.clock() >= self._next_overdue
+
+    def _build(self):
+        """Aggregate the columns into per-day counts."""
+        now = self.clock()
+        if not self._keys:
+            self._counts = [[], [], []]
+            self._first_day = 0
+            self._next_overdue = None
+            return
+
+        if np is not None:
+            days = np.frombuffer(self._days, dtype=np.int64)
+            due = np.frombuffer(self._due, dtype=np.float64)
+            completed = np.frombuffer(self._completed, dtype=np.int8).astype(bool)
+
+            self._first_day = int(days.min())
+            offsets = days - self._first_day
+            span = int(offsets.max()) + 1
+            overdue = ~completed & (due < now)
+            still_open = ~completed & ~overdue
+            self._counts = [
+                np.bincount(offsets[still_open], minlength=span),
+                np.bincount(offsets[completed], minlength=span),
+                np.bincount(offsets[overdue], minlength=span),
+            ]
+            upcoming = due[still_open]
+            self._next_overdue = float(upcoming.min()) if len(upcoming) else None
+            return
+
+        self._first_day = min(self._days)
+        span = max(self._days) - self._first_day + 1
+        self._counts = [[0] * span for _ in range(3)]
+        self._next_overdue = None
+        for day, due, completed in zip(self._days, self._due, self._completed):
+            if completed:
+                status = COMPLETED
+            elif due < now:
+                status = OVERDUE
+            else:
+                status = OPEN
+                if self._next_overdue is None or due < self._next_overdue:
+                    self._next_overdue = due
+            self._counts[status][day - self._first_day] += 1
+
+    def counts(self, date):
+        """Get the (open, completed, overdue) counts of a date."""
+        if self._stale():
+            self._build()
+        offset = date.toordinal() - self._first_day
+        if offset < 0 or offset >= len(self._counts[OPEN]):
+            return (0, 0, 0)
+        return tuple(int(column[offset]) for column in self._counts)
+
+    def total(self, date):
+        """Get the number of todos due on a date."""
+        return sum(self.counts(date))
+
+    def range_counts(self, start, end):
+        """Get the (open, completed, overdue) counts of each day in [start, end)."""
+        if self._stale():
+            self._build()
+        first = start.toordinal() - self._first_day
+        last = end.toordinal() - self._first_day
+        span = len(self._counts[OPEN])
+
+        result = []
+        for offset in range(first, last):
+            if 0 <= offset < span:
+                result.append(tuple(int(column[offset]) for column in self._counts))
+            else:
+                result.append((0, 0, 0))
+        return result
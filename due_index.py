@@ -0,0 +1,148 @@
+import datetime
+from bisect import bisect_left, insort
+
+# Formats accepted in a todo's "due_date", tried in order after ISO 8601
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d"]
+TIME_FORMATS = ["%I:%M %p", "%H:%M"]
+
+DAY_SECONDS = 24 * 60 * 60
+
+def due_text(todo):
+    """Get the raw due value of a todo ("reminder" wins over "due_date")."""
+    return todo.get("reminder") or todo.get("due_date") or None
+
+def parse_due(text, today=None):
+    """Parse a due value into (epoch timestamp, time only), or (None, False).
+
+    Dates without a time are due at midnight; times without a date are
+    due today.
+    """
+    if not text:
+        return None, False
+    text = text.strip()
+
+    try:
+        return datetime.datetime.fromisoformat(text).timestamp(), False
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).timestamp(), False
+        except ValueError:
+            pass
+
+    today = today or datetime.date.today()
+    for time_format in TIME_FORMATS:
+        try:
+            time = datetime.datetime.strptime(text, time_format).time()
+        except ValueError:
+            continue
+        return datetime.datetime.combine(today, time).timestamp(), True
+    return None, False
+
+def due_timestamp(todo):
+    """Get a todo's due time as an epoch timestamp, or None."""
+    return parse_due(due_text(todo))[0]
+
+def day_bounds(day):
+    """Get the epoch timestamps of the start of a day and of the next day."""
+    start = datetime.datetime.combine(day, datetime.time())
+    return start.timestamp(), (start + datetime.timedelta(days=1)).timestamp()
+
+class DueIndex:
+    """Todos sorted by their parsed due time.
+
+    Each todo's due value is parsed once when it is loaded or changed.
+    Range queries are bisect lookups. Time-only due values mean "today",
+    so they are re-parsed (only them) once the date changes.
+    """
+    def __init__(self, todos=()):
+        self._entries = []  # Sorted (due timestamp, todo id)
+        self._due = {}  # todo id -> due timestamp
+        self._todos = {}  # todo id -> todo
+        self._time_only = set()  # ids of todos due "today"
+        self._day = datetime.date.today()
+        self.load(todos)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, todos):
+        """Rebuild the index from a todo list."""
+        self._entries = []
+        self._due = {}
+        self._todos = {}
+        self._time_only = set()
+        self._day = datetime.date.today()
+        for todo in todos:
+            entry = self._index(todo)
+            if entry is not None:
+                self._entries.append(entry)
+        self._entries.sort()
+
+    def _index(self, todo):
+        """Parse a todo's due value and record it, returning its sort entry."""
+        key = todo.get("id")
+        due, time_only = parse_due(due_text(todo), self._day)
+        if due is None:
+            return None
+        self._due[key] = due
+        self._todos[key] = todo
+        if time_only:
+            self._time_only.add(key)
+        return (due, key)
+
+    def _unindex(self, key):
+        due = self._due.pop(key, None)
+        if due is None:
+            return
+        del self._todos[key]
+        self._time_only.discard(key)
+        del self._entries[bisect_left(self._entries, (due, key))]
+
+    def update(self, todo):
+        """Re-parse a todo after it was added or edited."""
+        self._check_day()
+        self._unindex(todo.get("id"))
+        entry = self._index(todo)
+        if entry is not None:
+            insort(self._entries, entry)
+
+    def remove(self, todo):
+        """Drop a deleted todo."""
+        self._unindex(todo.get("id"))
+
+    def _check_day(self):
+        """Move time-only due values to the new day after midnight."""
+        today = datetime.date.today()
+        if today == self._day:
+            return
+        self._day = today
+        for key in list(self._time_only):
+            self.update(self._todos[key])
+
+    def due_at(self, todo):
+        """Get the parsed due timestamp of a todo, or None."""
+        self._check_day()
+        return self._due.get(todo.get("id"))
+
+    def between(self, start, end):
+        """Get the todos due in [start, end), earliest first."""
+        self._check_day()
+        low = bisect_left(self._entries, (start,))
+        high = bisect_left(self._entries, (end,))
+        return [self._todos[key] for _, key in self._entries[low:high]]
+
+    def due_within(self, seconds, now=None):
+        """Get the todos due from now until the given number of seconds ahead."""
+        now = datetime.datetime.now().timestamp() if now is None else now
+        return self.between(now, now + seconds)
+
+    def overdue(self, now=None):
+        """Get the todos whose due time has passed."""
+        now = datetime.datetime.now().timestamp() if now is None else now
+        return self.between(float("-inf"), now)
+
+    def due_on(self, day):
+        """Get the todos due on a date."""
+        return self.between(*day_bounds(day))
@@ -0,0 +1,174 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 128
+
+# Written by create_minimal_icons
+ATLAS_IMAGE = "assets/minimal_icons_atlas.png"
+ATLAS_INDEX = "assets/minimal_icons_atlas.json"
+
+class IconAtlas:
+    """All icons pre-rendered at a few sizes in one image.
+    
+    The index is read on first use and the atlas image is decoded once,
+    the first time an icon is sliced out of it. Tk decodes the PNG itself
+    where it can, so PIL is not needed to show the icons.
+    """
+    def __init__(self, index_path=ATLAS_INDEX):
+        self.index_path = index_path
+        self.image_path = None
+        self.regions = None
+        self.image = None
+        self.tk_image = None
+    
+    def _load_index(self):
+        self.regions = {}
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            self.image_path = os.path.join(os.path.dirname(self.index_path), index["image"])
+            self.regions = index["regions"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading icon atlas {self.index_path}: {e}")
+    
+    def _region(self, path, size):
+        if self.regions is None:
+            self._load_index()
+        return self.regions.get(os.path.basename(path), {}).get(str(size))
+    
+    def photo(self, path, size):
+        """Slice an icon straight into a Tk image, or None if that is not possible."""
+        region = self._region(path, size)
+        if region is None or self.tk_image is False:
+            return None
+        
+        import tkinter as tk
+        if self.tk_image is None:
+            try:
+                self.tk_image = tk.PhotoImage(file=self.image_path)
+            except tk.TclError:
+                self.tk_image = False  # No PNG support in this Tk
+                return None
+        
+        x, y, width, height = region
+        icon = tk.PhotoImage(width=width, height=height)
+        icon.tk.call(icon, "copy", self.tk_image, "-from", x, y, x + width, y + height)
+        return icon
+    
+    def crop(self, path, size):
+        """Get an icon at a pre-rendered size, or None if the atlas does not have it."""
+        region = self._region(path, size)
+        if region is None:
+            return None
+        
+        if self.image is None:
+            from PIL import Image
+            try:
+                self.image = Image.open(self.image_path).convert("RGBA")
+            except OSError as e:
+                print(f"Error loading icon atlas {self.image_path}: {e}")
+                self.regions = {}
+                return None
+        
+        x, y, width, height = region
+        return self.image.crop((x, y, x + width, y + height))
+
+_atlas = IconAtlas()
+
+def load_photo(path, size):
+    """Get an icon scaled to a square of the given size, wrapped for Tk.
+    
+    Sizes pre-rendered in the atlas are sliced out of it; anything else
+    is decoded from the icon's own file and resampled.
+    """
+    photo = _atlas.photo(path, size)
+    if photo is not None:
+        return photo
+    
+    from PIL import Image, ImageTk
+    image = _atlas.crop(path, size)
+    if image is None:
+        if not os.path.exists(path):
+            return None
+        image = Image.open(path).convert("RGBA")
+        image = image.resize((size, size), Image.LANCZOS)
+    return ImageTk.PhotoImage(image)
+
+class IconCache:
+    """An LRU cache of icon images keyed on (path, size, theme).
+
+    Each distinct icon is decoded and resampled once; every widget showing
+    it shares the same PhotoImage. Evicted images stay alive for as long
+    as a widget still holds a reference to them.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, loader=load_photo):
+        self.capacity = capacity
+        self.loader = loader  # loader(path, size) -> image, or None if missing
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, size, theme=None):
+        """Get the icon at path scaled to size, or None if it cannot be loaded."""
+        key = (path, size, theme)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        if not path:
+            return None
+        try:
+            image = self.loader(path, size)
+        except Exception as e:
+            print(f"Error loading icon {path}: {e}")
+            return None
+        if image is None:
+            return None
+
+        with self._lock:
+            self._images[key] = image
+            while len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+                self.evictions += 1
+        return image
+
+    def clear(self):
+        """Drop every cached image (e.g. after the icon files were regenerated)."""
+        with self._lock:
+            self._images.clear()
+
+    def stats(self):
+        """Return cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._images),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+_icon_cache = None
+_icon_cache_lock = threading.Lock()
+
+def get_icon_cache():
+    """Get the process-wide icon cache."""
+    global _icon_cache
+    with _icon_cache_lock:
+        if _icon_cache is None:
+            _icon_cache = IconCache()
+        return _icon_cache
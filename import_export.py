@@ -0,0 +1,240 @@
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from storage import get_storage, new_ids, batched
+from due_index import parse_due
+
+FORMATS = ("ndjson", "csv")
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+# Records validated and given ids at a time
+BATCH_SIZE = 10000
+
+# Invalid records reported by line; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# Columns of the CSV format; NDJSON records keep every field
+CSV_FIELDS = {
+    "todos": ["id", "text", "completed", "due_date", "reminder", "created"],
+    "urls": ["id", "name", "urls"],
+}
+
+TRUE_VALUES = {"true", "1", "yes", "y", "x"}
+FALSE_VALUES = {"false", "0", "no", "n", ""}
+
+class RecordError(ValueError):
+    """A record that cannot be imported."""
+
+
+class TransferResult:
+    """Counts and timing of one import or export."""
+    def __init__(self, action, collection):
+        self.action = action
+        self.collection = collection
+        self.records = 0
+        self.skipped = 0
+        self.errors = []  # (line number, message), at most MAX_REPORTED_ERRORS
+        self.seconds = 0.0
+
+    @property
+    def records_per_second(self):
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def summary(self):
+        """Describe the transfer in one line."""
+        text = (f"{self.action} {self.records} {self.collection} in {self.seconds:.2f} s "
+                f"({self.records_per_second:,.0f} records/s)")
+        if self.skipped:
+            text += f"; skipped {self.skipped} invalid records"
+        return text
+
+    def as_dict(self):
+        return {
+            "records": self.records,
+            "skipped": self.skipped,
+            "errors": [{"line": line, "error": message} for line, message in self.errors],
+            "seconds": round(self.seconds, 3),
+            "records_per_second": round(self.records_per_second, 1),
+        }
+
+
+def detect_format(path, fmt=None):
+    """Get the format of a file from its extension unless it is given."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Cannot tell the format of '{path}'; pass ndjson or csv")
+    return EXTENSIONS[extension]
+
+@contextmanager
+def open_stream(path, mode):
+    """Open a file, or stdin/stdout for "-"."""
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        yield f
+
+def parse_bool(value):
+    """Parse a completed flag from JSON or a CSV cell."""
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RecordError(f"completed must be true or false, not {value!r}")
+
+def validate_todo(record):
+    """Check a todo read from a file, normalizing the fields todos share and keeping the rest.
+
+    The widget shows a todo's "title" and the other front ends its "text",
+    so both are set from whichever the record has.
+    """
+    text = record.get("text") or record.get("title")
+    if not isinstance(text, str) or not text.strip():
+        raise RecordError("todo has no text")
+
+    # Imported todos get fresh ids; CSV rows have no key for surplus cells
+    todo = {key: value for key, value in record.items() if key not in ("id", None)}
+    todo["title"] = todo["text"] = text.strip()
+    todo["completed"] = parse_bool(record.get("completed"))
+
+    due_date = todo.pop("due_date", None)
+    if due_date:
+        if parse_due(str(due_date))[0] is None:
+            raise RecordError(f"unrecognized due date {due_date!r}")
+        todo["due_date"] = str(due_date)
+
+    reminder = todo.pop("reminder", None)
+    if reminder:
+        try:
+            todo["reminder"] = datetime.fromisoformat(str(reminder)).isoformat()
+        except ValueError:
+            raise RecordError(f"reminder is not an ISO date and time: {reminder!r}")
+
+    todo["created"] = record.get("created") or datetime.now().isoformat()
+    return todo
+
+def validate_url_group(record):
+    """Check a URL group read from a file, canonicalizing its URLs."""
+    from url_index import canonicalize_urls
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise RecordError("URL group has no name")
+    urls = record.get("urls")
+    if isinstance(urls, str):
+        urls = urls.split()  # CSV cells hold space-separated URLs
+    if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        raise RecordError("urls must be a list of strings")
+    urls, invalid, _ = canonicalize_urls(urls)
+    if invalid:
+        raise RecordError(f"invalid URLs: {', '.join(invalid)}")
+    if not urls:
+        raise RecordError("URL group has no URLs")
+    return {"name": name.strip(), "urls": urls}
+
+VALIDATORS = {"todos": validate_todo, "urls": validate_url_group}
+
+def read_records(stream, fmt):
+    """Yield (line number, record) from an NDJSON or CSV stream; bad lines yield the error."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, RecordError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield number, RecordError("expected a JSON object")
+            continue
+        yield number, record
+
+def import_records(path, collection, storage=None, fmt=None):
+    """Stream records from a file into storage and return a TransferResult.
+
+    Records are validated as they are read; invalid ones are skipped and
+    reported. Valid ones are given fresh ids a batch at a time and handed
+    to the backend as a stream, so memory use does not grow with the file.
+    """
+    validate = VALIDATORS[collection]
+    fmt = detect_format(path, fmt)
+    storage = storage or get_storage()
+    result = TransferResult("Imported", collection)
+
+    def valid_records(stream):
+        for number, record in read_records(stream, fmt):
+            if isinstance(record, RecordError):
+                result.add_error(number, str(record))
+                continue
+            try:
+                yield validate(record)
+            except RecordError as e:
+                result.add_error(number, str(e))
+
+    def with_ids(records):
+        for batch in batched(records, BATCH_SIZE):
+            for record, record_id in zip(batch, new_ids(len(batch))):
+                record["id"] = record_id
+                yield record
+            result.records += len(batch)
+
+    started = time.perf_counter()
+    with open_stream(path, "r") as stream:
+        records = with_ids(valid_records(stream))
+        if collection == "todos":
+            storage.append_todos(records)
+        else:
+            storage.append_urls(records)
+    result.seconds = time.perf_counter() - started
+    return result
+
+def export_records(path, collection, storage=None, fmt=None):
+    """Stream every record of a collection to a file and return a TransferResult."""
+    fmt = detect_format(path, fmt)
+    storage = storage or get_storage()
+    records = storage.iter_todos() if collection == "todos" else storage.iter_urls()
+    result = TransferResult("Exported", collection)
+
+    started = time.perf_counter()
+    with open_stream(path, "w") as stream:
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS[collection], extrasaction="ignore")
+            writer.writeheader()
+            for record in records:
+                row = dict(record)
+                if collection == "todos":
+                    row["text"] = record.get("text") or record.get("title", "")
+                    row["completed"] = "true" if record.get("completed") else "false"
+                else:
+                    row["urls"] = " ".join(record.get("urls", []))
+                writer.writerow(row)
+                result.records += 1
+        else:
+            for record in records:
+                stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+                result.records += 1
+    result.seconds = time.perf_counter() - started
+    return result
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
+from startup_timing import startup_timer
 import sys
 import os
-import json
-import webbrowser
 from datetime import datetime
-from settings import ensure_data_directories, get_data_path
+from settings import ensure_data_directories
+from storage import get_storage, new_id
 
 def run_cli_version():
     """Run a command-line interface version of the application when GUI is not available."""
@@ -34,12 +34,35 @@ def run_cli_version():
 def url_launcher_menu():
     """CLI menu for URL launcher."""
     # Load URLs
-    urls_file = get_data_path("urls.json")
-    if os.path.exists(urls_file):
-        with open(urls_file, 'r') as f:
-            url_groups = json.load(f)
-    else:
-        url_groups = []
+    storage = get_storage()
+    url_groups = storage.load_urls()
+    
+    # URLs are stored in canonical form, so opening them needs no string work
+    from url_index import URLIndex, canonicalize_url, canonicalize_groups
+    changed = canonicalize_groups(url_groups)
+    if changed:
+        storage.commit_urls(url_groups, changed=changed)
+    url_index = URLIndex(url_groups)
+    
+    def read_urls(urls):
+        """Read canonical URLs until an empty line, skipping invalid and repeated ones."""
+        while True:
+            url = input("> ")
+            if not url.strip():
+                return urls
+            try:
+                url = canonicalize_url(url)
+            except ValueError as e:
+                print(f"Invalid URL: {e}")
+                continue
+            if url in urls:
+                print("Already in this group.")
+                continue
+            keys = url_index.groups_containing(url)
+            if keys:
+                names = [g['name'] for g in url_groups if URLIndex.group_key(g) in keys]
+                print(f"Note: also in {', '.join(names)}")
+            urls.append(url)
     
     while True:
         print("\n----- URL LAUNCHER -----")
@@ -68,21 +91,17 @@ def url_launcher_menu():
                 print("Group name cannot be empty.")
                 continue
             
-            urls = []
             print("Enter URLs (one per line, empty line to finish):")
-            while True:
-                url = input("> ")
-                if not url.strip():
-                    break
-                urls.append(url.strip())
+            urls = read_urls([])
             
             if not urls:
                 print("URL group must contain at least one URL.")
                 continue
             
-            url_groups.append({"name": name, "urls": urls})
-            with open(urls_file, 'w') as f:
-                json.dump(url_groups, f, indent=2)
+            group = {"name": name, "urls": urls}
+            url_groups.append(group)
+            url_index.update(group)
+            storage.commit_urls(url_groups, changed=[group])
             print(f"URL group '{name}' added successfully.")
             
         elif choice == "e":
@@ -116,15 +135,8 @@ def url_launcher_menu():
                 url_choice = input("Select an option: ")
                 
                 if url_choice == "a":
-                    urls = list(group['urls'])
                     print("Enter new URLs (one per line, empty line to finish):")
-                    while True:
-                        url = input("> ")
-                        if not url.strip():
-                            break
-                        urls.append(url.strip())
-                    
-                    group['urls'] = urls
+                    group['urls'] = read_urls(list(group['urls']))
                     
                 elif url_choice == "d":
                     idx_to_delete = input("Enter the number of the URL to delete: ")
@@ -138,8 +150,8 @@ def url_launcher_menu():
                     except ValueError:
                         print("Invalid input.")
                 
-                with open(urls_file, 'w') as f:
-                    json.dump(url_groups, f, indent=2)
+                url_index.update(group)
+                storage.commit_urls(url_groups, changed=[group])
                 print("URL group updated successfully.")
                 
             except ValueError:
@@ -159,9 +171,9 @@ def url_launcher_menu():
                 
                 confirm = input(f"Are you sure you want to delete '{url_groups[idx]['name']}'? (y/n): ")
                 if confirm.lower() == 'y':
-                    del url_groups[idx]
-                    with open(urls_file, 'w') as f:
-                        json.dump(url_groups, f, indent=2)
+                    group = url_groups.pop(idx)
+                    url_index.remove(group)
+                    storage.commit_urls(url_groups, deleted=[group])
                     print("URL group deleted successfully.")
                 
             except ValueError:
@@ -182,12 +194,11 @@ def url_launcher_menu():
                 group = url_groups[idx]
                 print(f"Opening URLs for group: {group['name']}")
                 
-                for url in group['urls']:
-                    try:
-                        print(f"Opening: {url}")
-                        webbrowser.open(url)
-                    except Exception as e:
-                        print(f"Error opening URL {url}: {e}")
+                from url_launcher import get_url_launcher
+                launcher = get_url_launcher()
+                job = launcher.launch(group['urls'], group['name'])
+                launcher.wait(job)
+                print(job.summary())
                 
             except ValueError:
                 print("Invalid input.")
@@ -200,12 +211,8 @@ def url_launcher_menu():
 def todo_manager_menu():
     """CLI menu for todo manager."""
     # Load todos
-    todos_file = get_data_path("todos.json")
-    if os.path.exists(todos_file):
-        with open(todos_file, 'r') as f:
-            todos = json.load(f)
-    else:
-        todos = []
+    storage = get_storage()
+    todos = storage.load_todos()
     
     while True:
         print("\n----- TODO MANAGER -----")
@@ -254,7 +261,7 @@ def todo_manager_menu():
                     continue
             
             todo = {
-                "id": str(len(todos) + 1),
+                "id": new_id(),
                 "text": text,
                 "completed": False,
                 "created": datetime.now().isoformat()
@@ -264,8 +271,7 @@ def todo_manager_menu():
                 todo["reminder"] = reminder
             
             todos.append(todo)
-            with open(todos_file, 'w') as f:
-                json.dump(todos, f, indent=2)
+            storage.commit_todos(todos, changed=[todo])
             print("Todo added successfully.")
             
         elif choice == "e":
@@ -306,8 +312,7 @@ def todo_manager_menu():
                         if "reminder" in todo:
                             del todo["reminder"]
                 
-                with open(todos_file, 'w') as f:
-                    json.dump(todos, f, indent=2)
+                storage.commit_todos(todos, changed=[todo])
                 print("Todo updated successfully.")
                 
             except ValueError:
@@ -328,8 +333,7 @@ def todo_manager_menu():
                 todo = todos[idx]
                 todo["completed"] = not todo.get("completed", False)
                 
-                with open(todos_file, 'w') as f:
-                    json.dump(todos, f, indent=2)
+                storage.commit_todos(todos, changed=[todo])
                 
                 status = "completed" if todo["completed"] else "not completed"
                 print(f"Todo marked as {status}.")
@@ -351,9 +355,8 @@ def todo_manager_menu():
                 
                 confirm = input(f"Are you sure you want to delete '{todos[idx]['text']}'? (y/n): ")
                 if confirm.lower() == 'y':
-                    del todos[idx]
-                    with open(todos_file, 'w') as f:
-                        json.dump(todos, f, indent=2)
+                    todo = todos.pop(idx)
+                    storage.commit_todos(todos, deleted=[todo])
                     print("Todo deleted successfully.")
                 
             except ValueError:
@@ -367,12 +370,8 @@ def todo_manager_menu():
 def settings_menu():
     """CLI menu for settings."""
     # Load settings
-    settings_file = get_data_path("settings.json")
-    if os.path.exists(settings_file):
-        with open(settings_file, 'r') as f:
-            settings = json.load(f)
-    else:
-        settings = {}
+    storage = get_storage()
+    settings = storage.load_settings()
     
     while True:
         print("\n----- SETTINGS -----")
@@ -391,8 +390,7 @@ def settings_menu():
             new_autostart = not autostart
             settings["autostart"] = new_autostart
             
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+            storage.save_settings(settings)
             
             status = "enabled" if new_autostart else "disabled"
             print(f"Autostart {status}.")
@@ -406,69 +404,55 @@ def settings_menu():
         else:
             print("Invalid choice. Please try again.")
 
+def has_display():
+    """Check for a display without starting a Tk interpreter."""
+    if sys.platform.startswith(("win", "darwin")):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
 def main():
     """Main entry point for the desktop widget application."""
+    # Subcommands and --batch run without any UI, e.g. from cron
+    if len(sys.argv) > 1:
+        from batch_cli import run_command
+        sys.exit(run_command(sys.argv[1:]))
+    
     # Ensure data directories exist
-    ensure_data_directories()
+    with startup_timer.phase("data directories"):
+        ensure_data_directories()
     
     # Check if we can use a GUI
-    try:
-        # Try to import tkinter to see if it works
-        import tkinter as tk
-        
-        # Try to create a test window to see if we have a display
-        root = tk.Tk()
-        root.title("Desktop Widget")
-        root.destroy()  # We'll create a new window later
-        
-        # Check for assets/minimal icons - if not present, create them
-        if not os.path.exists('assets/minimal_link_icon_dark.png'):
-            print("Creating minimal icons...")
-            try:
+    if not has_display():
+        print("GUI not available: no display")
+        run_cli_version()
+        return
+    
+    # Check for the icon atlas - if not present, create the icons
+    if not os.path.exists('assets/minimal_icons_atlas.json'):
+        print("Creating minimal icons...")
+        try:
+            with startup_timer.phase("create icons"):
                 import create_minimal_icons
                 create_minimal_icons.main()
-            except Exception as e:
-                print(f"Error creating icons: {e}")
-        
-        # If we get here, GUI is available, import and run the GUI version
-        try:
-            # First try to use the new modern widget
-            try:
-                # Import the new modern implementation
-                from modern_widget_tk import ModernDesktopWidget
-                
-                # Create and show modern widget (standalone window)
-                widget = ModernDesktopWidget()
-                widget.mainloop()
-                
-                # Exit after window is closed
-                sys.exit(0)
-                
-            except Exception as e:
-                # If modern widget fails, fall back to classic widget
-                print(f"Error starting modern widget: {e}")
-                print("Using modern widget with basic UI...")
-                
-                # Create new root window
-                classic_root = tk.Tk()
-                classic_root.wm_title("DesktopWidget")
-                
-                # Create and show simple widget - basic UI with core functionality
-                from modern_widget_tk import ModernDesktopWidget
-                widget = ModernDesktopWidget()
-                
-                # Start application event loop
-                classic_root.mainloop()
-                
         except Exception as e:
-            # If all GUI attempts fail, fallback to CLI
-            print(f"Error starting GUI: {e}")
-            run_cli_version()
-            
+            print(f"Error creating icons: {e}")
+    
+    # The widget's own window doubles as the display check
+    try:
+        with startup_timer.phase("import modern_widget_tk"):
+            from modern_widget_tk import ModernDesktopWidget
+        with startup_timer.phase("create widget"):
+            widget = ModernDesktopWidget()
     except Exception as e:
-        # If tkinter or display is not available, run CLI version
+        # If tkinter or the display is not usable, run the CLI version
         print(f"GUI not available: {e}")
         run_cli_version()
+        return
+    
+    widget.mainloop()
+    
+    # Exit after window is closed
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()
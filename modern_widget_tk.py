@@ -1,50 +1,40 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import ttk, font
+from tkinter import ttk, font, messagebox
 import time
 import datetime
 import os
 import sys
-import json
-import webbrowser
-from PIL import Image, ImageTk
+import signal
+import threading
+from storage import get_storage, ensure_ids, new_id
+from persistence import PersistenceScheduler, DEFAULT_SAVE_DELAY_MS
+from virtual_list_tk import VirtualList
+from icon_cache import get_icon_cache
+from due_index import DueIndex, DAY_SECONDS, due_timestamp
+from startup_timing import startup_timer
+from warm_start import load_snapshot, save_snapshot, build_view_model
+from url_launcher import get_url_launcher, POLL_INTERVAL_MS
+from url_index import URLIndex, canonicalize_urls, canonicalize_groups
+from record_index import RecordIndex
+from timer_service import MinuteTimer
+from animation import AnimationEngine
+from window_drag import DragController
+from theme_engine import ThemeEngine
 
-class MinimalTheme:
+class MinimalTheme(ThemeEngine):
     """Theme colors and styling for the modern minimal widget."""
     def __init__(self, is_dark=True):
-        # Base colors
-        if is_dark:
-            self.bg_color = "#1a1e2e"  # Dark navy background
-            self.card_bg = "#242842"   # Slightly lighter navy for cards
-            self.text_color = "#ffffff"  # White text
-            self.secondary_text = "#8f96dd"  # Light purple/blue for secondary text
-            self.accent_color = "#6978ff"  # Bright purple accent
-            self.hover_color = "#535db2"  # Darker purple for hover
-            self.border_color = "#323761"  # Border color for cards
-            self.highlight_color = "#535db2"  # Highlight color for selected items
-            self.error_color = "#ff5f5f"  # Red for errors/alerts
-            self.success_color = "#5fd587"  # Green for success indicators
-        else:
-            self.bg_color = "#f8f9fa"  # Light background
-            self.card_bg = "#ffffff"   # White for cards
-            self.text_color = "#1a1e2e"  # Dark navy text
-            self.secondary_text = "#5f63aa"  # Darker purple/blue for secondary text
-            self.accent_color = "#6978ff"  # Same purple accent
-            self.hover_color = "#535db2"  # Darker purple for hover
-            self.border_color = "#e9ecef"  # Light gray border
-            self.highlight_color = "#d8dbff"  # Light purple highlight
-            self.error_color = "#ff5f5f"  # Red for errors/alerts
-            self.success_color = "#5fd587"  # Green for success indicators
-
-        # Derived colors
-        self.shadow_color = "#101425" if is_dark else "#e1e4e8"
-        
         # Fonts
         self.font_family = "Helvetica"
         self.title_size = 18
         self.large_text_size = 16
         self.normal_text_size = 12
         self.small_text_size = 10
+        self.font_sizes = (self.title_size, self.large_text_size, self.normal_text_size, self.small_text_size)
+        
+        # Base and derived colors
+        super().__init__("dark" if is_dark else "light")
         
         # Styling
         self.corner_radius = 15
@@ -54,13 +44,18 @@ class MinimalTheme:
         self.item_spacing = 10
         self.shadow_size = 15 if is_dark else 10
         self.opacity = 0.95  # Slight transparency for glass effect
-        self.animation_speed = 10  # ms between animation frames
-        self.animation_steps = 15  # number of steps in animations
-    
-    def get_font(self, size, bold=False):
-        """Get font with the specified size and weight."""
-        weight = "bold" if bold else "normal"
-        return (self.font_family, size, weight)
+        self.animation_fps = 60  # target frame rate of animations
+        self.animation_ms = 150  # duration of the expand/collapse animation
+        self.tab_animation_ms = 120  # duration of the tab color fade
+
+_theme = None
+
+def get_theme():
+    """Get the theme shared by the widget and any widget created without one."""
+    global _theme
+    if _theme is None:
+        _theme = MinimalTheme()
+    return _theme
 
 class GlassFrame(tk.Canvas):
     """A canvas that creates a glass-like frame with rounded corners."""
@@ -81,6 +76,7 @@ class GlassFrame(tk.Canvas):
         
         # Create the glass effect
         self.draw_glass_background()
+        theme.register(self)
         
         # Bind resize event
         self.bind("<Configure>", self.on_resize)
@@ -99,6 +95,10 @@ class GlassFrame(tk.Canvas):
             tags="glass_bg"
         )
     
+    def apply_theme(self):
+        """Recolor the background in the current theme."""
+        self.itemconfigure("glass_bg", fill=self.theme.card_bg, outline=self.theme.border_color)
+    
     def rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
         """Draw a rounded rectangle."""
         # Draw the main rectangle
@@ -166,7 +166,7 @@ class MinimalButton(tk.Canvas):
     """A minimal style button with an optional icon."""
     def __init__(self, parent, text="", icon_path=None, command=None, 
                  width=40, height=40, theme=None, text_only=False, **kwargs):
-        self.theme = theme if theme else MinimalTheme()
+        self.theme = theme if theme else get_theme()
         self.text = text
         self.icon_path = icon_path
         self.command = command
@@ -192,18 +192,11 @@ class MinimalButton(tk.Canvas):
         
         # Load icon if provided
         self.icon_image = None
-        if icon_path and os.path.exists(icon_path):
-            try:
-                self.icon = Image.open(icon_path).convert("RGBA")
-                # Scale icon to fit
-                icon_size = min(width, height) - 16
-                self.icon = self.icon.resize((icon_size, icon_size), Image.LANCZOS)
-                self.icon_image = ImageTk.PhotoImage(self.icon)
-            except Exception as e:
-                print(f"Error loading icon {icon_path}: {e}")
+        self._load_icon()
         
         # Draw initial button
         self.draw_button()
+        self.theme.register(self)
         
         # Bind events
         self.bind("<Enter>", self.on_enter)
@@ -211,20 +204,32 @@ class MinimalButton(tk.Canvas):
         self.bind("<Button-1>", self.on_press)
         self.bind("<ButtonRelease-1>", self.on_release)
     
+    def _load_icon(self):
+        """Load the icon and scale it to fit the button."""
+        self.icon_image = None
+        if self.icon_path:
+            # Scale icon to fit; identical icons are shared between buttons
+            icon_size = min(self.width, self.height) - 16
+            # Icons are the same in every theme, so they are not reloaded on a switch
+            self.icon_image = get_icon_cache().get(self.icon_path, icon_size)
+    
+    def set_icon(self, icon_path):
+        """Change the icon and redraw the button."""
+        if icon_path != self.icon_path:
+            self.icon_path = icon_path
+            self._load_icon()
+            self.draw_button()
+    
+    def apply_theme(self):
+        """Redraw the button in the current theme colors."""
+        self.draw_button()
+    
     def draw_button(self):
         """Draw the button based on current state."""
         self.delete("all")
         
         # Determine colors based on state
-        if self.state == "normal":
-            bg_color = self.theme.bg_color if self.text_only else self.theme.card_bg
-            fg_color = self.theme.accent_color if self.text_only else self.theme.secondary_text
-        elif self.state == "hover":
-            bg_color = self.theme.bg_color if self.text_only else self.theme.card_bg
-            fg_color = self.theme.accent_color
-        else:  # active
-            bg_color = self.theme.bg_color if self.text_only else self.theme.card_bg
-            fg_color = self.theme.accent_color
+        bg_color, fg_color = self.theme.colors("text_button" if self.text_only else "button", self.state)
         
         # Draw background (only for non-text buttons)
         if not self.text_only:
@@ -273,9 +278,7 @@ class MinimalButton(tk.Canvas):
                 text_x, text_y,
                 text=self.text,
                 fill=fg_color,
-                font=self.theme.get_font(
-                    self.theme.normal_text_size if not self.text_only else self.theme.normal_text_size
-                )
+                font=self.theme.get_font(self.theme.normal_text_size)
             )
     
     def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
@@ -332,9 +335,11 @@ class MinimalButton(tk.Canvas):
 class TodoItem(tk.Frame):
     """A single todo item with checkbox, text, and action buttons."""
     def __init__(self, parent, todo, theme, toggle_callback=None, 
-                 edit_callback=None, delete_callback=None):
+                 edit_callback=None, delete_callback=None, due_index=None, editable=None):
         self.theme = theme
         self.todo = todo
+        self.due_index = due_index  # Parsed due dates shared by the list
+        self.editable = editable or (lambda: True)  # False while the todo is only a snapshot row
         self.toggle_callback = toggle_callback
         self.edit_callback = edit_callback
         self.delete_callback = delete_callback
@@ -354,9 +359,6 @@ class TodoItem(tk.Frame):
         )
         self.container.pack(fill=tk.BOTH, expand=True)
         
-        # Checkbox image
-        checkbox_path = f"assets/minimal_checkbox_{'checked' if todo.get('completed', False) else 'empty'}_icon_dark.png"
-        
         # Create frames for layout
         self.left_frame = tk.Frame(self.container, bg=theme.card_bg)
         self.left_frame.place(relx=0.02, rely=0.5, anchor="w")
@@ -370,7 +372,7 @@ class TodoItem(tk.Frame):
         # Checkbox
         self.checkbox_btn = MinimalButton(
             self.left_frame,
-            icon_path=checkbox_path,
+            icon_path=self.checkbox_icon_path(todo.get('completed', False)),
             command=self.toggle_completed,
             width=30, height=30,
             theme=theme
@@ -378,38 +380,32 @@ class TodoItem(tk.Frame):
         self.checkbox_btn.pack(side=tk.LEFT, padx=(0, 10))
         
         # Todo text
-        text_color = theme.secondary_text if todo.get('completed', False) else theme.text_color
         self.todo_text = tk.Label(
             self.middle_frame,
-            text=todo.get('title', 'Untitled Todo'),
+            text="",
             bg=theme.card_bg,
-            fg=text_color,
+            fg=theme.text_color,
             font=theme.get_font(theme.normal_text_size),
             wraplength=200
         )
         self.todo_text.pack(side=tk.LEFT)
         
-        # Due date if present
-        if 'due_date' in todo and todo['due_date']:
-            date_color = theme.error_color if self.is_due_soon() else theme.secondary_text
-            self.due_date = tk.Label(
-                self.middle_frame,
-                text=f" ({todo['due_date']})",
-                bg=theme.card_bg,
-                fg=date_color,
-                font=theme.get_font(theme.small_text_size)
-            )
-            self.due_date.pack(side=tk.LEFT)
+        # Due date (packed when the todo has one)
+        self.due_date = tk.Label(
+            self.middle_frame,
+            text="",
+            bg=theme.card_bg,
+            fg=theme.secondary_text,
+            font=theme.get_font(theme.small_text_size)
+        )
         
-        # Reminder icon if needed
-        if self.is_due_soon():
-            self.remind_icon = MinimalButton(
-                self.right_frame,
-                icon_path="assets/minimal_remind_icon_dark.png",
-                width=24, height=24,
-                theme=theme
-            )
-            self.remind_icon.pack(side=tk.LEFT, padx=5)
+        # Reminder icon (packed when the todo is due soon)
+        self.remind_icon = MinimalButton(
+            self.right_frame,
+            icon_path="assets/minimal_remind_icon_dark.png",
+            width=24, height=24,
+            theme=theme
+        )
         
         # Edit button
         self.edit_btn = MinimalButton(
@@ -431,8 +427,45 @@ class TodoItem(tk.Frame):
         )
         self.menu_btn.pack(side=tk.LEFT, padx=5)
         
+        # Show the todo
+        self.bind_todo(todo)
+        theme.register(self)
+    
+    def apply_theme(self):
+        """Recolor the text and due date in the current theme."""
+        self.bind_todo(self.todo)
+    
+    @staticmethod
+    def checkbox_icon_path(completed):
+        """Get the checkbox icon for a completed state."""
+        return f"assets/minimal_checkbox_{'checked' if completed else 'empty'}_icon_dark.png"
+    
+    def bind_todo(self, todo):
+        """Show a (possibly different) todo in this item, reusing its widgets."""
+        self.todo = todo
+        completed = todo.get('completed', False)
+        
+        # Checkbox and text
+        self.checkbox_btn.set_icon(self.checkbox_icon_path(completed))
+        self.todo_text.configure(text=todo.get('title', 'Untitled Todo'), fg=self.theme.text_color)
+        
+        # Due date if present
+        due_soon = self.is_due_soon()
+        if 'due_date' in todo and todo['due_date']:
+            date_color = self.theme.error_color if due_soon else self.theme.secondary_text
+            self.due_date.configure(text=f" ({todo['due_date']})", fg=date_color)
+            self.due_date.pack(side=tk.LEFT)
+        else:
+            self.due_date.pack_forget()
+        
+        # Reminder icon if needed
+        if due_soon:
+            self.remind_icon.pack(side=tk.LEFT, padx=5, before=self.edit_btn)
+        else:
+            self.remind_icon.pack_forget()
+        
         # Apply strikethrough for completed todos
-        if todo.get('completed', False):
+        if completed:
             self._add_strikethrough()
     
     def _add_strikethrough(self):
@@ -443,21 +476,13 @@ class TodoItem(tk.Frame):
     
     def toggle_completed(self):
         """Toggle the completed state of the todo."""
+        if not self.editable():
+            return
+        
         self.todo['completed'] = not self.todo.get('completed', False)
         
         # Update checkbox image
-        checkbox_path = f"assets/minimal_checkbox_{'checked' if self.todo['completed'] else 'empty'}_icon_dark.png"
-        self.checkbox_btn.icon_path = checkbox_path
-        
-        # Reload the icon
-        if os.path.exists(checkbox_path):
-            try:
-                icon = Image.open(checkbox_path).convert("RGBA")
-                icon = icon.resize((24, 24), Image.LANCZOS)
-                self.checkbox_btn.icon_image = ImageTk.PhotoImage(icon)
-                self.checkbox_btn.draw_button()
-            except Exception as e:
-                print(f"Error loading icon {checkbox_path}: {e}")
+        self.checkbox_btn.set_icon(self.checkbox_icon_path(self.todo['completed']))
         
         # Update text styling
         if self.todo['completed']:
@@ -481,29 +506,17 @@ class TodoItem(tk.Frame):
     
     def is_due_soon(self):
         """Check if the todo is due soon (within 24 hours)."""
-        if 'due_date' not in self.todo or not self.todo['due_date']:
+        # Listed todos were parsed once, when they were indexed
+        if self.due_index is not None:
+            due = self.due_index.due_at(self.todo)
+        else:
+            due = due_timestamp(self.todo)
+        if due is None:
             return False
         
-        try:
-            # Parse due date from string
-            due_datetime = datetime.datetime.strptime(
-                self.todo['due_date'], 
-                "%I:%M %p" if ":" in self.todo['due_date'] else "%m/%d/%Y"
-            )
-            
-            # If only time was provided, assume it's for today
-            if ":" in self.todo['due_date']:
-                now = datetime.datetime.now()
-                due_datetime = due_datetime.replace(
-                    year=now.year, month=now.month, day=now.day
-                )
-            
-            # Check if due within the next 24 hours
-            time_diff = due_datetime - datetime.datetime.now()
-            return time_diff.total_seconds() < 24 * 60 * 60 and time_diff.total_seconds() > 0
-        except Exception:
-            # If parsing fails, assume not due soon
-            return False
+        # Check if due within the next 24 hours
+        time_diff = due - time.time()
+        return time_diff < DAY_SECONDS and time_diff > 0
     
     def show_menu(self):
         """Show a popup menu with delete option."""
@@ -595,6 +608,19 @@ class URLItem(tk.Frame):
         # Make the whole item clickable
         self.container.bind("<Button-1>", self.open_urls)
         self.name_label.bind("<Button-1>", self.open_urls)
+        theme.register(self)
+    
+    def apply_theme(self):
+        """Recolor the background in the current theme."""
+        self.container.itemconfigure(self.rounded_rect, fill=self.theme.accent_color, outline=self.theme.border_color)
+    
+    def bind_group(self, url_group, launch=None):
+        """Show a (possibly different) URL group in this item, with the progress of its launch."""
+        self.url_group = url_group
+        text = url_group.get('name', 'Unnamed Group')
+        if launch is not None and not launch.done:
+            text += f"  ({launch.finished}/{len(launch.urls)})"
+        self.name_label.configure(text=text)
     
     def open_urls(self, event=None):
         """Open all URLs in this group."""
@@ -604,7 +630,7 @@ class URLItem(tk.Frame):
 class TabButton(tk.Canvas):
     """A tab button for switching between views."""
     def __init__(self, parent, text, active=False, command=None, theme=None, width=150, height=40):
-        self.theme = theme if theme else MinimalTheme()
+        self.theme = theme if theme else get_theme()
         self.text = text
         self.active = active
         self.command = command
@@ -621,6 +647,7 @@ class TabButton(tk.Canvas):
         
         # Draw the tab
         self.draw_tab()
+        self.theme.register(self)
         
         # Bind events
         self.bind("<Button-1>", self.on_click)
@@ -630,18 +657,17 @@ class TabButton(tk.Canvas):
         self.delete("all")
         
         # Determine colors based on active state
-        bg_color = self.theme.accent_color if self.active else self.theme.card_bg
-        text_color = self.theme.text_color if self.active else self.theme.secondary_text
+        bg_color, text_color = self.theme.colors("tab", self.active)
         
         # Draw rounded rectangle for tab
-        self.create_rounded_rect(
+        self.bg_item = self.create_rounded_rect(
             0, 0, self.width, self.height,
             self.theme.corner_radius,
             fill=bg_color
         )
         
         # Draw text
-        self.create_text(
+        self.text_item = self.create_text(
             self.width // 2, self.height // 2,
             text=self.text,
             fill=text_color,
@@ -666,11 +692,28 @@ class TabButton(tk.Canvas):
         ]
         return self.create_polygon(points, smooth=True, **kwargs)
     
-    def set_active(self, active):
-        """Set the active state of the tab."""
-        if self.active != active:
-            self.active = active
+    def set_active(self, active, animations=None):
+        """Set the active state of the tab, fading its colors if an AnimationEngine is given."""
+        if self.active == active:
+            return
+        self.active = active
+        if animations is None:
             self.draw_tab()
+            return
+        
+        from calendar_view import blend_color
+        start, end = self.theme.colors("tab", not active), self.theme.colors("tab", active)
+        self.itemconfig(self.text_item, font=self.theme.get_font(self.theme.normal_text_size, bold=active))
+        
+        def frame(progress):
+            self.itemconfig(self.bg_item, fill=blend_color(end[0], start[0], progress))
+            self.itemconfig(self.text_item, fill=blend_color(end[1], start[1], progress))
+        
+        animations.start(f"tab:{self.text}", self.theme.tab_animation_ms, frame)
+    
+    def apply_theme(self):
+        """Redraw the tab in the current theme."""
+        self.draw_tab()
     
     def on_click(self, event):
         """Handle click event."""
@@ -688,8 +731,30 @@ class ModernDesktopWidget(tk.Tk):
         self.attributes("-topmost", True)  # Keep on top of other windows
         self.attributes("-alpha", 0.97)  # Slight transparency
         
+        # Storage backend for todos, URL groups and settings
+        self.storage = get_storage()
+        settings = self.storage.load_settings()
+        
         # Initialize theme
-        self.theme = MinimalTheme(is_dark=True)
+        self.theme = get_theme()
+        self.theme.set_mode("light" if settings.get("theme") == "light" else "dark")
+        
+        # Saves are coalesced and written on a background thread
+        save_delay = settings.get("save_delay_ms", DEFAULT_SAVE_DELAY_MS)
+        self.persistence = PersistenceScheduler(self.storage, self.after, delay_ms=save_delay)
+        
+        # Todos sorted by their parsed due dates
+        self.due_index = DueIndex()
+        
+        # URL groups by the canonical URLs they contain
+        self.url_index = URLIndex()
+        
+        # URL groups being opened, by launch_key
+        self.url_launches = {}
+        
+        # Make sure pending changes reach the disk before exiting
+        self.protocol("WM_DELETE_WINDOW", self.quit_app)
+        signal.signal(signal.SIGTERM, self.on_sigterm)
         
         # Set window size and position
         self.width = 400
@@ -697,30 +762,112 @@ class ModernDesktopWidget(tk.Tk):
         self.expanded_height = 500  # Expanded height
         self.expanded = False
         
-        # Set position to bottom-right of screen
-        self.set_position_bottom_right()
-        
-        # Initialize UI
-        self.init_ui()
+        # What the last run showed, painted before any data is read
+        with startup_timer.phase("read snapshot"):
+            self.snapshot = load_snapshot()
         
-        # Track drag state
-        self.drag_start_x = 0
-        self.drag_start_y = 0
-        self.dragging = False
-        
-        # Set window background color
-        self.configure(bg=self.theme.bg_color)
+        # Put the widget where it was left, or at the bottom-right of the screen
+        position = self.snapshot["position"] if self.snapshot else settings.get("position")
+        if position:
+            x, y = position
+            self.geometry(f"{self.width}x{self.height}+{x}+{y}")
+        else:
+            self.set_position_bottom_right()
         
-        # Load data
-        self.load_data()
+        # Data is read in the background once the window is on screen
+        self.urls = []
+        self.todo_index = RecordIndex()  # Todos by id, in list order
+        self.data_loaded = False
+        self._loaded_data = None
+        self._load_error = None
         
         # Set up animation variables
+        self.animations = AnimationEngine(self.after, self.after_cancel, fps=self.theme.animation_fps)
+        
+        # Dragging moves the window at most once per frame
+        self.drag = DragController(
+            self.after,
+            lambda x, y: self.geometry(f"+{x}+{y}"),
+            lambda: (0, 0, self.winfo_screenwidth(), self.winfo_screenheight()),
+            frame_ms=1000 // self.theme.animation_fps
+        )
+        self.bind("<Configure>", self.on_configure, add="+")
         self.animating = False
-        self.animation_progress = 0
         self.target_height = self.height
         
-        # Start ticking for clock updates
-        self.tick()
+        # Initialize the collapsed view; the rest is built after it is shown
+        with startup_timer.phase("collapsed view"):
+            self.init_ui()
+        
+        # Set window background color
+        self.configure(bg=self.theme.bg_color)
+        
+        # The clock only changes once a minute, so wake up at minute boundaries
+        self.clock_texts = {}  # label -> text it shows
+        self.clock_timer = MinuteTimer(self.after, self.after_cancel)
+        self.clock_timer.add_listener(self.update_clock)
+        self.clock_timer.start()
+        
+        # No wakeups while the widget is hidden or fully covered (e.g. by a screen lock)
+        self.bind("<Unmap>", self.on_visibility_change, add="+")
+        self.bind("<Map>", self.on_visibility_change, add="+")
+        self.bind("<Visibility>", self.on_visibility_change, add="+")
+        
+        # Build the expanded view and load data once the window is on screen
+        self.startup_done = False
+        self.bind("<Map>", self.on_first_map, add="+")
+        self.after(500, self.finish_startup)  # In case the window is never mapped
+    
+    def on_first_map(self, event):
+        """Finish starting up once the collapsed view has been painted."""
+        if event.widget is self and not self.startup_done:
+            mode = "warm" if self.snapshot else "cold"
+            startup_timer.mark(f"first paint ({mode} start)")
+            self.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Create the expanded view and start loading the data."""
+        if self.startup_done:
+            return
+        self.startup_done = True
+        
+        with startup_timer.phase("expanded view"):
+            self.create_expanded_view()
+            self.bind_events()
+        
+        # Bind the first rows from the snapshot; the real data only has to
+        # rebind the rows that changed since
+        if self.snapshot:
+            with startup_timer.phase("snapshot rows"):
+                self.refresh_url_list()
+                self.refresh_todo_list()
+        
+        startup_timer.mark("load data started")
+        threading.Thread(target=self._read_data_in_background, daemon=True).start()
+        self.after(10, self._poll_loaded_data)
+    
+    def _read_data_in_background(self):
+        # Always hand over a result, so the poll loop ends even if reading fails
+        data = ([], [])
+        try:
+            data = self.read_data()
+        except Exception as e:
+            self._load_error = e
+        finally:
+            self._loaded_data = data
+    
+    def _poll_loaded_data(self):
+        """Show the data once the background read is done."""
+        if self._loaded_data is None:
+            self.after(10, self._poll_loaded_data)
+            return
+        
+        if self._load_error is not None:
+            print(f"Error loading data: {self._load_error}")
+        with startup_timer.phase("reconcile data"):
+            self.apply_data(*self._loaded_data)
+        self._loaded_data = None
+        startup_timer.print_report()
     
     def set_position_bottom_right(self):
         """Position the widget at the bottom-right of the screen."""
@@ -746,11 +893,8 @@ class ModernDesktopWidget(tk.Tk):
         # Create the collapsed view (always visible)
         self.create_collapsed_view()
         
-        # Create the expanded view (initially hidden)
-        self.create_expanded_view()
-        
-        # Bind events
-        self.bind_events()
+        # The expanded view (initially hidden) and the event bindings are
+        # created by finish_startup, after the first paint
     
     def create_collapsed_view(self):
         """Create the collapsed view with date/time and buttons."""
@@ -897,10 +1041,19 @@ class ModernDesktopWidget(tk.Tk):
         )
         self.url_frame.pack(fill=tk.BOTH, expand=True)
         
-        # URL list
-        self.url_list = tk.Frame(
+        # URL list (only the visible rows are built)
+        self.url_list = VirtualList(
             self.url_frame,
-            bg=self.theme.card_bg
+            self.theme,
+            row_height=94,
+            create_row=lambda parent: URLItem(
+                parent, {}, self.theme,
+                edit_callback=self.edit_url_group,
+                open_callback=self.open_urls
+            ),
+            bind_row=lambda row, url_group: row.bind_group(
+                url_group, self.url_launches.get(self.launch_key(url_group))
+            )
         )
         self.url_list.pack(fill=tk.BOTH, expand=True)
         
@@ -921,10 +1074,20 @@ class ModernDesktopWidget(tk.Tk):
         )
         # Will be packed when tab is selected
         
-        # Todo list
-        self.todo_list = tk.Frame(
+        # Todo list (only the visible rows are built)
+        self.todo_list = VirtualList(
             self.todo_frame,
-            bg=self.theme.card_bg
+            self.theme,
+            row_height=84,
+            create_row=lambda parent: TodoItem(
+                parent, {}, self.theme,
+                toggle_callback=self.toggle_todo_completed,
+                edit_callback=self.edit_todo,
+                delete_callback=self.delete_todo,
+                due_index=self.due_index,
+                editable=lambda: self.data_loaded
+            ),
+            bind_row=lambda row, todo: row.bind_todo(todo)
         )
         self.todo_list.pack(fill=tk.BOTH, expand=True)
         
@@ -963,92 +1126,93 @@ class ModernDesktopWidget(tk.Tk):
         if isinstance(event.widget, MinimalButton) or event.widget == self.todo_list or event.widget == self.url_list:
             return
             
-        if not self.dragging:
-            self.drag_start_x = event.x_root - self.winfo_x()
-            self.drag_start_y = event.y_root - self.winfo_y()
-            self.dragging = True
+        if not self.drag.dragging:
+            self.drag.begin(
+                event.x_root, event.y_root, self.winfo_x(), self.winfo_y(),
+                (self.winfo_width(), self.winfo_height()), self.snap_targets()
+            )
             
             # Visual feedback that we're dragging
             self.config(cursor="fleur")
     
+    def snap_targets(self):
+        """Get the rectangles of this app's other visible windows, to snap the widget to."""
+        return [
+            (child.winfo_x(), child.winfo_y(), child.winfo_width(), child.winfo_height())
+            for child in self.winfo_children()
+            if isinstance(child, tk.Toplevel) and child.winfo_viewable()
+        ]
+    
     def on_drag_motion(self, event):
         """Move the widget during dragging."""
-        if self.dragging:
-            x = event.x_root - self.drag_start_x
-            y = event.y_root - self.drag_start_y
-            
-            # Ensure the widget stays within screen boundaries
-            screen_width = self.winfo_screenwidth()
-            screen_height = self.winfo_screenheight()
-            
-            # Make sure at least 40px of the widget is always visible
-            x = max(min(x, screen_width - 40), -self.width + 40)
-            y = max(min(y, screen_height - 40), 0)
-            
-            self.geometry(f"+{x}+{y}")
+        self.drag.motion(event.x_root, event.y_root)
     
     def on_drag_stop(self, event):
-        """Stop dragging the widget."""
-        self.dragging = False
+        """Stop dragging the widget and remember where it was left."""
+        position = self.drag.end()
         self.config(cursor="")
+        if position:
+            self.persistence.update_settings({"position": list(position)})
     
-    def tick(self):
-        """Update time and check for animations."""
-        # Update time
-        current_time = time.strftime("%I:%M %p")
-        current_date = time.strftime("%b %d, %Y")
-        
-        self.time_label.config(text=current_time)
-        self.date_label.config(text=current_date)
-        
-        # Check for animations
-        if self.animating:
-            self.animate_resize()
-        
-        # Schedule next tick
-        self.after(1000, self.tick)
+    def on_configure(self, event):
+        """Measure the screen again on the next drag, unless the change is our own move."""
+        if event.widget is self and not self.drag.dragging:
+            self.drag.invalidate()
+    
+    def update_clock(self, now):
+        """Show the time and date, touching only the labels whose text changed."""
+        local_time = time.localtime(now)
+        self.set_clock_text(self.time_label, time.strftime("%I:%M %p", local_time))
+        self.set_clock_text(self.date_label, time.strftime("%b %d, %Y", local_time))
+    
+    def set_clock_text(self, label, text):
+        """Set a clock label's text if it differs from what it shows."""
+        if self.clock_texts.get(label) != text:
+            self.clock_texts[label] = text
+            label.config(text=text)
+    
+    def on_visibility_change(self, event):
+        """Pause the clock while the widget cannot be seen."""
+        if event.widget is not self:
+            return
+        if event.type == tk.EventType.Unmap or (
+                event.type == tk.EventType.Visibility and event.state == "VisibilityFullyObscured"):
+            self.clock_timer.pause()
+        else:
+            self.clock_timer.resume()
     
     def animate_resize(self):
         """Animate the widget resizing."""
-        if self.animation_progress < self.theme.animation_steps:
-            # Calculate the new height
-            start_height = self.height if self.expanded else self.expanded_height
-            end_height = self.expanded_height if self.expanded else self.height
-            
-            progress_ratio = self.animation_progress / self.theme.animation_steps
-            current_height = int(start_height + (end_height - start_height) * progress_ratio)
-            
-            # Update window height
-            self.geometry(f"{self.width}x{current_height}+{self.winfo_x()}+{self.winfo_y()}")
-            
-            # Resize the main container
-            self.main_container.config(height=current_height - 20)
-            
-            # Increment progress
-            self.animation_progress += 1
-            
-            # Schedule next frame
-            self.after(self.theme.animation_speed, self.animate_resize)
+        start_height = self.height if self.expanded else self.expanded_height
+        end_height = self.target_height
+        shown = {}
+        
+        def frame(progress):
+            # Skip frames that would not change the size; the position is left to the window manager
+            current_height = round(start_height + (end_height - start_height) * progress)
+            if shown.get("height") != current_height:
+                shown["height"] = current_height
+                self.geometry(f"{self.width}x{current_height}")
+                self.main_container.config(height=current_height - 20)
+        
+        self.animations.start("resize", self.theme.animation_ms, frame, on_done=self.finish_resize)
+    
+    def finish_resize(self):
+        """Show the frames of the new size once the resize animation ends."""
+        self.animating = False
+        
+        # Show/hide appropriate frames
+        if self.expanded:
+            self.expanded_frame.place(x=0, y=0, relwidth=1, relheight=1)
+            self.collapsed_frame.place_forget()
         else:
-            # Animation complete
-            self.animating = False
-            self.animation_progress = 0
-            
-            # Final resize to exact target
-            self.geometry(f"{self.width}x{self.target_height}+{self.winfo_x()}+{self.winfo_y()}")
-            self.main_container.config(height=self.target_height - 20)
-            
-            # Show/hide appropriate frames
-            if self.expanded:
-                self.expanded_frame.place(x=0, y=0, relwidth=1, relheight=1)
-                self.collapsed_frame.place_forget()
-            else:
-                self.collapsed_frame.place(x=0, y=0, relwidth=1, relheight=1)
-                self.expanded_frame.place_forget()
+            self.collapsed_frame.place(x=0, y=0, relwidth=1, relheight=1)
+            self.expanded_frame.place_forget()
     
     def toggle_expand(self, tab=None):
         """Toggle between expanded and collapsed views."""
-        if self.animating:
+        # While loading, the expanded view shows the snapshot rows read-only
+        if self.animating or not self.startup_done or not (self.data_loaded or self.snapshot):
             return
         
         self.expanded = not self.expanded
@@ -1064,19 +1228,18 @@ class ModernDesktopWidget(tk.Tk):
         
         # Start animation
         self.animating = True
-        self.animation_progress = 0
         self.animate_resize()
     
     def switch_tab(self, tab):
         """Switch between URL and Todo tabs."""
         if tab.lower() == "url":
-            self.url_tab.set_active(True)
-            self.todo_tab.set_active(False)
+            self.url_tab.set_active(True, self.animations)
+            self.todo_tab.set_active(False, self.animations)
             self.todo_frame.pack_forget()
             self.url_frame.pack(fill=tk.BOTH, expand=True)
         else:  # todo tab
-            self.url_tab.set_active(False)
-            self.todo_tab.set_active(True)
+            self.url_tab.set_active(False, self.animations)
+            self.todo_tab.set_active(True, self.animations)
             self.url_frame.pack_forget()
             self.todo_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -1090,85 +1253,84 @@ class ModernDesktopWidget(tk.Tk):
         else:
             self.refresh_todo_list()
     
+    @property
+    def todos(self):
+        """Get the todos in list order."""
+        return self.todo_index.records
+    
     def refresh_url_list(self):
         """Refresh the URL list."""
-        # Clear existing items
-        for widget in self.url_list.winfo_children():
-            widget.destroy()
-        
-        # Add URL groups
-        for url_group in self.urls:
-            url_item = URLItem(
-                self.url_list,
-                url_group,
-                self.theme,
-                edit_callback=self.edit_url_group,
-                open_callback=self.open_urls
-            )
-            url_item.pack(fill=tk.X, pady=5)
+        if not self.data_loaded and self.snapshot:
+            self.url_list.set_items(self.snapshot["urls"])
+        else:
+            self.url_list.set_items(self.urls)
     
     def refresh_todo_list(self):
         """Refresh the todo list."""
-        # Clear existing items
-        for widget in self.todo_list.winfo_children():
-            widget.destroy()
-        
-        # Add todos
-        for todo in self.todos:
-            todo_item = TodoItem(
-                self.todo_list,
-                todo,
-                self.theme,
-                toggle_callback=self.toggle_todo_completed,
-                edit_callback=self.edit_todo,
-                delete_callback=self.delete_todo
-            )
-            todo_item.pack(fill=tk.X, pady=5)
+        if not self.data_loaded and self.snapshot:
+            self.todo_list.set_items(self.snapshot["todos"])
+        else:
+            self.todo_list.set_items(self.todos)
     
     def load_data(self):
-        """Load URLs and todos from JSON files."""
+        """Load URLs and todos from storage."""
+        self.apply_data(*self.read_data())
+    
+    def read_data(self):
+        """Read the URL groups and todos from storage (safe to run off the UI thread)."""
         # URLs
-        self.urls = []
+        urls = []
         try:
-            if os.path.exists("data/urls.json"):
-                with open("data/urls.json", "r") as file:
-                    self.urls = json.load(file)
+            urls = self.storage.load_urls()
         except Exception as e:
             print(f"Error loading URLs: {e}")
         
         # Todos
-        self.todos = []
+        todos = []
         try:
-            if os.path.exists("data/todos.json"):
-                with open("data/todos.json", "r") as file:
-                    self.todos = json.load(file)
+            todos = self.storage.load_todos()
         except Exception as e:
             print(f"Error loading todos: {e}")
         
-        # Create data directory if it doesn't exist
-        os.makedirs("data", exist_ok=True)
+        return urls, todos
+    
+    def apply_data(self, urls, todos):
+        """Show loaded URL groups and todos."""
+        self.urls = urls
+        self.data_loaded = True
+        
+        # List rows are keyed by id, so make sure every record has one
+        if ensure_ids(self.urls):
+            self.save_urls()
+        if self.todo_index.load(todos):
+            self.save_todos()
         
-        # Refresh content
-        self.refresh_content()
+        # Groups saved by older versions hold URLs as they were typed
+        changed_groups = canonicalize_groups(self.urls)
+        if changed_groups:
+            self.save_urls(changed=changed_groups)
+        self.url_index.load(self.urls)
+        
+        # Parse every due date once
+        self.due_index.load(self.todos)
+        
+        # Refresh both lists, replacing any rows shown from the snapshot
+        self.refresh_url_list()
+        self.refresh_todo_list()
     
-    def save_urls(self):
-        """Save URLs to JSON file."""
-        try:
-            with open("data/urls.json", "w") as file:
-                json.dump(self.urls, file, indent=4)
-        except Exception as e:
-            print(f"Error saving URLs: {e}")
+    def save_urls(self, changed=(), deleted=()):
+        """Schedule a save of the URL groups, only writing the given groups when possible."""
+        self.persistence.mark_dirty("urls", self.urls, changed=changed, deleted=deleted)
     
-    def save_todos(self):
-        """Save todos to JSON file."""
-        try:
-            with open("data/todos.json", "w") as file:
-                json.dump(self.todos, file, indent=4)
-        except Exception as e:
-            print(f"Error saving todos: {e}")
+    def save_todos(self, changed=(), deleted=()):
+        """Schedule a save of the todos, only writing the given todos when possible."""
+        self.persistence.mark_dirty("todos", self.todos, changed=changed, deleted=deleted)
     
     def add_url_group(self):
         """Add a new URL group."""
+        if not self.data_loaded:
+            return  # Snapshot rows are read-only
+        
         # Create a dialog
         dialog = tk.Toplevel(self)
         dialog.title("Add URL Group")
@@ -1260,22 +1422,39 @@ class ModernDesktopWidget(tk.Tk):
     def save_new_url_group(self, name, urls_text, dialog):
         """Save a new URL group."""
         if not name.strip():
-            return  # Require a name
+            messagebox.showerror("Error", "Please enter a name for the group.", parent=dialog)
+            return
         
-        # Parse URLs
-        urls = [url.strip() for url in urls_text.split("\n") if url.strip()]
+        # Parse URLs into their canonical forms, so launches can use them as they are
+        urls, invalid, repeated = canonicalize_urls(urls_text.split("\n"))
+        if invalid:
+            messagebox.showerror("Error", "These are not valid URLs:\n" + "\n".join(invalid), parent=dialog)
+            return
+        if not urls:
+            messagebox.showerror("Error", "Please enter at least one URL.", parent=dialog)
+            return
         
         # Create the URL group
         url_group = {
+            "id": new_id(),
             "name": name,
             "urls": urls
         }
         
+        # Flag URLs listed twice and URLs that other groups already open
+        notes = [f"{url} was listed more than once; it is kept once" for url in repeated]
+        for url, keys in self.url_index.duplicates(urls).items():
+            names = [group.get("name", "Unnamed Group") for group in self.urls if URLIndex.group_key(group) in keys]
+            notes.append(f"{url} is also in {', '.join(names)}")
+        if notes:
+            messagebox.showwarning("Duplicate URLs", "\n".join(notes), parent=dialog)
+        
         # Add to the list
         self.urls.append(url_group)
+        self.url_index.update(url_group)
         
-        # Save to file
-        self.save_urls()
+        # Save to storage
+        self.save_urls(changed=[url_group])
         
         # Close the dialog
         dialog.destroy()
@@ -1288,19 +1467,39 @@ class ModernDesktopWidget(tk.Tk):
         # Similar to add_url_group, but populate fields with existing data
         pass
     
+    @staticmethod
+    def launch_key(url_group):
+        """Get the key a URL group's launch is tracked under."""
+        return url_group.get("id") or id(url_group)
+    
     def open_urls(self, url_group):
-        """Open all URLs in the group."""
-        for url in url_group.get("urls", []):
-            try:
-                # Add http:// if not present
-                if not url.startswith(("http://", "https://")):
-                    url = "http://" + url
-                webbrowser.open(url)
-            except Exception as e:
-                print(f"Error opening URL {url}: {e}")
+        """Open all URLs in the group on the launcher's worker threads."""
+        key = self.launch_key(url_group)
+        if key in self.url_launches:
+            return  # Still opening
+        job = get_url_launcher().launch(url_group.get("urls", []), url_group.get("name"))
+        self.url_launches[key] = job
+        self.after(POLL_INTERVAL_MS, self.poll_url_launch, key, job)
+    
+    def poll_url_launch(self, key, job):
+        """Show the progress of a URL group launch until it is done."""
+        events = job.poll()
+        if events:
+            self.url_list.layout(rebind=True)
+        if not any(kind == "done" for kind, _ in events):
+            self.after(POLL_INTERVAL_MS, self.poll_url_launch, key, job)
+            return
+        
+        del self.url_launches[key]
+        self.url_list.layout(rebind=True)
+        if job.failures:
+            messagebox.showwarning("Error opening URLs", job.summary(), parent=self)
     
     def add_todo(self):
         """Add a new todo item."""
+        if not self.data_loaded:
+            return  # Snapshot rows are read-only
+        
         # Create a dialog
         dialog = tk.Toplevel(self)
         dialog.title("Add To-Do")
@@ -1421,6 +1620,7 @@ class ModernDesktopWidget(tk.Tk):
         
         # Create the todo item
         todo = {
+            "id": new_id(),
             "title": title,
             "completed": False
         }
@@ -1430,10 +1630,11 @@ class ModernDesktopWidget(tk.Tk):
             todo["due_date"] = due_date.strip()
         
         # Add to the list
-        self.todos.append(todo)
+        self.todo_index.add(todo)
+        self.due_index.update(todo)
         
-        # Save to file
-        self.save_todos()
+        # Save to storage
+        self.save_todos(changed=[todo])
         
         # Close the dialog
         dialog.destroy()
@@ -1448,23 +1649,23 @@ class ModernDesktopWidget(tk.Tk):
     
     def delete_todo(self, todo):
         """Delete a todo item."""
-        # Remove from list
-        if todo in self.todos:
-            self.todos.remove(todo)
+        # Remove from the index by id
+        if self.todo_index.remove(todo["id"]) is not None:
+            self.due_index.remove(todo)
             
-            # Save to file
-            self.save_todos()
+            # Save to storage
+            self.save_todos(deleted=[todo])
             
             # Refresh the todo list
             self.refresh_todo_list()
     
     def toggle_todo_completed(self, todo):
-        """Toggle the completed state of a todo item."""
-        # Update the todo
-        todo["completed"] = not todo.get("completed", False)
+        """Save a completed state toggled by a TodoItem."""
+        # The TodoItem has already flipped the flag; only its row needs updating
+        self.todo_list.refresh_items([todo])
         
-        # Save to file
-        self.save_todos()
+        # Save to storage
+        self.save_todos(changed=[todo])
     
     def show_settings(self):
         """Show the settings dialog."""
@@ -1488,7 +1689,7 @@ class ModernDesktopWidget(tk.Tk):
         )
         theme_label.pack(anchor="w")
         
-        theme_var = tk.StringVar(value="dark")
+        theme_var = tk.StringVar(value=self.theme.name)
         dark_radio = tk.Radiobutton(
             theme_frame,
             text="Dark",
@@ -1569,20 +1770,16 @@ class ModernDesktopWidget(tk.Tk):
     
     def save_settings(self, theme, autostart, dialog):
         """Save settings and apply them."""
-        # Save settings to file
-        settings = {
+        # Merge into the stored settings on the writer thread, the only
+        # place settings are written, so a pending drag position is kept
+        self.persistence.update_settings({
             "theme": theme,
             "autostart": autostart
-        }
-        
-        try:
-            with open("data/settings.json", "w") as file:
-                json.dump(settings, file, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        })
         
         # Apply settings
-        # Changing theme would require restarting the application
+        # Restyle the live widgets; no restart or reload is needed
+        self.theme.set_mode(theme, self)
         # Setting autostart would require platform-specific code
         
         # Close the dialog
@@ -1590,7 +1787,20 @@ class ModernDesktopWidget(tk.Tk):
     
     def quit_app(self):
         """Quit the application."""
+        # Write any pending changes before the window goes away
+        self.persistence.flush(wait=True)
+        
+        # Remember what to paint on the next launch
+        if self.data_loaded:
+            save_snapshot(build_view_model(self.urls, self.todos, self.winfo_x(), self.winfo_y()))
+        self.clock_timer.stop()
+        self.clock_timer.print_report()
+        self.animations.print_report()
         self.destroy()
+    
+    def on_sigterm(self, signum, frame):
+        """Flush pending changes and quit when the session ends."""
+        self.quit_app()
 
 def main():
     """Main entry point for the application."""
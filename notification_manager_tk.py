@@ -1,78 +1,192 @@
 import tkinter as tk
 from tkinter import ttk
+from notification_queue import NotificationQueue, Notification, PRIORITY_NORMAL
+from animation import AnimationEngine
+
+# Toast geometry, stacked upwards from the bottom-right corner
+TOAST_WIDTH = 300
+TOAST_HEIGHT = 100
+TOAST_MARGIN = 20
+TOAST_GAP = 10
+TOAST_SLIDE_MS = 200  # New toasts slide in from the right screen edge
+
+DEFAULT_MAX_VISIBLE = 3
+DEFAULT_DISPLAY_MS = 5000
 
 class NotificationManager:
-    def __init__(self):
-        # Keep track of shown notifications to avoid duplicates
-        self.shown_notifications = set()
-        
-        # Active notifications
+    """Shows notifications as stacked toasts, a few at a time.
+
+    Notifications are queued by priority and shown once the event loop is
+    idle, so a burst arriving in one go is coalesced into summaries. At
+    most max_visible toasts are on screen; their windows are created once
+    and reused.
+    """
+    def __init__(self, master=None, max_visible=DEFAULT_MAX_VISIBLE, display_ms=DEFAULT_DISPLAY_MS, animations=None):
+        self.master = master
+        self.animations = animations  # AnimationEngine, e.g. the widget's; created on first use otherwise
+        self.max_visible = max_visible
+        self.display_ms = display_ms
+        self.queue = NotificationQueue()
+
+        # Toasts on screen, bottom first, and hidden ones ready for reuse
         self.active_notifications = []
-    
-    def show_notification(self, title, message, notification_id=None):
-        """Show a notification."""
-        # Check if this notification was already shown recently
-        if notification_id:
-            if notification_id in self.shown_notifications:
-                return
-            self.shown_notifications.add(notification_id)
-        
-        # Create notification window
-        notification = NotificationWindow(title, message)
-        self.active_notifications.append(notification)
-        
-        # Clean up closed notifications
-        self.active_notifications = [n for n in self.active_notifications if n.is_active]
-    
+        self.pool = []
+        self.windows_created = 0
+
+        self._drain_job = None
+        self._styled = False
+        self._screen_size = None
+
+    def show_notification(self, title, message, notification_id=None, priority=PRIORITY_NORMAL, kind=None):
+        """Queue a notification; ids already shown recently are skipped."""
+        if self.queue.push(Notification(title, message, notification_id, priority, kind)):
+            self._schedule_drain()
+
+    def notify_reminders(self, todos):
+        """Queue a notification for each due reminder, e.g. as TodoManager's on_reminders."""
+        for todo in todos:
+            self.show_notification(
+                "Reminder",
+                todo.get("text") or todo.get("title", ""),
+                notification_id=f"reminder:{todo.get('id')}:{todo.get('reminder')}",
+                kind="reminder"
+            )
+
+    def _root(self):
+        return self.master or tk._default_root
+
+    def _schedule_drain(self):
+        if self._drain_job is None:
+            self._drain_job = self._root().after_idle(self._drain)
+
+    def _drain(self):
+        """Show queued notifications while there is room on screen."""
+        self._drain_job = None
+        shown = []
+        while len(self.active_notifications) < self.max_visible and len(self.queue):
+            toast = self.pool.pop() if self.pool else self._create_toast()
+            toast.show(self.queue.pop(), self.display_ms)
+            self.active_notifications.append(toast)
+            shown.append(toast)
+        self._restack()
+        for toast in shown:
+            self._slide_in(toast)
+
+    def _create_toast(self):
+        if not self._styled:
+            ttk.Style().configure("Notification.TLabel", font=("Arial", 10, "bold"))
+            self._styled = True
+        self.windows_created += 1
+        return NotificationWindow(self, self.master)
+
+    def _engine(self):
+        if self.animations is None:
+            root = self._root()
+            self.animations = AnimationEngine(root.after, root.after_cancel)
+        return self.animations
+
+    def _restack(self):
+        """Place visible toasts above each other from the bottom-right corner."""
+        if self._screen_size is None:
+            root = self._root()
+            self._screen_size = (root.winfo_screenwidth(), root.winfo_screenheight())
+        screen_width, screen_height = self._screen_size
+        for index, toast in enumerate(self.active_notifications):
+            toast.x = screen_width - TOAST_WIDTH - TOAST_MARGIN
+            toast.y = screen_height - TOAST_MARGIN - (index + 1) * TOAST_HEIGHT - index * TOAST_GAP
+            # A toast still sliding in picks up its new row on the next frame
+            if not self._engine().is_running(toast.slide_name):
+                toast.place(toast.x)
+
+    def _slide_in(self, toast):
+        """Slide a toast from the right screen edge to its place."""
+        start_x = self._screen_size[0]
+        self._engine().start(
+            toast.slide_name, TOAST_SLIDE_MS,
+            lambda progress: toast.place(round(start_x + (toast.x - start_x) * progress)),
+            easing="ease_out"
+        )
+
+    def on_toast_closed(self, toast):
+        """Return a closed toast to the pool and show the next notification."""
+        if toast in self.active_notifications:
+            self._engine().stop(toast.slide_name)
+            self.active_notifications.remove(toast)
+            self.pool.append(toast)
+            self._restack()
+            self._schedule_drain()
+
     def clear_old_notifications(self):
-        """Clear the list of shown notifications."""
-        self.shown_notifications.clear()
+        """Forget which notifications were shown, so they can be shown again."""
+        self.queue.dedup.clear()
+
+    def stats(self):
+        """Get queue depth, drop counts and window usage."""
+        return {
+            **self.queue.stats(),
+            "visible": len(self.active_notifications),
+            "pooled": len(self.pool),
+            "windows_created": self.windows_created,
+        }
 
 
 class NotificationWindow:
-    """Custom notification window that appears at the bottom-right corner."""
-    
-    def __init__(self, title, message):
-        self.is_active = True
-        
+    """A toast window that is hidden when closed and reused for later notifications."""
+
+    def __init__(self, manager, master=None):
+        self.manager = manager
+        self.is_active = False
+        self._close_job = None
+        self.slide_name = f"toast:{id(self)}"
+        self.x = self.y = 0  # Where the manager stacked this toast
+
         # Create window
-        self.window = tk.Toplevel()
+        self.window = tk.Toplevel(master)
+        self.window.withdraw()
         self.window.title("")
-        self.window.geometry("300x100+{}+{}".format(
-            self.window.winfo_screenwidth() - 320,  # 20px from right edge
-            self.window.winfo_screenheight() - 120   # 20px from bottom edge
-        ))
         self.window.attributes("-topmost", True)
         self.window.overrideredirect(True)  # No window decorations
-        
+
         # Create frame
         frame = ttk.Frame(self.window, padding=10)
         frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Style
-        style = ttk.Style()
-        style.configure("Notification.TLabel", font=("Arial", 10, "bold"))
-        
+
         # Title
-        title_label = ttk.Label(frame, text=title, style="Notification.TLabel")
-        title_label.pack(anchor=tk.W)
-        
+        self.title_label = ttk.Label(frame, style="Notification.TLabel")
+        self.title_label.pack(anchor=tk.W)
+
         # Message
-        message_label = ttk.Label(frame, text=message, wraplength=280)
-        message_label.pack(anchor=tk.W, pady=5)
-        
+        self.message_label = ttk.Label(frame, wraplength=TOAST_WIDTH - 20)
+        self.message_label.pack(anchor=tk.W, pady=5)
+
         # Close button
         close_button = ttk.Button(frame, text="×", width=2, command=self.close)
         close_button.pack(anchor=tk.SE)
-        
-        # Auto-close after 5 seconds
-        self.window.after(5000, self.close)
-        
+
         # Handle window close
         self.window.protocol("WM_DELETE_WINDOW", self.close)
-    
+
+    def place(self, x):
+        """Move the toast to x on its stacked row."""
+        self.window.geometry(f"{TOAST_WIDTH}x{TOAST_HEIGHT}+{x}+{self.y}")
+
+    def show(self, notification, display_ms):
+        """Show a notification in this window and close it after display_ms."""
+        self.title_label.configure(text=notification.title)
+        self.message_label.configure(text=notification.message)
+        self.is_active = True
+        self.window.deiconify()
+
+        if self._close_job is not None:
+            self.window.after_cancel(self._close_job)
+        self._close_job = self.window.after(display_ms, self.close)
+
     def close(self):
-        """Close the notification window."""
+        """Hide the notification window until it is reused."""
         if self.is_active:
             self.is_active = False
-            self.window.destroy()
\ No newline at end of file
+            if self._close_job is not None:
+                self.window.after_cancel(self._close_job)
+                self._close_job = None
+            self.window.withdraw()
+            self.manager.on_toast_closed(self)
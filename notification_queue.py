@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+
+PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW = range(3)
+
+DEFAULT_MAX_QUEUED = 100
+DEFAULT_DEDUP_CAPACITY = 500
+DEFAULT_DEDUP_TTL = 3600  # seconds
+
+# Queued notifications of one kind that are shown as a single summary
+COALESCE_THRESHOLD = 3
+SUMMARY_LINES = 3
+
+class Notification:
+    """One message waiting to be shown."""
+    def __init__(self, title, message, notification_id=None, priority=PRIORITY_NORMAL, kind=None, count=1):
+        self.title = title
+        self.message = message
+        self.notification_id = notification_id
+        self.priority = priority
+        self.kind = kind  # Notifications of the same kind are coalesced, e.g. "reminder"
+        self.count = count  # How many notifications a summary stands for
+
+
+class DedupCache:
+    """Ids of recently shown notifications, bounded in size and age.
+
+    Entries are kept oldest first, so expired and surplus ones are dropped
+    from the front.
+    """
+    def __init__(self, capacity=DEFAULT_DEDUP_CAPACITY, ttl=DEFAULT_DEDUP_TTL, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self._seen = OrderedDict()  # id -> time it was added
+
+    def _expire(self, now):
+        while self._seen:
+            key, added = next(iter(self._seen.items()))
+            if now - added < self.ttl:
+                return
+            del self._seen[key]
+
+    def add(self, key):
+        """Remember an id; returns False if it was already seen within the ttl."""
+        now = self.clock()
+        self._expire(now)
+        if key in self._seen:
+            return False
+        self._seen[key] = now
+        while len(self._seen) > self.capacity:
+            self._seen.popitem(last=False)
+        return True
+
+    def clear(self):
+        """Forget every id."""
+        self._seen.clear()
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class NotificationQueue:
+    """Orders pending notifications by priority, dropping duplicates and overflow.
+
+    When pop() reaches a notification whose kind has COALESCE_THRESHOLD or
+    more entries queued, all of them are returned as one summary, so a
+    burst of reminders shows one "N reminders due" toast instead of N.
+    """
+    def __init__(self, max_queued=DEFAULT_MAX_QUEUED, dedup=None):
+        self.max_queued = max_queued
+        self.dedup = dedup or DedupCache()
+        self._heap = []  # (priority, sequence, notification)
+        self._sequence = itertools.count()
+        self._kind_counts = {}
+
+        # Counters
+        self.pushed = 0
+        self.shown = 0
+        self.dropped_duplicates = 0
+        self.dropped_overflow = 0
+        self.coalesced = 0
+
+    def push(self, notification):
+        """Queue a notification; returns False if it was dropped."""
+        if notification.notification_id is not None and not self.dedup.add(notification.notification_id):
+            self.dropped_duplicates += 1
+            return False
+        self.pushed += 1
+
+        entry = (notification.priority, next(self._sequence), notification)
+        if len(self._heap) >= self.max_queued:
+            # Make room by dropping the newest of the least important entries
+            self.dropped_overflow += 1
+            worst = max(self._heap)
+            if entry[:2] > worst[:2]:
+                return False
+            self._heap.remove(worst)
+            heapq.heapify(self._heap)
+            self._count(worst[2].kind, -1)
+
+        heapq.heappush(self._heap, entry)
+        self._count(notification.kind, 1)
+        return True
+
+    def _count(self, kind, delta):
+        if kind is not None:
+            self._kind_counts[kind] = self._kind_counts.get(kind, 0) + delta
+
+    def pop(self):
+        """Get the next notification to show, or None if the queue is empty."""
+        if not self._heap:
+            return None
+        _, _, notification = heapq.heappop(self._heap)
+        self._count(notification.kind, -1)
+
+        kind = notification.kind
+        if kind is not None and self._kind_counts.get(kind, 0) + 1 >= COALESCE_THRESHOLD:
+            group = [notification] + [entry[2] for entry in sorted(self._heap) if entry[2].kind == kind]
+            self._heap = [entry for entry in self._heap if entry[2].kind != kind]
+            heapq.heapify(self._heap)
+            self._kind_counts[kind] = 0
+            self.coalesced += len(group) - 1
+            notification = self.summarize(group)
+
+        self.shown += 1
+        return notification
+
+    @staticmethod
+    def summarize(group):
+        """Combine notifications of one kind into a single summary."""
+        count = sum(notification.count for notification in group)
+        lines = [notification.message for notification in group[:SUMMARY_LINES]]
+        if len(group) > SUMMARY_LINES:
+            lines.append(f"and {len(group) - SUMMARY_LINES} more")
+        return Notification(
+            f"{count} {group[0].kind}s due",
+            "\n".join(lines),
+            priority=min(notification.priority for notification in group),
+            kind=group[0].kind,
+            count=count,
+        )
+
+    def __len__(self):
+        return len(self._heap)
+
+    def stats(self):
+        """Get the queue depth and drop counters."""
+        return {
+            "depth": len(self._heap),
+            "pushed": self.pushed,
+            "shown": self.shown,
+            "dropped_duplicates": self.dropped_duplicates,
+            "dropped_overflow": self.dropped_overflow,
+            "coalesced": self.coalesced,
+            "dedup_size": len(self.dedup),
+        }
@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from storage import new_id
+from safe_io import write_batch
+
+DEFAULT_SAVE_DELAY_MS = 250
+
+class _PendingCollection:
+    """Changes to one collection that have not been handed to the writer yet."""
+    def __init__(self, records):
+        self.records = records
+        self.changed = {}
+        self.deleted = {}
+        self.full = False
+        self.marks = 0
+
+
+class PersistenceScheduler:
+    """Coalesces saves of in-memory collections and writes them on a worker thread.
+
+    Collections are marked dirty from the UI thread. Changes made within
+    the save window are merged into one write, which is snapshotted on the
+    UI thread and then written by a background thread so slow disks never
+    block the UI.
+    """
+    def __init__(self, storage, schedule, delay_ms=DEFAULT_SAVE_DELAY_MS):
+        self.storage = storage
+        self.schedule = schedule  # schedule(delay_ms, callback), e.g. Tk.after
+        self.delay_ms = delay_ms
+
+        self._commit = {
+            "todos": storage.commit_todos,
+            "urls": storage.commit_urls,
+        }
+        self._save = {
+            "todos": storage.save_todos,
+            "urls": storage.save_urls,
+        }
+
+        self._pending = {}
+        self._settings_updates = {}
+        self._timer_token = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.marks = 0
+        self.writes = 0
+        self.coalesced_writes = 0
+        self.queued_writes = 0
+        self.flush_count = 0
+        self.total_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_flush_ms = 0.0
+
+        # Writer thread
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def mark_dirty(self, collection, records, changed=(), deleted=()):
+        """Record that a collection changed; without changed/deleted it is rewritten."""
+        pending = self._pending.get(collection)
+        if pending is None:
+            pending = self._pending[collection] = _PendingCollection(records)
+        pending.records = records
+        pending.marks += 1
+        self.marks += 1
+
+        for record in deleted:
+            pending.changed.pop(id(record), None)
+            pending.deleted[id(record)] = record
+        for record in changed:
+            # Ids are assigned here so the copies written later share them
+            if not record.get("id"):
+                record["id"] = new_id()
+            pending.deleted.pop(id(record), None)
+            pending.changed[id(record)] = record
+        if not changed and not deleted:
+            pending.full = True
+
+        self._start_window()
+
+    def update_settings(self, updates):
+        """Merge keys into the stored settings on the writer thread."""
+        self._settings_updates.update(updates)
+        self.marks += 1
+        self._start_window()
+
+    def _start_window(self):
+        # Start the save window on the first change; later ones join it
+        if self._timer_token is None:
+            token = self._timer_token = object()
+            self.schedule(self.delay_ms, lambda: self._on_timer(token))
+
+    def _on_timer(self, token):
+        if token is self._timer_token:
+            self._hand_off()
+
+    def _hand_off(self):
+        """Snapshot pending changes and queue them for the writer thread."""
+        self._timer_token = None
+        pending, self._pending = self._pending, {}
+        settings, self._settings_updates = self._settings_updates, {}
+
+        for collection, changes in pending.items():
+            # Keyed backends only read the changed records; the others
+            # rewrite the whole collection from a copy
+            if changes.full or collection not in self.storage.keyed_collections:
+                records = [dict(record) for record in changes.records]
+            else:
+                records = changes.records
+            changed = [dict(record) for record in changes.changed.values()]
+            deleted = [dict(record) for record in changes.deleted.values()]
+
+            with self._lock:
+                self.writes += 1
+                self.coalesced_writes += changes.marks - 1
+                self.queued_writes += 1
+            self._queue.put((collection, records, changed, deleted, changes.full))
+
+        if settings:
+            with self._lock:
+                self.writes += 1
+                self.queued_writes += 1
+            self._queue.put(("settings", settings, (), (), True))
+
+    def _run(self):
+        """Writer thread loop."""
+        while True:
+            # Everything queued together shares one round of directory fsyncs
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with write_batch():
+                for item in items:
+                    self._write(*item)
+            for _ in items:
+                self._queue.task_done()
+
+    def _write(self, collection, records, changed, deleted, full):
+        """Write one collection and record its latency."""
+        start = time.perf_counter()
+        try:
+            if collection == "settings":
+                stored = self.storage.load_settings()
+                stored.update(records)
+                self.storage.save_settings(stored)
+            elif full:
+                self._save[collection](records)
+            else:
+                self._commit[collection](records, changed=changed, deleted=deleted)
+        except Exception as e:
+            print(f"Error saving {collection}: {e}")
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.queued_writes -= 1
+                self.flush_count += 1
+                self.total_flush_ms += elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.last_flush_ms = elapsed_ms
+
+    def flush(self, wait=True):
+        """Write pending changes now, optionally waiting until they are on disk."""
+        if self._pending or self._settings_updates:
+            self._hand_off()
+        if wait:
+            self._queue.join()
+
+    def stats(self):
+        """Return persistence counters."""
+        with self._lock:
+            return {
+                "pending_writes": len(self._pending) + bool(self._settings_updates) + self.queued_writes,
+                "marks": self.marks,
+                "writes": self.writes,
+                "coalesced_writes": self.coalesced_writes,
+                "flushes": self.flush_count,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "avg_flush_ms": round(self.total_flush_ms / self.flush_count, 2) if self.flush_count else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 2),
+            }
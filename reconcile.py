@@ -0,0 +1,75 @@
+import json
+from bisect import bisect_left
+from collections import namedtuple
+
+# Result of diffing two keyed lists:
+#   removed  - keys that are no longer present
+#   inserted - (index, key) pairs for new keys, in new-list order
+#   moved    - (index, key) pairs for kept keys that changed relative order
+#   updated  - kept keys whose signature changed
+Patch = namedtuple("Patch", "removed inserted moved updated")
+
+def record_key(record):
+    """Get the key a record is reconciled by."""
+    return record.get("id")
+
+def record_signature(record):
+    """Get a fingerprint of a record's fields.
+
+    The fields are encoded rather than referenced, so editing a nested
+    value in place (e.g. a URL group's urls list) changes the signature.
+    """
+    return json.dumps(record, sort_keys=True, default=str)
+
+def _longest_increasing_subsequence(values):
+    """Return the positions of a longest strictly increasing subsequence."""
+    tails = []  # Smallest tail value of an increasing run of each length
+    tail_positions = []
+    previous = [-1] * len(values)
+
+    for position, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_positions.append(position)
+        else:
+            tails[length] = value
+            tail_positions[length] = position
+        previous[position] = tail_positions[length - 1] if length else -1
+
+    result = set()
+    position = tail_positions[-1] if tail_positions else -1
+    while position != -1:
+        result.add(position)
+        position = previous[position]
+    return result
+
+def diff(old, new):
+    """Compute the smallest keyed patch turning old into new.
+
+    Both arguments are lists of (key, signature) pairs. Kept keys that
+    lie on a longest increasing subsequence of their old positions stay
+    where they are; every other kept key is reported as moved.
+    """
+    old_positions = {key: position for position, (key, _) in enumerate(old)}
+    old_signatures = dict(old)
+    new_keys = {key for key, _ in new}
+
+    removed = [key for key, _ in old if key not in new_keys]
+
+    inserted = []
+    kept = []  # (new index, key, old position)
+    updated = []
+    for index, (key, signature) in enumerate(new):
+        if key not in old_positions:
+            inserted.append((index, key))
+            continue
+        kept.append((index, key, old_positions[key]))
+        if old_signatures[key] != signature:
+            updated.append(key)
+
+    stable = _longest_increasing_subsequence([old_position for _, _, old_position in kept])
+    moved = [(index, key) for position, (index, key, _) in enumerate(kept)
+             if position not in stable]
+
+    return Patch(removed, inserted, moved, updated)
@@ -0,0 +1,98 @@
+from storage import new_id, ensure_ids
+
+# Removals after which the positions of the records behind them are recomputed
+REINDEX_AFTER = 64
+
+class RecordIndex:
+    """Records in list order, indexed by id.
+
+    The records are kept in a dict by id and in one list that is updated
+    in place, so the list handed to the UI and to storage is never
+    rebuilt. Looking a record up or replacing it is O(1). Deleting one
+    shifts the rest of the list down in a single memmove; positions stored
+    for the records behind it are then at most the number of removals
+    since the last recompute ahead, so a record is found by searching
+    that short window, and positions are recomputed every REINDEX_AFTER
+    removals.
+    """
+    def __init__(self, records=()):
+        self._by_id = {}
+        self._list = []
+        self._positions = {}  # id -> position in _list, exact before _stale_from
+        self._stale_from = 0
+        self._removed = 0  # Removals since positions were recomputed
+        self.load(records)
+
+    def load(self, records):
+        """Index a list of records, giving any without a unique id a new one.
+
+        Returns True if any id was assigned.
+        """
+        assigned = ensure_ids(records)
+        self._by_id = {record["id"]: record for record in records}
+        self._list[:] = records
+        self._positions = {}
+        self._reindex(0)
+        return assigned
+
+    def _reindex(self, start):
+        for position in range(start, len(self._list)):
+            self._positions[self._list[position]["id"]] = position
+        self._stale_from = len(self._list)
+        self._removed = 0
+
+    def _position(self, record):
+        """Get the position of an indexed record in the list."""
+        position = self._positions[record["id"]]
+        if position < self._stale_from:
+            return position
+        start = max(self._stale_from, position - self._removed)
+        return self._list.index(record, start, position + 1)
+
+    @property
+    def records(self):
+        """Get the records as a list, in order (kept up to date, not a copy)."""
+        return self._list
+
+    def get(self, record_id, default=None):
+        """Get a record by id."""
+        return self._by_id.get(record_id, default)
+
+    def add(self, record):
+        """Append a record, giving it an id if it has none."""
+        if not record.get("id"):
+            record["id"] = new_id()
+        elif record["id"] in self._by_id:
+            raise ValueError(f"Duplicate record id {record['id']}")
+        self._by_id[record["id"]] = record
+        self._positions[record["id"]] = len(self._list)
+        self._list.append(record)
+
+    def replace(self, record):
+        """Put an edited copy of a record in the place of the one with its id."""
+        old = self._by_id[record["id"]]
+        self._list[self._position(old)] = record
+        self._by_id[record["id"]] = record
+
+    def remove(self, record_id):
+        """Delete a record by id and return it, or None if there is none."""
+        record = self._by_id.pop(record_id, None)
+        if record is None:
+            return None
+        position = self._position(record)
+        del self._list[position]
+        del self._positions[record_id]
+        self._stale_from = min(self._stale_from, position)
+        self._removed += 1
+        if self._removed >= REINDEX_AFTER:
+            self._reindex(self._stale_from)
+        return record
+
+    def __contains__(self, record_id):
+        return record_id in self._by_id
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self._by_id)
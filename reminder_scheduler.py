@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+# Longest single timer wait. Timers measure elapsed time, which can stop
+# while the machine sleeps, so the next reminder is re-checked against the
+# wall clock at least this often.
+MAX_TIMER_MS = 60000
+
+def reminder_time(todo):
+    """Get a todo's reminder as an epoch timestamp, or None if it has none."""
+    reminder = todo.get("reminder")
+    if not reminder:
+        return None
+    try:
+        return datetime.fromisoformat(reminder).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class ReminderScheduler:
+    """Keeps pending reminders in a min-heap and fires them with a single timer.
+
+    Todos are added, updated and removed incrementally; stale heap entries
+    are skipped lazily when they reach the top. Reminders whose time passed
+    while the app was closed, asleep or suspended fire once, as soon as
+    they are noticed.
+    """
+    def __init__(self, on_due=None, schedule=None, cancel=None, clock=time.time, lookup=None):
+        self.on_due = on_due  # on_due(todos), called with newly due todos
+        self.schedule = schedule  # schedule(delay_ms, callback) -> token, e.g. Tk.after
+        self.cancel = cancel  # cancel(token), e.g. Tk.after_cancel
+        self.clock = clock
+        # lookup(todo id) -> todo, e.g. RecordIndex.get; when given, todos
+        # are resolved by id when they fire instead of being held here
+        self.lookup = lookup
+
+        self._heap = []  # (fire time, sequence, todo id)
+        self._entries = {}  # todo id -> (fire time, sequence, todo or None with a lookup)
+        self._sequence = itertools.count()
+        self._timer = None
+        self._timer_due = None
+        self._lock = threading.RLock()
+
+    def start(self, on_due, schedule=None, cancel=None):
+        """Start firing reminders through on_due, with the given timer functions."""
+        with self._lock:
+            self._cancel_timer()
+            self.on_due = on_due
+            self.schedule = schedule
+            self.cancel = cancel
+            self._arm()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, todos):
+        """Replace the pending reminders with those of a todo list."""
+        with self._lock:
+            self._entries = {}
+            for todo in todos:
+                self._add(todo)
+            self._heap = [(due, sequence, key) for key, (due, sequence, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+            self._arm()
+
+    def _add(self, todo):
+        """Track a todo's reminder if it has one that has not fired yet."""
+        self._entries.pop(todo.get("id"), None)
+        due = reminder_time(todo)
+        if due is None or todo.get("notified", False):
+            return None
+        entry = (due, next(self._sequence), None if self.lookup else todo)
+        self._entries[todo.get("id")] = entry
+        return entry
+
+    def update(self, todo):
+        """Reschedule a todo after it was added or edited."""
+        with self._lock:
+            entry = self._add(todo)
+            if entry is not None:
+                heapq.heappush(self._heap, (entry[0], entry[1], todo.get("id")))
+            self._arm()
+
+    def remove(self, todo):
+        """Stop tracking a deleted todo."""
+        with self._lock:
+            if self._entries.pop(todo.get("id"), None) is not None:
+                self._arm()
+
+    def next_due(self):
+        """Get the fire time of the next pending reminder, or None."""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        """Pop heap entries for reminders that were removed or rescheduled."""
+        while self._heap:
+            due, sequence, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == sequence:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self):
+        """Remove and return the todos whose reminder time has come, marked notified."""
+        now = self.clock()
+        due_todos = []
+        with self._lock:
+            self._drop_stale()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, key = heapq.heappop(self._heap)
+                _, _, todo = self._entries.pop(key)
+                if self.lookup is not None:
+                    todo = self.lookup(key)
+                if todo is not None:
+                    todo["notified"] = True
+                    due_todos.append(todo)
+                self._drop_stale()
+        return due_todos
+
+    def _arm(self):
+        """Set the timer for the next reminder, replacing any earlier one."""
+        if self.on_due is None:
+            return
+        self._drop_stale()
+        due = self._heap[0][0] if self._heap else None
+        if due == self._timer_due and self._timer is not None:
+            return
+
+        self._cancel_timer()
+        if due is None:
+            return
+        delay_ms = int(min(MAX_TIMER_MS, max(0, (due - self.clock()) * 1000)))
+        if self.schedule is not None:
+            self._timer = self.schedule(delay_ms, self._on_timer)
+        else:
+            self._timer = threading.Timer(delay_ms / 1000, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+        self._timer_due = due
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            if self.schedule is not None:
+                if self.cancel is not None:
+                    self.cancel(self._timer)
+            else:
+                self._timer.cancel()
+        self._timer = None
+        self._timer_due = None
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._timer_due = None
+        due_todos = self.pop_due()
+        if due_todos:
+            self.on_due(due_todos)
+        with self._lock:
+            self._arm()
+
+    def stop(self):
+        """Cancel the pending timer."""
+        with self._lock:
+            self._cancel_timer()
@@ -0,0 +1,182 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Number of previous versions kept next to each data file (file.json.1 is newest)
+BACKUP_COUNT = 3
+
+_batch = threading.local()
+
+# Read once: os.umask can only be read by setting it, which races with other threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def backup_path(path, index):
+    """Get the path of the index-th backup of a file."""
+    return f"{path}.{index}"
+
+def _fsync_directory(directory):
+    """Flush a directory entry to disk (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _sync_directory(directory):
+    """Sync a directory now, or at the end of the current write batch."""
+    if getattr(_batch, "depth", 0):
+        _batch.directories.add(directory)
+    else:
+        _fsync_directory(directory)
+
+@contextmanager
+def write_batch():
+    """Defer directory fsyncs until every file in the block has been written."""
+    if not getattr(_batch, "depth", 0):
+        _batch.depth = 0
+        _batch.directories = set()
+    _batch.depth += 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if not _batch.depth:
+            directories, _batch.directories = _batch.directories, set()
+            for directory in directories:
+                _fsync_directory(directory)
+
+def match_mode(fd, path):
+    """Give a temp file the permissions of the file it replaces, or those of a new file.
+
+    mkstemp creates files readable by the owner only, which a rename would
+    otherwise carry over to the target.
+    """
+    if not hasattr(os, "fchmod"):
+        return
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.fchmod(fd, mode)
+
+def _rotate_backups(path, backups):
+    """Shift older backups up by one and keep the current file as backup 1."""
+    if backups <= 0 or not os.path.exists(path):
+        return
+
+    for index in range(backups - 1, 0, -1):
+        if os.path.exists(backup_path(path, index)):
+            os.replace(backup_path(path, index), backup_path(path, index + 1))
+
+    # A hard link keeps the old contents without copying them
+    try:
+        if os.path.exists(backup_path(path, 1)):
+            os.remove(backup_path(path, 1))
+        os.link(path, backup_path(path, 1))
+    except OSError:
+        import shutil
+        shutil.copy2(path, backup_path(path, 1))
+
+def _atomic_write(path, write, backups):
+    """Write a file with write(f) to a temp file, fsync it and atomically rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        match_mode(fd, path)
+        with os.fdopen(fd, 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        _rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _sync_directory(directory)
+
+def atomic_write_json(path, data, indent=2, backups=BACKUP_COUNT):
+    """Write JSON to a temp file, fsync it and atomically rename it into place."""
+    _atomic_write(path, lambda f: json.dump(data, f, indent=indent), backups)
+
+def atomic_write_json_array(path, items, indent=2, backups=BACKUP_COUNT):
+    """Like atomic_write_json for a list, but encodes the items one at a time from any iterable."""
+    def write(f):
+        f.write("[")
+        separator = "\n"
+        for item in items:
+            f.write(separator + " " * indent)
+            f.write(json.dumps(item, indent=indent).replace("\n", "\n" + " " * indent))
+            separator = ",\n"
+        f.write("\n]" if separator != "\n" else "]")
+    _atomic_write(path, write, backups)
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Yield the items of a file holding a JSON array one at a time, without reading it all."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if not started:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{path} does not hold a JSON array")
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # An item running up to the end of the buffer may continue in the next chunk
+                    if end < len(buffer) or eof:
+                        yield item
+                        pos = end
+                        continue
+            elif eof:
+                raise ValueError(f"{path} ends inside its JSON array")
+
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+def load_json(path, default, backups=BACKUP_COUNT):
+    """Load a JSON file, falling back to the newest readable backup if it is corrupt."""
+    if not os.path.exists(path):
+        return default
+
+    candidates = [path] + [backup_path(path, index) for index in range(1, backups + 1)]
+    for candidate in candidates:
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(f"Could not read {candidate}, trying an older backup")
+            continue
+        if candidate != path:
+            print(f"Recovered {path} from backup {candidate}")
+        return data
+    return default
@@ -1,5 +1,4 @@
 import os
-import json
 
 def get_data_path(filename):
     """Get the full path to a data file."""
@@ -26,20 +25,11 @@ def ensure_data_directories():
         os.makedirs(assets_dir)
 
 def load_settings():
-    """Load settings from file."""
-    settings_file = get_data_path("settings.json")
-    
-    if os.path.exists(settings_file):
-        try:
-            with open(settings_file, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+    """Load settings from the configured storage backend."""
+    from storage import get_storage
+    return get_storage().load_settings()
 
 def save_settings(settings):
-    """Save settings to file."""
-    settings_file = get_data_path("settings.json")
-    
-    with open(settings_file, 'w') as f:
-        json.dump(settings, f, indent=2)
+    """Save settings to the configured storage backend."""
+    from storage import get_storage
+    get_storage().save_settings(settings)
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Set to print the startup report once the widget has been painted
+REPORT_ENV_VAR = "DESKTOP_WIDGET_STARTUP_REPORT"
+
+class StartupTimer:
+    """Records how long each startup phase takes, from the time it is created."""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []  # (name, start ms, duration ms)
+        self._depth = 0
+
+    def elapsed_ms(self):
+        """Get the milliseconds since startup began."""
+        return (time.perf_counter() - self.start) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Time the code run inside the block as one phase."""
+        began = self.elapsed_ms()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases.append((self._depth, name, began, self.elapsed_ms() - began))
+
+    def mark(self, name):
+        """Record a point in time, such as the first paint."""
+        self.phases.append((self._depth, name, self.elapsed_ms(), 0.0))
+
+    def report(self):
+        """Format the phases like python -X importtime: self time, cumulative time, name."""
+        lines = ["startup: self [ms] | since start [ms] | phase"]
+        for depth, name, began, duration in sorted(self.phases, key=lambda p: (p[2], p[0])):
+            label = "  " * depth + name
+            if duration:
+                lines.append(f"startup: {duration:9.1f} | {began + duration:16.1f} | {label}")
+            else:
+                lines.append(f"startup: {'':>9} | {began:16.1f} | {label}")
+        return "\n".join(lines)
+
+    def print_report(self, force=False):
+        """Print the report if it was asked for."""
+        if force or os.environ.get(REPORT_ENV_VAR):
+            print(self.report(), file=sys.stderr)
+
+# Created on first import, which main.py does before anything else
+startup_timer = StartupTimer()
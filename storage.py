@@ -0,0 +1,617 @@
+import os
+import json
+import threading
+import time
+import zlib
+from itertools import chain, islice
+from settings import get_data_path
+from safe_io import atomic_write_json, atomic_write_json_array, iter_json_array, load_json
+from due_index import due_timestamp
+
+# Environment variable used to pick the storage backend ("json", "sqlite" or "journal")
+STORAGE_ENV_VAR = "DESKTOP_WIDGET_STORAGE"
+DEFAULT_BACKEND = "json"
+
+_storage = None
+_storage_lock = threading.Lock()
+
+# Records written per transaction when appending a stream of records
+APPEND_BATCH_SIZE = 10000
+
+# Version of the SQLite schema, kept in PRAGMA user_version
+SQLITE_SCHEMA_VERSION = 1
+
+class IdAllocator:
+    """Hands out record ids that sort in the order they were created.
+
+    Like a ULID, an id is a 48-bit millisecond timestamp followed by 80
+    random bits, written as 32 hex digits (the format of older, fully
+    random ids). Ids allocated in the same millisecond, or after the clock
+    went back, increment the random part of the previous id instead, so
+    they stay unique and ordered within a process.
+    """
+    RANDOM_BITS = 80
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def allocate(self, count=1):
+        """Return count new ids in increasing order."""
+        ids = []
+        with self._lock:
+            ms = int(self.clock() * 1000)
+            if ms > self._last_ms:
+                # Start in the lower half so increments practically never carry
+                random_part = int.from_bytes(os.urandom(self.RANDOM_BITS // 8), "big") >> 1
+            else:
+                ms, random_part = self._last_ms, self._last_random + 1
+            for _ in range(count):
+                if random_part >> self.RANDOM_BITS:
+                    ms, random_part = ms + 1, 0  # Borrow the next millisecond
+                ids.append(f"{ms:012x}{random_part:020x}")
+                random_part += 1
+            self._last_ms, self._last_random = ms, random_part - 1
+        return ids
+
+_id_allocator = IdAllocator()
+
+def new_id():
+    """Return a new unique record id."""
+    return _id_allocator.allocate()[0]
+
+def new_ids(count):
+    """Return count new unique record ids, allocated in one call."""
+    return _id_allocator.allocate(count)
+
+def batched(records, size):
+    """Split an iterable into lists of at most size records."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+def ensure_ids(records):
+    """Give every record a unique id, replacing missing or duplicated ones.
+
+    Returns True if any record was changed.
+    """
+    changed = False
+    seen = set()
+    for record in records:
+        if not record.get("id") or record["id"] in seen:
+            record["id"] = new_id()
+            changed = True
+        seen.add(record["id"])
+    return changed
+
+
+class Storage:
+    """Base class for storage backends.
+
+    Collections are passed in full so that backends which can only rewrite
+    whole files still work; keyed backends only look at the changed and
+    deleted records.
+    """
+    name = None
+    # Collections whose commit_* only reads the changed and deleted records
+    keyed_collections = ()
+
+    def load_todos(self):
+        raise NotImplementedError
+
+    def save_todos(self, todos):
+        raise NotImplementedError
+
+    def commit_todos(self, todos, changed=(), deleted=()):
+        """Persist added/updated and deleted todos."""
+        self.save_todos(todos)
+
+    def iter_todos(self):
+        """Yield every todo, without loading them all where the backend allows it."""
+        return iter(self.load_todos())
+
+    def append_todos(self, todos):
+        """Store a stream of new todos (with ids) after the existing ones."""
+        self.save_todos(self.load_todos() + list(todos))
+
+    def load_urls(self):
+        raise NotImplementedError
+
+    def save_urls(self, url_groups):
+        raise NotImplementedError
+
+    def commit_urls(self, url_groups, changed=(), deleted=()):
+        """Persist added/updated and deleted URL groups."""
+        self.save_urls(url_groups)
+
+    def iter_urls(self):
+        """Yield every URL group, without loading them all where the backend allows it."""
+        return iter(self.load_urls())
+
+    def append_urls(self, url_groups):
+        """Store a stream of new URL groups (with ids) after the existing ones."""
+        self.save_urls(self.load_urls() + list(url_groups))
+
+    def load_settings(self):
+        raise NotImplementedError
+
+    def save_settings(self, settings):
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend."""
+        pass
+
+
+class JSONStorage(Storage):
+    """Stores each collection as a JSON file in the data directory."""
+    name = "json"
+
+    def _load(self, filename, default):
+        return load_json(get_data_path(filename), default)
+
+    def _save(self, filename, data):
+        atomic_write_json(get_data_path(filename), data)
+
+    def _iter(self, filename):
+        path = get_data_path(filename)
+        if not os.path.exists(path):
+            return iter(())
+        return iter_json_array(path)
+
+    def _append(self, filename, records):
+        """Rewrite a file with new records after the old ones, streaming both."""
+        atomic_write_json_array(get_data_path(filename), chain(self._iter(filename), records))
+
+    def load_todos(self):
+        return self._load("todos.json", [])
+
+    def save_todos(self, todos):
+        self._save("todos.json", todos)
+
+    def iter_todos(self):
+        return self._iter("todos.json")
+
+    def append_todos(self, todos):
+        self._append("todos.json", todos)
+
+    def load_urls(self):
+        return self._load("urls.json", [])
+
+    def save_urls(self, url_groups):
+        self._save("urls.json", url_groups)
+
+    def iter_urls(self):
+        return self._iter("urls.json")
+
+    def append_urls(self, url_groups):
+        self._append("urls.json", url_groups)
+
+    def load_settings(self):
+        return self._load("settings.json", {})
+
+    def save_settings(self, settings):
+        self._save("settings.json", settings)
+
+
+class SQLiteStorage(Storage):
+    """Stores one row per todo / URL group in a SQLite database (WAL mode)."""
+    name = "sqlite"
+    keyed_collections = ("todos", "urls")
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path("widget.db")
+        self._lock = threading.RLock()
+        import sqlite3  # Only loaded when this backend is used
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._migrate_schema()
+        self.migrate_from_json()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS todos (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    due REAL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_todos_position ON todos(position);
+                CREATE TABLE IF NOT EXISTS url_groups (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_url_groups_position ON url_groups(position);
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _migrate_schema(self):
+        """Bring a database made by an older version up to SQLITE_SCHEMA_VERSION."""
+        with self._lock:
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version >= SQLITE_SCHEMA_VERSION:
+                return
+            with self._conn:
+                self._conn.execute("BEGIN")  # Schema changes are not in an implicit transaction
+                if version < 1:
+                    # Version 1: due holds the parsed timestamp instead of the raw
+                    # string, and the unused index on it is gone
+                    columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(todos)")}
+                    if columns.get("due", "").upper() != "REAL":
+                        self._conn.execute("""
+                            CREATE TABLE todos_v1 (
+                                id TEXT PRIMARY KEY,
+                                position INTEGER NOT NULL,
+                                due REAL,
+                                data TEXT NOT NULL
+                            )
+                        """)
+                        rows = self._conn.execute("SELECT id, position, data FROM todos").fetchall()
+                        self._conn.executemany(
+                            "INSERT INTO todos_v1 (id, position, due, data) VALUES (?, ?, ?, ?)",
+                            [(id_, position, due_timestamp(json.loads(data)), data) for id_, position, data in rows]
+                        )
+                        self._conn.execute("DROP TABLE todos")
+                        self._conn.execute("ALTER TABLE todos_v1 RENAME TO todos")
+                        self._conn.execute("CREATE INDEX idx_todos_position ON todos(position)")
+                    self._conn.execute("DROP INDEX IF EXISTS idx_todos_due")
+                self._conn.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+
+    def migrate_from_json(self, force=False):
+        """Import the JSON data files once, the first time the database is opened."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'json_migrated'"
+            ).fetchone()
+            if row and not force:
+                return False
+
+            source = JSONStorage()
+            with self._conn:
+                self._replace_rows("todos", source.load_todos())
+                self._replace_rows("url_groups", source.load_urls())
+                self._replace_settings(source.load_settings())
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')"
+                )
+            return True
+
+    def _load_rows(self, table):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM {table} ORDER BY position"
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _iter_rows(self, table):
+        """Yield the records of a table in order, a page at a time."""
+        last_position = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT position, data FROM {table} WHERE position > ? ORDER BY position LIMIT ?",
+                    (last_position, APPEND_BATCH_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield json.loads(data)
+            last_position = rows[-1][0]
+
+    def _append_rows(self, table, records):
+        """Insert a stream of new records, one transaction per batch."""
+        for batch in batched(records, APPEND_BATCH_SIZE):
+            with self._lock, self._conn:
+                (position,) = self._conn.execute(
+                    f"SELECT COALESCE(MAX(position), -1) + 1 FROM {table}"
+                ).fetchone()
+                if table == "todos":
+                    self._conn.executemany(
+                        "INSERT INTO todos (id, position, due, data) VALUES (?, ?, ?, ?)",
+                        [(t["id"], position + i, due_timestamp(t), json.dumps(t)) for i, t in enumerate(batch)]
+                    )
+                else:
+                    self._conn.executemany(
+                        f"INSERT INTO {table} (id, position, data) VALUES (?, ?, ?)",
+                        [(r["id"], position + i, json.dumps(r)) for i, r in enumerate(batch)]
+                    )
+
+    def _replace_rows(self, table, records):
+        """Replace every row of a table; must be called inside a transaction."""
+        ensure_ids(records)
+        self._conn.execute(f"DELETE FROM {table}")
+        if table == "todos":
+            self._conn.executemany(
+                "INSERT INTO todos (id, position, due, data) VALUES (?, ?, ?, ?)",
+                [(t["id"], i, due_timestamp(t), json.dumps(t)) for i, t in enumerate(records)]
+            )
+        else:
+            self._conn.executemany(
+                f"INSERT INTO {table} (id, position, data) VALUES (?, ?, ?)",
+                [(r["id"], i, json.dumps(r)) for i, r in enumerate(records)]
+            )
+
+    def _commit_rows(self, table, changed, deleted):
+        """Upsert and delete individual rows in one transaction."""
+        with self._lock, self._conn:
+            for record in deleted:
+                if record.get("id"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (record["id"],))
+
+            for record in changed:
+                if not record.get("id"):
+                    record["id"] = new_id()
+                data = json.dumps(record)
+
+                if table == "todos":
+                    cursor = self._conn.execute(
+                        "UPDATE todos SET due = ?, data = ? WHERE id = ?",
+                        (due_timestamp(record), data, record["id"])
+                    )
+                else:
+                    cursor = self._conn.execute(
+                        f"UPDATE {table} SET data = ? WHERE id = ?",
+                        (data, record["id"])
+                    )
+
+                # New record: append after the current last position
+                if cursor.rowcount == 0:
+                    (position,) = self._conn.execute(
+                        f"SELECT COALESCE(MAX(position), -1) + 1 FROM {table}"
+                    ).fetchone()
+                    if table == "todos":
+                        self._conn.execute(
+                            "INSERT INTO todos (id, position, due, data) VALUES (?, ?, ?, ?)",
+                            (record["id"], position, due_timestamp(record), data)
+                        )
+                    else:
+                        self._conn.execute(
+                            f"INSERT INTO {table} (id, position, data) VALUES (?, ?, ?)",
+                            (record["id"], position, data)
+                        )
+
+    def _replace_settings(self, settings):
+        self._conn.execute("DELETE FROM settings")
+        self._conn.executemany(
+            "INSERT INTO settings (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in settings.items()]
+        )
+
+    def load_todos(self):
+        return self._load_rows("todos")
+
+    def save_todos(self, todos):
+        with self._lock, self._conn:
+            self._replace_rows("todos", todos)
+
+    def commit_todos(self, todos, changed=(), deleted=()):
+        self._commit_rows("todos", changed, deleted)
+
+    def iter_todos(self):
+        return self._iter_rows("todos")
+
+    def append_todos(self, todos):
+        self._append_rows("todos", todos)
+
+    def load_urls(self):
+        return self._load_rows("url_groups")
+
+    def save_urls(self, url_groups):
+        with self._lock, self._conn:
+            self._replace_rows("url_groups", url_groups)
+
+    def commit_urls(self, url_groups, changed=(), deleted=()):
+        self._commit_rows("url_groups", changed, deleted)
+
+    def iter_urls(self):
+        return self._iter_rows("url_groups")
+
+    def append_urls(self, url_groups):
+        self._append_rows("url_groups", url_groups)
+
+    def load_settings(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM settings").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_settings(self, settings):
+        with self._lock, self._conn:
+            self._replace_settings(settings)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JournalStorage(JSONStorage):
+    """Keeps todos.json as a snapshot plus an append-only log of changes.
+
+    Every todo mutation is appended to todos.journal as one checksummed
+    line, so a write costs the same no matter how long the list is. Once
+    the log grows past a threshold it is folded into a new snapshot on a
+    background thread.
+    """
+    name = "journal"
+    keyed_collections = ("todos",)
+    COMPACT_THRESHOLD = 256 * 1024  # bytes
+
+    def __init__(self, compact_threshold=None):
+        self.compact_threshold = compact_threshold or self.COMPACT_THRESHOLD
+        self.journal_path = get_data_path("todos.journal")
+        self.compacting_path = self.journal_path + ".compacting"
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    @staticmethod
+    def _encode(record):
+        """Encode a journal record as "<crc32> <json>\n"."""
+        data = json.dumps(record, separators=(",", ":")).encode()
+        return b"%08x %s\n" % (zlib.crc32(data), data)
+
+    @staticmethod
+    def _read_journal(path, truncate=False):
+        """Read the records of a journal file, dropping a torn or corrupt tail."""
+        records = []
+        if not os.path.exists(path):
+            return records
+
+        good_size = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    checksum, data = line[:-1].split(b" ", 1)
+                    if int(checksum, 16) != zlib.crc32(data):
+                        break
+                    records.append(json.loads(data))
+                except ValueError:
+                    break
+                good_size += len(line)
+
+        # Cut the torn tail off so new records are not appended after it
+        if truncate and good_size < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(good_size)
+        return records
+
+    @staticmethod
+    def _replay(todos, records):
+        """Apply journal records on top of a list of todos."""
+        by_id = {todo["id"]: todo for todo in todos}
+        for record in records:
+            if record.get("op") == "put":
+                by_id[record["todo"]["id"]] = record["todo"]
+            elif record.get("op") == "del":
+                by_id.pop(record["id"], None)
+        return list(by_id.values())
+
+    def _write_snapshot(self, todos):
+        """Write a new snapshot and swap it in atomically."""
+        self._save("todos.json", todos)
+
+    def _wait_for_compactor(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def load_todos(self):
+        self._wait_for_compactor()
+        with self._lock:
+            todos = self._load("todos.json", [])
+            ids_changed = ensure_ids(todos)
+
+            todos = self._replay(todos, self._read_journal(self.compacting_path))
+            todos = self._replay(todos, self._read_journal(self.journal_path, truncate=True))
+
+            # Fold the log in right away if the snapshot needed new ids or
+            # a compaction was interrupted, so the files agree again
+            if ids_changed or os.path.exists(self.compacting_path):
+                self._write_snapshot(todos)
+                for path in (self.compacting_path, self.journal_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+        self._maybe_compact()
+        return todos
+
+    def save_todos(self, todos):
+        self._wait_for_compactor()
+        with self._lock:
+            ensure_ids(todos)
+            self._write_snapshot(todos)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def commit_todos(self, todos, changed=(), deleted=()):
+        records = [{"op": "del", "id": todo["id"]} for todo in deleted if todo.get("id")]
+        for todo in changed:
+            if not todo.get("id"):
+                todo["id"] = new_id()
+            records.append({"op": "put", "todo": todo})
+
+        with self._lock:
+            with open(self.journal_path, 'ab') as f:
+                f.write(b"".join(self._encode(record) for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._maybe_compact()
+
+    def iter_todos(self):
+        # The snapshot alone is out of date until the log is replayed
+        return iter(self.load_todos())
+
+    def append_todos(self, todos):
+        for batch in batched(todos, APPEND_BATCH_SIZE):
+            self.commit_todos(None, changed=batch)
+
+    def _rotate_journal(self):
+        """Move the log aside for compaction if it is over the threshold."""
+        if (not os.path.exists(self.journal_path)
+                or os.path.getsize(self.journal_path) < self.compact_threshold):
+            return False
+
+        # New records go to a fresh log while the old one is folded in
+        os.replace(self.journal_path, self.compacting_path)
+        return True
+
+    def _maybe_compact(self):
+        """Start a background compaction if the log is over the threshold."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            if self._rotate_journal():
+                self._compactor = threading.Thread(target=self._compact, daemon=True)
+                self._compactor.start()
+
+    def _compact(self):
+        """Fold rotated logs into a new snapshot until the log is small again."""
+        while True:
+            try:
+                todos = self._load("todos.json", [])
+                todos = self._replay(todos, self._read_journal(self.compacting_path))
+                self._write_snapshot(todos)
+                os.remove(self.compacting_path)
+            except Exception as e:
+                print(f"Error compacting todo journal: {e}")
+                return
+
+            # The log may have grown past the threshold again meanwhile
+            with self._lock:
+                if not self._rotate_journal():
+                    return
+
+BACKENDS = {
+    JSONStorage.name: JSONStorage,
+    SQLiteStorage.name: SQLiteStorage,
+    JournalStorage.name: JournalStorage,
+}
+
+def get_storage():
+    """Get the process-wide storage backend."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            backend = os.environ.get(STORAGE_ENV_VAR, DEFAULT_BACKEND).lower()
+            if backend not in BACKENDS:
+                print(f"Unknown storage backend '{backend}', using {DEFAULT_BACKEND}")
+                backend = DEFAULT_BACKEND
+            _storage = BACKENDS[backend]()
+        return _storage
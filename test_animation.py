@@ -0,0 +1,58 @@
+from animation import AnimationEngine, ease_in_out_cubic, ease_out_cubic
+
+def make_engine(now):
+    timers = []
+    engine = AnimationEngine(
+        schedule=lambda delay_ms, callback: timers.append(callback) or len(timers),
+        cancel=lambda token: timers.__setitem__(token - 1, None),
+        fps=50,
+        clock=lambda: now[0],
+    )
+    return engine, timers
+
+def test_progress_follows_elapsed_time_and_counts_dropped_frames():
+    """A slow frame skips ahead instead of stretching the animation, and is counted."""
+    now = [10.0]
+    engine, timers = make_engine(now)
+    seen = []
+    done = []
+    engine.start("resize", 200, seen.append, on_done=lambda: done.append(True), easing="linear")
+    assert seen == [0.0]
+
+    now[0] += 0.020
+    timers[-1]()
+    now[0] += 0.100  # The event loop was busy for five frames
+    timers[-1]()
+    assert round(seen[-1], 6) == 0.6
+    assert engine.is_running("resize")
+
+    now[0] += 0.100
+    timers[-1]()
+    assert seen[-1] == 1.0 and done == [True]
+    assert not engine.is_running("resize")
+    assert len(timers) == 3  # Nothing is scheduled once every animation has finished
+
+    stats = engine.stats()[0]
+    assert stats["frames"] == 4
+    assert stats["dropped_frames"] == 8
+    assert stats["worst_frame_ms"] == 100.0
+
+def test_restarting_replaces_and_stop_finishes():
+    now = [0.0]
+    engine, timers = make_engine(now)
+    first, second = [], []
+    engine.start("tab", 100, first.append)
+    engine.start("tab", 100, second.append)
+    now[0] += 0.020
+    timers[-1]()
+    assert len(first) == 1 and len(second) == 2
+
+    engine.stop("tab", finish=True)
+    assert second[-1] == 1.0
+    assert timers[-1] is None
+    assert [stats["name"] for stats in engine.stats()] == ["tab"]
+
+def test_easings_run_from_zero_to_one():
+    for easing in (ease_in_out_cubic, ease_out_cubic):
+        assert easing(0) == 0 and easing(1) == 1
+        assert 0 < easing(0.5) < 1
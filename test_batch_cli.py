@@ -0,0 +1,57 @@
+import io
+import json
+from storage import JSONStorage
+from batch_cli import run_command, EXIT_OK, EXIT_FAILED, EXIT_USAGE
+
+class CountingStorage(JSONStorage):
+    """JSON storage that counts how often the todos are written."""
+    writes = 0
+
+    def commit_todos(self, todos, changed=(), deleted=()):
+        self.writes += 1
+        super().commit_todos(todos, changed, deleted)
+
+def run(argv, backend, stdin=None, monkeypatch=None):
+    if stdin is not None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    out = io.StringIO()
+    code = run_command(argv, storage=backend, out=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_batch_commits_once(monkeypatch, data_dir):
+    """Every command of a batch is applied in memory and written in one commit."""
+    backend = CountingStorage()
+
+    lines = "".join(f'todo add "Todo {i}"\n' for i in range(200)) + "# done\ntodo done 1 2\ntodo rm 3\n"
+    code, results = run(["--batch", "--json"], backend, lines, monkeypatch)
+    assert code == EXIT_OK
+    assert backend.writes == 1
+    assert len(results) == 202 and all(result["ok"] for result in results)
+
+    code, results = run(["todo", "ls", "--done", "--json"], backend)
+    assert [todo["text"] for todo in results[0]["todos"]] == ["Todo 0", "Todo 1"]
+    assert len(backend.load_todos()) == 199
+
+def test_failed_batch_saves_nothing(monkeypatch, data_dir):
+    """A batch with a failing or malformed command is not committed."""
+    backend = CountingStorage()
+
+    code, results = run(["--batch", "--json"], backend, "todo add a\ntodo rm 5\n", monkeypatch)
+    assert code == EXIT_FAILED
+    assert results == [{"ok": False, "error": "line 2: No todo '5'", "committed": False}]
+
+    code, _ = run(["--batch"], backend, "todo add a\ntodo frobnicate\n", monkeypatch)
+    assert code == EXIT_USAGE
+    assert backend.writes == 0 and backend.load_todos() == []
+
+def test_help_in_a_batch_fails_only_that_line(monkeypatch, data_dir, capsys):
+    """--help on a batch line is reported like any bad line instead of exiting."""
+    backend = CountingStorage()
+
+    code, results = run(["--batch", "--json"], backend, "todo add a\ntodo add --help\n", monkeypatch)
+    assert code == EXIT_USAGE
+    assert results == [{"ok": False, "error": "line 2: --help cannot be used in --batch", "committed": False}]
+    assert backend.writes == 0
+
+    assert run_command(["todo", "ls", "-h"], storage=backend) == EXIT_OK
+    assert "usage:" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import datetime
+from day_aggregates import DayAggregates
+from calendar_view import MonthLayoutCache, TodoBuckets, shift_month
+
+TODAY = datetime.date(2030, 1, 15)
+
+def make_calendar(todos):
+    """Get buckets and a month cache whose layouts are the days with todos, like the calendar view."""
+    buckets = TodoBuckets(DayAggregates(clock=lambda: 0))
+    buckets.load(todos)
+
+    def build(year, month, today):
+        return sorted(date.day for date in buckets.by_date if (date.year, date.month) == (year, month))
+
+    return buckets, MonthLayoutCache(build, today=lambda: TODAY)
+
+def edit(buckets, cache, todo):
+    """Re-bucket an edited todo and invalidate its months, as ModernCalendarView.update_todo does."""
+    for date in buckets.update(todo):
+        cache.invalidate(date)
+
+def test_buckets_follow_todo_changes():
+    """Todos are bucketed by due date as they are loaded, added, edited and deleted."""
+    a = {"id": "a", "title": "A", "due_date": "01/10/2030"}
+    b = {"id": "b", "title": "B", "due_date": "01/10/2030"}
+    undated = {"id": "c", "title": "C"}
+    buckets, _ = make_calendar([a, b, undated])
+
+    assert buckets.todos_on(datetime.date(2030, 1, 10)) == [a, b]
+    assert "c" not in buckets.dates
+
+    d = {"id": "d", "title": "D", "due_date": "02/01/2030"}
+    assert buckets.update(d) == (None, datetime.date(2030, 2, 1))
+    assert buckets.todos_on(datetime.date(2030, 2, 1)) == [d]
+
+    a["due_date"] = "02/01/2030"
+    assert buckets.update(a) == (datetime.date(2030, 1, 10), datetime.date(2030, 2, 1))
+    assert buckets.todos_on(datetime.date(2030, 1, 10)) == [b]
+    assert buckets.todos_on(datetime.date(2030, 2, 1)) == [d, a]
+
+    assert buckets.remove(b) == datetime.date(2030, 1, 10)
+    assert datetime.date(2030, 1, 10) not in buckets.by_date
+    assert buckets.remove(undated) is None
+
+def test_moved_due_date_leaves_its_old_month():
+    """Moving a todo to another month redraws both months, even if they were cached."""
+    todo = {"id": "a", "title": "A", "due_date": "01/10/2030"}
+    buckets, cache = make_calendar([todo])
+    cache.prefetch(2030, 1)
+    assert cache.get(2030, 1) == [10]
+    assert cache.get(2030, 3) == []
+
+    todo["due_date"] = "03/05/2030"
+    edit(buckets, cache, todo)
+    assert cache.get(2030, 1) == []
+    assert cache.get(2030, 3) == [5]
+
+    # Clearing the due date removes it from the calendar
+    todo["due_date"] = ""
+    edit(buckets, cache, todo)
+    assert cache.get(2030, 3) == []
+
+    # A deleted todo leaves its cached month, as ModernCalendarView.remove_todo does
+    other = {"id": "b", "title": "B", "due_date": "01/20/2030"}
+    edit(buckets, cache, other)
+    assert cache.get(2030, 1) == [20]
+    cache.invalidate(buckets.remove(other))
+    assert cache.get(2030, 1) == []
+
+def test_prefetch_keeps_a_window_around_the_shown_month():
+    """Months within the radius are built ahead; paging to them is a cache hit."""
+    _, cache = make_calendar([])
+    cache.prefetch(2030, 1)
+    window = {shift_month(2030, 1, offset) for offset in range(-3, 4)}
+    assert set(cache.layouts) == window
+    assert cache.builds == 7
+    assert (2029, 10) in cache.layouts and (2030, 4) in cache.layouts
+
+    # Paging forward and back, as next_month and previous_month do, builds nothing
+    for offset in (1, 2, 3, 2, 1, 0, -1, -2, -3):
+        cache.get(*shift_month(2030, 1, offset))
+    assert cache.builds == 7 and cache.hits == 9
+
+    # Moving on slides the window: only the new edge month is built
+    cache.prefetch(2030, 2)
+    assert cache.builds == 8
+    assert (2029, 10) not in cache.layouts and (2030, 5) in cache.layouts
+
+def test_new_day_drops_every_layout():
+    """The today marker moves at midnight, so cached layouts are rebuilt."""
+    today = [TODAY]
+    cache = MonthLayoutCache(lambda year, month, day: day, today=lambda: today[0])
+    assert cache.get(2030, 1) == TODAY
+    assert cache.get(2030, 1) == TODAY and cache.builds == 1
+
+    today[0] = TODAY + datetime.timedelta(days=1)
+    assert cache.get(2030, 1) == today[0]
+    assert cache.builds == 2
+    assert cache.stats() == {"cached_months": 1, "hits": 1, "builds": 2}
@@ -0,0 +1,50 @@
+import datetime
+import day_aggregates
+from day_aggregates import DayAggregates
+
+def check_counts(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(day_aggregates, "np", None)
+    now = datetime.datetime(2030, 1, 2, 12).timestamp()
+    todos = [
+        {"id": "a", "due_date": "01/01/2030"},
+        {"id": "b", "due_date": "01/01/2030", "completed": True},
+        {"id": "c", "reminder": "2030-01-03T09:00:00"},
+        {"id": "d", "due_date": "not a date"},
+    ]
+    aggregates = DayAggregates(todos, clock=lambda: now)
+
+    assert aggregates.counts(datetime.date(2030, 1, 1)) == (0, 1, 1)
+    assert aggregates.counts(datetime.date(2030, 1, 3)) == (1, 0, 0)
+    assert aggregates.counts(datetime.date(2029, 12, 31)) == (0, 0, 0)
+    assert aggregates.range_counts(datetime.date(2029, 12, 31), datetime.date(2030, 1, 4)) == [
+        (0, 0, 0), (0, 1, 1), (0, 0, 0), (1, 0, 0)
+    ]
+
+    # Time passing makes open todos overdue; edits move them
+    now = datetime.datetime(2030, 1, 4).timestamp()
+    assert aggregates.counts(datetime.date(2030, 1, 3)) == (0, 0, 1)
+    todos[0]["completed"] = True
+    aggregates.update(todos[0])
+    aggregates.remove(todos[2])
+    assert aggregates.total(datetime.date(2030, 1, 1)) == 2
+    assert aggregates.total(datetime.date(2030, 1, 3)) == 0
+
+def test_day_counts(monkeypatch):
+    """Todos are counted per day as open, completed or overdue."""
+    check_counts(monkeypatch, use_numpy=day_aggregates.np is not None)
+
+def test_day_counts_without_numpy(monkeypatch):
+    """The plain Python fallback gives the same counts."""
+    check_counts(monkeypatch, use_numpy=False)
+
+def test_removing_a_row_moves_the_last_one_into_its_place():
+    todos = [{"id": str(day), "due_date": f"01/{day:02d}/2030"} for day in range(1, 5)]
+    aggregates = DayAggregates(todos)
+    aggregates.remove(todos[0])
+    aggregates.update({"id": "2", "due_date": "02/01/2030"})
+    assert [aggregates.date_of(todo) for todo in todos] == [
+        None, datetime.date(2030, 2, 1), datetime.date(2030, 1, 3), datetime.date(2030, 1, 4)
+    ]
+    assert aggregates.total(datetime.date(2030, 1, 1)) == 0
+    assert aggregates.total(datetime.date(2030, 2, 1)) == 1
@@ -0,0 +1,29 @@
+import datetime
+from due_index import DueIndex, parse_due
+
+def test_due_values_in_every_format_are_indexed():
+    """Dates, times and ISO reminders land in one sorted index."""
+    today = datetime.date.today()
+    todos = [
+        {"id": "iso", "reminder": "2030-01-02T09:30:00"},
+        {"id": "date", "due_date": "01/01/2030"},
+        {"id": "time", "due_date": "11:15 PM"},
+        {"id": "bad", "due_date": "someday"},
+        {"id": "none"},
+    ]
+    index = DueIndex(todos)
+    assert len(index) == 3
+    assert parse_due("someday") == (None, False)
+
+    assert [t["id"] for t in index.due_on(datetime.date(2030, 1, 1))] == ["date"]
+    assert [t["id"] for t in index.due_on(today)] == ["time"]
+
+    start = datetime.datetime(2030, 1, 1).timestamp()
+    assert [t["id"] for t in index.due_within(2 * 24 * 60 * 60, now=start)] == ["date", "iso"]
+    assert [t["id"] for t in index.overdue(now=start + 1)] == ["time", "date"]
+
+    todos[1]["due_date"] = "01/03/2030"
+    index.update(todos[1])
+    index.remove(todos[0])
+    assert [t["id"] for t in index.due_within(2 * 24 * 60 * 60, now=start)] == []
+    assert index.due_at(todos[1]) == datetime.datetime(2030, 1, 3).timestamp()
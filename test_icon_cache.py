@@ -0,0 +1,48 @@
+import json
+import os
+from PIL import Image
+from icon_cache import IconAtlas, IconCache
+
+def test_icons_are_decoded_once_and_evicted_lru(tmp_path):
+    """Repeated lookups hit the cache and the least recently used icon is evicted."""
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.png"
+        path.write_bytes(b"")
+        paths.append(str(path))
+
+    loads = []
+    def loader(path, size):
+        if not os.path.exists(path):
+            return None
+        loads.append((path, size))
+        return object()
+
+    cache = IconCache(capacity=2, loader=loader)
+    first = cache.get(paths[0], 24, "dark")
+    assert cache.get(paths[0], 24, "dark") is first
+    cache.get(paths[0], 30, "dark")
+    cache.get(paths[1], 24, "dark")  # evicts paths[0] at size 24
+    cache.get(paths[0], 24, "dark")
+
+    assert len(loads) == 4
+    assert cache.get(paths[2] + ".missing", 24) is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 2
+    assert stats["size"] == 2
+
+def test_atlas_slices_pre_rendered_sizes(tmp_path):
+    """Icons are cut out of the atlas by file name and size."""
+    atlas = Image.new("RGBA", (8, 4), (0, 0, 0, 0))
+    atlas.paste((255, 0, 0, 255), (4, 0, 8, 4))
+    atlas.save(tmp_path / "atlas.png")
+    index = {"image": "atlas.png", "regions": {"icon_dark.png": {"4": [4, 0, 4, 4]}}}
+    (tmp_path / "atlas.json").write_text(json.dumps(index))
+
+    icons = IconAtlas(str(tmp_path / "atlas.json"))
+    icon = icons.crop("assets/icon_dark.png", 4)
+    assert icon.size == (4, 4)
+    assert icon.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert icons.crop("assets/icon_dark.png", 8) is None
+    assert IconAtlas(str(tmp_path / "missing.json")).crop("assets/icon_dark.png", 4) is None
@@ -0,0 +1,64 @@
+import json
+from storage import JSONStorage, SQLiteStorage
+from import_export import import_records, export_records
+
+def test_ndjson_import_skips_invalid_records(data_dir):
+    """Valid records are appended with fresh ids; invalid ones are reported by line."""
+    backend = JSONStorage()
+    backend.save_todos([{"id": "old", "text": "Existing", "completed": False}])
+
+    source = data_dir / "todos.ndjson"
+    source.write_text("\n".join([
+        json.dumps({"text": "One", "completed": "yes", "due_date": "2030-01-02"}),
+        json.dumps({"title": "Two"}),
+        json.dumps({"text": ""}),
+        "[1, 2]",
+        json.dumps({"text": "Three", "reminder": "tomorrow"}),
+    ]))
+    result = import_records(str(source), "todos", storage=backend)
+
+    assert (result.records, result.skipped) == (2, 3)
+    assert [line for line, _ in result.errors] == [3, 4, 5]
+    todos = backend.load_todos()
+    assert [todo["text"] for todo in todos] == ["Existing", "One", "Two"]
+    assert todos[1]["completed"] is True and todos[1]["due_date"] == "2030-01-02"
+    assert len({todo["id"] for todo in todos}) == 3
+
+def test_csv_roundtrip_through_sqlite(data_dir):
+    """URL groups exported to CSV import back with canonical URLs."""
+    backend = SQLiteStorage()
+    backend.save_urls([{"id": "a", "name": "News", "urls": ["http://example.com/", "https://b.org/x"]}])
+
+    target = data_dir / "urls.csv"
+    assert export_records(str(target), "urls", storage=backend).records == 1
+    (data_dir / "more.csv").write_text(target.read_text() + "x,Docs,Docs.Example.com/?utm_source=feed\n")
+
+    result = import_records(str(data_dir / "more.csv"), "urls", storage=backend)
+    assert result.records == 2
+    groups = backend.load_urls()
+    assert [group["name"] for group in groups] == ["News", "News", "Docs"]
+    assert groups[1]["urls"] == groups[0]["urls"] and groups[1]["id"] != "a"
+    assert groups[2]["urls"] == ["http://docs.example.com/"]
+    assert list(backend.iter_urls()) == groups
+    backend.close()
+
+def test_widget_todos_roundtrip_through_ndjson(data_dir):
+    """Exported todos import back with every field, and text to go with the widget's title."""
+    todos = [
+        {"id": "a", "title": "Write report", "completed": False, "due_date": "2030-01-02",
+         "reminder": "2030-01-01T09:00:00", "created": "2029-12-01T10:00:00", "priority": "high"},
+        {"id": "b", "title": "Call back", "completed": True, "created": "2029-12-02T10:00:00"},
+    ]
+    source, target = JSONStorage(), SQLiteStorage()
+    source.save_todos(todos)
+
+    path = str(data_dir / "todos.ndjson")
+    export_records(path, "todos", storage=source)
+    assert import_records(path, "todos", storage=target).records == 2
+
+    imported = target.load_todos()
+    assert len({todo.pop("id") for todo in imported}) == 2
+    for todo, original in zip(imported, todos):
+        del original["id"]
+        assert todo == {**original, "text": original["title"]}
+    target.close()
@@ -0,0 +1,40 @@
+from notification_queue import (
+    NotificationQueue, Notification, DedupCache, PRIORITY_HIGH, PRIORITY_LOW, COALESCE_THRESHOLD
+)
+
+def test_priority_and_coalescing():
+    """High priority comes first, overflow drops the least important, and a burst is summarized."""
+    queue = NotificationQueue()
+    queue.push(Notification("Info", "low", priority=PRIORITY_LOW))
+    for i in range(200):
+        queue.push(Notification("Reminder", f"Todo {i}", notification_id=f"r{i}", kind="reminder"))
+    queue.push(Notification("Alert", "urgent", priority=PRIORITY_HIGH))
+    assert not queue.push(Notification("Reminder", "again", notification_id="r5", kind="reminder"))
+
+    assert queue.pop().message == "urgent"
+    summary = queue.pop()
+    # The low priority entry and the newest reminders made room for the rest
+    assert summary.title == "99 reminders due"
+    assert summary.message == "Todo 0\nTodo 1\nTodo 2\nand 96 more"
+    assert queue.pop() is None
+
+    stats = queue.stats()
+    assert stats["depth"] == 0 and stats["dropped_duplicates"] == 1
+    assert stats["dropped_overflow"] == 202 - queue.max_queued
+    assert stats["coalesced"] == summary.count - 1
+
+def test_small_groups_are_not_coalesced():
+    queue = NotificationQueue()
+    for i in range(COALESCE_THRESHOLD - 1):
+        queue.push(Notification("Reminder", f"Todo {i}", kind="reminder"))
+    assert [queue.pop().message for _ in range(COALESCE_THRESHOLD - 1)] == ["Todo 0", "Todo 1"]
+
+def test_dedup_cache_is_bounded_in_size_and_age():
+    now = [0.0]
+    cache = DedupCache(capacity=2, ttl=10, clock=lambda: now[0])
+    assert cache.add("a") and not cache.add("a")
+    cache.add("b")
+    cache.add("c")
+    assert len(cache) == 2 and cache.add("a")  # "a" was evicted
+    now[0] = 20.0
+    assert cache.add("b") and len(cache) == 1
@@ -0,0 +1,48 @@
+from storage import JSONStorage, SQLiteStorage
+from persistence import PersistenceScheduler
+
+def make_scheduler(backend):
+    timers = []
+    scheduler = PersistenceScheduler(backend, lambda delay_ms, callback: timers.append(callback))
+    return scheduler, timers
+
+def test_rapid_changes_are_coalesced_into_one_write(data_dir):
+    backend = JSONStorage()
+    scheduler, timers = make_scheduler(backend)
+
+    todos = []
+    for number in range(5):
+        todos.append({"id": str(number), "text": f"Todo {number}", "completed": False})
+        scheduler.mark_dirty("todos", todos)
+    assert len(timers) == 1
+    assert backend.load_todos() == []
+
+    timers[0]()
+    scheduler.flush(wait=True)
+    assert backend.load_todos() == todos
+
+    stats = scheduler.stats()
+    assert (stats["marks"], stats["writes"], stats["coalesced_writes"]) == (5, 1, 4)
+    assert stats["flushes"] == 1 and stats["pending_writes"] == 0
+    assert stats["max_flush_ms"] >= stats["avg_flush_ms"] >= 0
+
+def test_flush_writes_pending_changes_without_waiting_for_the_timer(data_dir):
+    backend = SQLiteStorage()
+    backend.save_todos([{"id": "a", "text": "Keep"}, {"id": "b", "text": "Drop"}])
+    scheduler, timers = make_scheduler(backend)
+
+    todos = backend.load_todos()
+    edited = dict(todos[0], text="Kept")
+    scheduler.mark_dirty("todos", [edited], changed=[edited], deleted=[todos[1]])
+    scheduler.update_settings({"position": [10, 20]})
+    assert scheduler.stats()["pending_writes"] == 2
+
+    scheduler.flush(wait=True)
+    assert backend.load_todos() == [edited]
+    assert backend.load_settings() == {"position": [10, 20]}
+
+    # The save window that was already scheduled finds nothing left to write
+    timers[0]()
+    scheduler.flush(wait=True)
+    assert scheduler.stats()["writes"] == 2
+    backend.close()
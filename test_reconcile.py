@@ -0,0 +1,58 @@
+from reconcile import diff, record_signature
+
+def keyed(keys, signatures=None):
+    """Get (key, signature) pairs with each key as its own signature unless given."""
+    signatures = signatures or {}
+    return [(key, signatures.get(key, key)) for key in keys]
+
+def apply(old_keys, patch):
+    """Replay a patch the way a renderer does: drop rows, then place inserted and moved rows in order."""
+    rows = [key for key in old_keys if key not in patch.removed]
+    for index, key in sorted(patch.inserted + patch.moved):
+        if key in rows:
+            rows.remove(key)
+        rows.insert(index, key)
+    return rows
+
+def test_diff_removed_inserted_updated():
+    """Removed and new keys are reported, and kept keys only when their signature changed."""
+    old = keyed("abcd")
+    new = keyed("axcdy", {"c": "c2"})
+    patch = diff(old, new)
+
+    assert patch.removed == ["b"]
+    assert patch.inserted == [(1, "x"), (4, "y")]
+    assert patch.moved == []
+    assert patch.updated == ["c"]
+    assert apply("abcd", patch) == list("axcdy")
+
+def test_diff_moves_fewest_rows():
+    """Only keys off the longest run kept in order are moved."""
+    patch = diff(keyed("abcde"), keyed("eabcd"))
+    assert patch.moved == [(0, "e")]
+    assert patch.updated == []
+
+    patch = diff(keyed("abcde"), keyed("edcba"))
+    assert len(patch.moved) == 4
+    assert apply("abcde", patch) == list("edcba")
+
+    for old, new in (("abcdef", "fbdace"), ("abc", ""), ("", "abc"), ("abcd", "dxcba")):
+        assert apply(old, diff(keyed(old), keyed(new))) == list(new)
+
+def test_diff_duplicate_keys():
+    """A key listed twice is reconciled by its last occurrence in the old list."""
+    patch = diff([("a", 1), ("b", 1), ("a", 2)], [("b", 1), ("a", 2)])
+    assert patch.removed == []
+    assert patch.inserted == []
+    assert patch.updated == []
+
+    patch = diff([("a", 1), ("a", 2)], [("a", 1)])
+    assert patch.updated == ["a"]
+
+def test_record_signature_changes_with_fields():
+    todo = {"id": "1", "text": "Buy milk", "completed": False}
+    signature = record_signature(todo)
+    assert record_signature(dict(todo)) == signature
+
+    todo["completed"] = True
+    assert record_signature(todo) != signature
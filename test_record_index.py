@@ -0,0 +1,71 @@
+from storage import IdAllocator
+from record_index import RecordIndex
+from reminder_scheduler import ReminderScheduler
+
+def test_ids_are_unique_and_ordered():
+    """Ids sort by allocation order, even when the clock stalls or goes back."""
+    now = [1000.0]
+    allocator = IdAllocator(clock=lambda: now[0])
+    ids = allocator.allocate(3)
+    now[0] = 999.0
+    ids += allocator.allocate()
+    now[0] = 1001.0
+    ids += allocator.allocate(2)
+    assert ids == sorted(ids) and len(set(ids)) == 6
+    assert all(len(record_id) == 32 for record_id in ids)
+
+def test_index_add_remove_and_order():
+    """Lookups and deletes go through the id index; the list view follows them."""
+    todos = [{"id": "a", "text": "A"}, {"text": "B"}, {"id": "a", "text": "A again"}]
+    index = RecordIndex(todos)
+    assert len(index) == 3 and len({todo["id"] for todo in index}) == 3
+
+    c = {"text": "C"}
+    index.add(c)
+    assert index.get(c["id"]) is c and index.records[-1] is c
+
+    assert index.remove("a")["text"] == "A"
+    assert index.remove("a") is None
+    assert [todo["text"] for todo in index.records] == ["B", "A again", "C"]
+
+    edited = dict(c, text="C edited")
+    index.replace(edited)
+    assert index.records[-1] is edited
+
+def test_index_list_is_updated_in_place():
+    """Deletes and replacements keep the one list in order without rebuilding it."""
+    import random
+    from record_index import REINDEX_AFTER
+
+    rng = random.Random(4)
+    index = RecordIndex([{"id": f"{i:04}"} for i in range(300)])
+    records = index.records
+    expected = list(records)
+
+    for step in range(4 * REINDEX_AFTER):
+        record = rng.choice(expected)
+        if step % 3:
+            assert index.remove(record["id"]) is record
+            expected.remove(record)
+        else:
+            edited = dict(record, step=step)
+            index.replace(edited)
+            expected[expected.index(record)] = edited
+        if step % 10 == 0:
+            added = {"text": str(step)}
+            index.add(added)
+            expected.append(added)
+        assert index.records is records
+        assert records == expected
+
+def test_reminders_resolve_todos_by_id():
+    """With a lookup, a due reminder fires for the current record and skips deleted ones."""
+    index = RecordIndex([{"id": "a", "reminder": "2030-01-01T09:00:00"}, {"id": "b", "reminder": "2030-01-01T09:00:00"}])
+    scheduler = ReminderScheduler(clock=lambda: 1e12, lookup=index.get)
+    scheduler.load(index)
+
+    edited = dict(index.get("a"), text="edited")
+    index.replace(edited)
+    index.remove("b")
+    assert scheduler.pop_due() == [edited]
+    assert edited["notified"] is True
@@ -0,0 +1,45 @@
+from datetime import datetime
+from reminder_scheduler import ReminderScheduler
+
+def at(hour, minute=0):
+    """Get a fixed local time as an ISO string."""
+    return datetime(2030, 1, 1, hour, minute).isoformat()
+
+def test_reminders_fire_in_order_once():
+    """The single timer is armed for the earliest reminder and late ones still fire."""
+    now = [datetime(2030, 1, 1, 9).timestamp()]
+    timers = []
+    fired = []
+
+    scheduler = ReminderScheduler(
+        on_due=fired.extend,
+        schedule=lambda delay_ms, callback: timers.append((delay_ms, callback)) or len(timers),
+        cancel=lambda token: None,
+        clock=lambda: now[0],
+    )
+    todos = [
+        {"id": "late", "reminder": at(8)},
+        {"id": "b", "reminder": at(11)},
+        {"id": "a", "reminder": at(10)},
+        {"id": "done", "reminder": at(8), "notified": True},
+        {"id": "none"},
+    ]
+    scheduler.load(todos)
+    assert len(scheduler) == 3
+    assert timers[-1][0] == 0  # the missed reminder fires right away
+
+    timers[-1][1]()
+    assert [t["id"] for t in fired] == ["late"]
+    assert todos[0]["notified"] is True
+
+    # Rescheduling and deleting update the heap without a full scan
+    todos[1]["reminder"] = at(9, 30)
+    scheduler.update(todos[1])
+    scheduler.remove(todos[2])
+    assert scheduler.next_due() == datetime(2030, 1, 1, 9, 30).timestamp()
+
+    now[0] = datetime(2030, 1, 1, 12).timestamp()
+    timers[-1][1]()
+    assert [t["id"] for t in fired] == ["late", "b"]
+    assert scheduler.next_due() is None
+    assert scheduler.pop_due() == []
@@ -0,0 +1,146 @@
+import json
+import storage
+from storage import JSONStorage, SQLiteStorage
+
+def test_json_roundtrip(data_dir):
+    """The JSON backend keeps the existing file layout."""
+    backend = JSONStorage()
+
+    todos = [{"title": "Write report", "completed": False}]
+    backend.commit_todos(todos, changed=todos)
+    backend.save_settings({"autostart": True})
+
+    assert json.loads((data_dir / "todos.json").read_text()) == todos
+    assert backend.load_todos() == todos
+    assert backend.load_settings() == {"autostart": True}
+
+def test_sqlite_single_row_updates(data_dir):
+    """Committing changes only touches the affected rows and keeps order."""
+    backend = SQLiteStorage()
+
+    todos = []
+    for i in range(3):
+        todo = {"title": f"Todo {i}", "completed": False}
+        todos.append(todo)
+        backend.commit_todos(todos, changed=[todo])
+
+    todos[1]["completed"] = True
+    backend.commit_todos(todos, changed=[todos[1]])
+    removed = todos.pop(0)
+    backend.commit_todos(todos, deleted=[removed])
+
+    loaded = backend.load_todos()
+    assert [t["title"] for t in loaded] == ["Todo 1", "Todo 2"]
+    assert loaded[0]["completed"] is True
+    assert all(t.get("id") for t in loaded)
+    backend.close()
+
+def test_sqlite_converts_old_due_column(data_dir):
+    """Databases with the raw due string column are migrated to parsed timestamps."""
+    import sqlite3
+    todo = {"id": "a", "title": "Old", "reminder": "2030-01-01T09:00:00"}
+    conn = sqlite3.connect(str(data_dir / "widget.db"))
+    conn.executescript(f"""
+        CREATE TABLE todos (id TEXT PRIMARY KEY, position INTEGER NOT NULL, due TEXT, data TEXT NOT NULL);
+        CREATE INDEX idx_todos_due ON todos(due);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO meta VALUES ('json_migrated', '1');
+        INSERT INTO todos VALUES ('a', 0, '{todo["reminder"]}', '{json.dumps(todo)}');
+    """)
+    conn.close()
+
+    backend = SQLiteStorage()
+    assert backend.load_todos() == [todo]
+    conn = backend._conn
+    assert conn.execute("PRAGMA user_version").fetchone() == (storage.SQLITE_SCHEMA_VERSION,)
+    assert conn.execute("SELECT typeof(due) FROM todos").fetchone() == ("real",)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_todos_due'").fetchone() is None
+    backend.close()
+
+def test_sqlite_migrates_json_once(data_dir):
+    """Existing JSON files are imported the first time the database opens."""
+    todos = [{"id": "1", "text": "a"}, {"id": "1", "text": "b"}]
+    (data_dir / "todos.json").write_text(json.dumps(todos))
+    (data_dir / "urls.json").write_text(json.dumps([{"name": "News", "urls": ["example.com"]}]))
+    (data_dir / "settings.json").write_text(json.dumps({"theme": "dark"}))
+
+    backend = SQLiteStorage()
+    loaded = backend.load_todos()
+    assert [t["text"] for t in loaded] == ["a", "b"]
+    assert len({t["id"] for t in loaded}) == 2  # duplicate ids are replaced
+    assert backend.load_urls()[0]["name"] == "News"
+    assert backend.load_settings() == {"theme": "dark"}
+
+    # Later changes to the JSON files are not imported again
+    (data_dir / "todos.json").write_text("[]")
+    backend.close()
+    assert len(SQLiteStorage().load_todos()) == 2
+
+def test_journal_replay_and_torn_tail(data_dir):
+    """Journal records are replayed on load and a torn last record is dropped."""
+    backend = storage.JournalStorage()
+
+    todos = [{"title": "a"}, {"title": "b"}]
+    backend.save_todos(todos)
+    todos[0]["completed"] = True
+    backend.commit_todos(todos, changed=[todos[0]])
+    removed = todos.pop()
+    backend.commit_todos(todos, deleted=[removed])
+    snapshot_size = (data_dir / "todos.json").stat().st_size
+
+    # Simulate a crash in the middle of appending a record
+    with open(data_dir / "todos.journal", "ab") as f:
+        f.write(b'0badc0de {"op":"put","todo":{"id":"x"')
+
+    loaded = storage.JournalStorage().load_todos()
+    assert loaded == [{"title": "a", "completed": True, "id": todos[0]["id"]}]
+    assert (data_dir / "todos.json").stat().st_size == snapshot_size
+    assert (data_dir / "todos.journal").read_bytes().endswith(b"\n")
+
+def test_journal_compaction(data_dir):
+    """The log is folded into the snapshot once it passes the threshold."""
+    backend = storage.JournalStorage(compact_threshold=200)
+
+    todos = []
+    for i in range(20):
+        todo = {"title": f"Todo {i}"}
+        todos.append(todo)
+        backend.commit_todos(todos, changed=[todo])
+    backend._wait_for_compactor()
+
+    journal = data_dir / "todos.journal"
+    assert not journal.exists() or journal.stat().st_size < 200
+    assert [t["title"] for t in backend.load_todos()] == [t["title"] for t in todos]
+
+def test_json_falls_back_to_backup(data_dir):
+    """A truncated data file is recovered from the newest readable backup."""
+    backend = JSONStorage()
+
+    backend.save_urls([{"name": "v1", "urls": []}])
+    backend.save_urls([{"name": "v2", "urls": []}])
+    (data_dir / "urls.json").write_text("")
+
+    assert backend.load_urls() == [{"name": "v1", "urls": []}]
+    assert not list(data_dir.glob("*.tmp"))
+
+def test_atomic_write_keeps_file_mode(tmp_path):
+    """Saving over a data file keeps its permissions; new files get the default ones."""
+    import os
+    import stat
+    from safe_io import _UMASK, atomic_write_json
+    from warm_start import save_snapshot
+
+    path = tmp_path / "todos.json"
+    atomic_write_json(str(path), [])
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~_UMASK
+
+    for mode in (0o644, 0o640):
+        os.chmod(path, mode)
+        atomic_write_json(str(path), [{"title": "x"}])
+        assert stat.S_IMODE(path.stat().st_mode) == mode
+
+    snapshot = tmp_path / "startup.snapshot"
+    snapshot.write_bytes(b"")
+    os.chmod(snapshot, 0o644)
+    save_snapshot({"position": (0, 0)}, str(snapshot))
+    assert stat.S_IMODE(snapshot.stat().st_mode) == 0o644
@@ -0,0 +1,53 @@
+from theme_engine import ThemeEngine, PALETTES
+
+class FakeWidget:
+    """Just enough of a Tk widget for the restyle pass."""
+    def __init__(self, options, children=()):
+        self.options = dict(options)
+        self.children = {str(index): child for index, child in enumerate(children)}
+        self.themed = 0
+
+    def keys(self):
+        return list(self.options)
+
+    def cget(self, option):
+        return self.options[option]
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def apply_theme(self):
+        self.themed += 1
+
+class FakeLabel(FakeWidget):
+    """Widgets of one class share their options, like Tk's."""
+
+def test_switching_restyles_plain_and_registered_widgets_in_one_pass():
+    dark, light = PALETTES["dark"], PALETTES["light"]
+    theme = ThemeEngine("dark")
+    assert theme.colors("tab", True) == (dark["accent_color"], dark["text_color"])
+
+    label = FakeLabel({"bg": dark["card_bg"], "fg": dark["text_color"], "relief": "flat"})
+    custom = FakeWidget({"bg": "#123456"})
+    root = FakeWidget({"bg": dark["bg_color"]}, [FakeWidget({"bg": dark["card_bg"]}, [label, custom])])
+    registered = FakeWidget({})
+    theme.register(registered)
+
+    theme.set_mode("light", root)
+    assert theme.name == "light" and theme.card_bg == light["card_bg"]
+    assert theme.colors("button", "normal") == (light["card_bg"], light["secondary_text"])
+    assert root.options["bg"] == light["bg_color"]
+    assert label.options == {"bg": light["card_bg"], "fg": light["text_color"], "relief": "flat"}
+    assert custom.options["bg"] == "#123456"
+    assert registered.themed == 1
+
+    # Each palette gives every role its own color, so switching back is exact
+    theme.set_mode("dark", root)
+    assert label.options["fg"] == dark["text_color"] and root.options["bg"] == dark["bg_color"]
+    assert theme.set_mode("dark", root) == 0.0
+    assert registered.themed == 2 and theme.stats()["restyles"] == 2
+
+def test_palette_colors_are_unique_per_role():
+    """A restyle maps colors by value, which needs one role per color in a palette."""
+    for palette in PALETTES.values():
+        assert len(set(palette.values())) == len(palette)
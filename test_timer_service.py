@@ -0,0 +1,29 @@
+from timer_service import MinuteTimer, ms_until_next_minute, MINUTE_MS, BOUNDARY_SLACK_MS
+
+def test_wakes_once_per_minute_boundary():
+    """The timer is armed for just after the next boundary, and not at all while paused."""
+    now = [1000 * 60 + 45.5]  # 45.5 s into a minute
+    timers = []
+    seen = []
+    timer = MinuteTimer(
+        schedule=lambda delay_ms, callback: timers.append((delay_ms, callback)) or len(timers),
+        cancel=lambda token: timers.__setitem__(token - 1, None),
+        clock=lambda: now[0],
+        monotonic=lambda: now[0],
+    )
+    timer.add_listener(seen.append)
+    timer.start()
+    assert seen == [now[0]]
+    assert timers[-1][0] == 14500 + BOUNDARY_SLACK_MS
+
+    now[0] += timers[-1][0] / 1000
+    timers[-1][1]()
+    assert timers[-1][0] == MINUTE_MS
+    assert ms_until_next_minute(now[0]) == MINUTE_MS
+
+    timer.pause()
+    assert timers[-1] is None
+    now[0] += 3600
+    timer.resume()
+    assert len(seen) == 3 and timer.wakeups == 3
+    assert 2.5 < timer.wakeups_per_hour() < 3.5
@@ -0,0 +1,36 @@
+import pytest
+from url_index import URLIndex, canonicalize_url, canonicalize_urls, canonicalize_groups
+
+def test_canonicalize_url():
+    """Scheme, host case, default ports, trailing slashes and tracking parameters are normalized."""
+    assert canonicalize_url(" Example.COM ") == "http://example.com/"
+    assert canonicalize_url("HTTPS://Example.com:443/Docs/") == "https://example.com/Docs"
+    assert canonicalize_url("http://example.com:8080/a?utm_source=x&q=1&fbclid=2#top") == "http://example.com:8080/a?q=1#top"
+    assert canonicalize_url("https://example.com/?q=a%20b") == "https://example.com/?q=a%20b"
+    assert canonicalize_url("google.com/url?q=https://x.org") == "http://google.com/url?q=https://x.org"
+    for bad in ["", "not a url", "ftp://example.com", "http://"]:
+        with pytest.raises(ValueError):
+            canonicalize_url(bad)
+
+def test_canonicalize_urls_reports_invalid_and_repeated():
+    urls, invalid, repeated = canonicalize_urls(["example.com", "", "http://EXAMPLE.com/", "bad url", "b.org"])
+    assert urls == ["http://example.com/", "http://b.org/"]
+    assert invalid == ["bad url"]
+    assert repeated == ["http://example.com/"]
+
+def test_index_finds_groups_and_duplicates():
+    groups = [
+        {"id": "a", "name": "A", "urls": ["example.com", "b.org/"]},
+        {"id": "b", "name": "B", "urls": ["http://example.com/"]},
+    ]
+    assert canonicalize_groups(groups) == [groups[0]]
+    assert canonicalize_groups(groups) == []
+
+    index = URLIndex(groups)
+    assert index.groups_containing("http://example.com/") == {"a", "b"}
+    assert index.groups_containing("EXAMPLE.com") == {"a", "b"}
+    assert index.duplicates(["http://b.org/", "http://new.org/"], exclude="b") == {"http://b.org/": {"a"}}
+
+    index.remove(groups[0])
+    assert index.groups_containing("http://example.com/") == {"b"}
+    assert index.groups_containing("http://b.org/") == set()
@@ -0,0 +1,48 @@
+import threading
+import time
+from url_launcher import URLLauncher
+
+def test_launch_is_bounded_and_collects_failures():
+    """No more than `concurrency` opens run at once and failures end up in one summary."""
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    opened = []
+
+    def opener(url):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        if "bad" in url:
+            raise RuntimeError("refused")
+        opened.append(url)
+
+    launcher = URLLauncher(concurrency=3, spacing_ms=0, opener=opener)
+    urls = [f"http://example.com/{i}" for i in range(10)] + ["https://bad.example.com"]
+    job = launcher.launch(urls, "Group")
+    assert launcher.wait(job, timeout=5)
+
+    assert peak[0] <= 3
+    assert len(opened) == 10
+    assert job.failures == [("https://bad.example.com", "refused")]
+    assert "Opened 10 of 11 URLs in 'Group'; 1 failed" in job.summary()
+
+    events = job.poll()
+    assert [kind for kind, _ in events].count("progress") == 11
+    assert events[-1][0] == "done"
+
+    stats = launcher.stats()
+    assert stats["launched"] == 10 and stats["failed"] == 1
+    assert stats["max_latency_ms"] >= stats["avg_latency_ms"] > 0
+
+def test_opens_are_spaced():
+    """Consecutive opens start at least spacing_ms apart."""
+    started = []
+    launcher = URLLauncher(concurrency=4, spacing_ms=20, opener=lambda url: started.append(time.monotonic()))
+    job = launcher.launch(["http://a.com", "http://b.com", "http://c.com"])
+    assert launcher.wait(job, timeout=5)
+    started.sort()
+    assert all(b - a >= 0.015 for a, b in zip(started, started[1:]))
@@ -0,0 +1,79 @@
+from virtual_list_tk import RowPool
+
+class FakeRow:
+    def __init__(self):
+        self.item = None
+        self.y = None  # None while hidden
+
+def make_pool(viewport_height=250, row_height=100, overscan=1):
+    """Get a row pool over fake rows, and a log of the rows it bound."""
+    bound = []
+    def bind_row(row, item):
+        row.item = item
+        bound.append(item["id"])
+    def place_row(row, y):
+        row.y = y
+    def hide_row(row):
+        row.y = None
+
+    pool = RowPool(row_height, FakeRow, bind_row, place_row, hide_row, overscan=overscan)
+    pool.viewport_height = viewport_height
+    return pool, bound
+
+def shown(pool):
+    """Get the ids of the placed rows by position."""
+    return sorted((row.y, row.item["id"]) for row in pool.rows if row.y is not None)
+
+def test_rows_cover_only_the_viewport():
+    """Only the visible rows plus the overscan are built, however long the list."""
+    pool, bound = make_pool()
+    pool.set_items([{"id": str(i)} for i in range(1000)])
+
+    # Up to 4 rows of 100 px fit in 250 px while scrolling, plus one overscan row on each side
+    assert shown(pool) == [(y * 100, str(y)) for y in range(6)]
+    assert len(pool.rows) == 6
+    assert bound == [str(i) for i in range(6)]
+
+def test_scrolling_recycles_rows():
+    """Rows that scroll out of view are rebound to the rows scrolling in."""
+    pool, bound = make_pool()
+    pool.set_items([{"id": str(i)} for i in range(1000)])
+    rows = list(pool.rows)
+    bound.clear()
+
+    assert pool.scroll_to(350)
+    assert pool.rows == rows
+    assert shown(pool) == [(y * 100 - 350, str(y)) for y in range(2, 8)]
+    assert sorted(bound) == ["6", "7"]  # Rows that stayed in view are only moved
+
+    # The offset is clamped to the end of the list
+    assert pool.scroll_to(10 ** 9)
+    assert pool.offset == 1000 * 100 - 250
+    assert shown(pool)[-1] == (999 * 100 - pool.offset, "999")
+    assert not pool.scroll_to(10 ** 9)
+
+def test_only_changed_items_are_rebound():
+    """Moved items keep their rows; changed ones, including nested edits, are rebound."""
+    pool, bound = make_pool()
+    items = [{"id": str(i), "urls": [f"https://{i}.example"]} for i in range(3)]
+    pool.set_items(items)
+    row_of = {row.item["id"]: row for row in pool.rows if row.y is not None}
+    bound.clear()
+
+    # Reordering only moves rows
+    pool.set_items([items[2], items[0], items[1]])
+    assert bound == []
+    assert row_of["2"].y == 0 and row_of["0"].y == 100
+
+    # Editing a nested value in place rebinds that row
+    items[1]["urls"].append("https://more.example")
+    pool.set_items([items[2], items[0], items[1]])
+    assert bound == ["1"]
+
+    # A removed item's row is hidden and freed
+    pool.set_items([items[2], items[1]])
+    assert row_of["0"].y is None
+    assert "0" not in pool.slot_by_key
+
+    pool.layout(rebind=True)
+    assert sorted(bound[1:]) == ["1", "2"]
@@ -0,0 +1,16 @@
+from warm_start import SNAPSHOT_ROWS, build_view_model, load_snapshot, save_snapshot
+
+def test_snapshot_roundtrip(tmp_path):
+    """The view model is saved compactly and unreadable snapshots are ignored."""
+    path = str(tmp_path / "startup.snapshot")
+    todos = [{"id": str(i), "title": f"Todo {i}", "completed": i % 2 == 0} for i in range(20)]
+    save_snapshot(build_view_model([{"id": "u", "name": "News", "urls": []}], todos, 10, 20), path)
+
+    snapshot = load_snapshot(path)
+    assert snapshot["position"] == (10, 20)
+    assert snapshot["todos"] == todos[:SNAPSHOT_ROWS]
+    assert snapshot["urls"][0]["name"] == "News"
+
+    (tmp_path / "startup.snapshot").write_bytes(b"\x00garbage")
+    assert load_snapshot(path) is None
+    assert load_snapshot(str(tmp_path / "missing")) is None
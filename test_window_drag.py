@@ -0,0 +1,45 @@
+from window_drag import DragController, snap_position, MIN_VISIBLE
+
+SCREEN = (0, 0, 1920, 1080)
+
+def test_snaps_to_screen_edges_and_nearby_windows():
+    assert snap_position(7, 500, (400, 70), SCREEN) == (0, 500)
+    assert snap_position(1515, 1005, (400, 70), SCREEN) == (1520, 1010)
+    assert snap_position(700, 500, (400, 70), SCREEN) == (700, 500)
+
+    # Right next to another window, but only where the two overlap vertically
+    other = (1000, 480, 300, 200)
+    assert snap_position(595, 500, (400, 70), SCREEN, [other]) == (600, 500)
+    assert snap_position(595, 900, (400, 70), SCREEN, [other]) == (595, 900)
+
+    # Part of the window always stays on screen
+    assert snap_position(5000, -50, (400, 70), SCREEN) == (1920 - MIN_VISIBLE, 0)
+
+def test_motion_is_coalesced_to_one_move_per_frame():
+    frames = []
+    moves = []
+    measured = []
+    drag = DragController(
+        schedule=lambda delay_ms, callback: frames.append(callback),
+        move=lambda x, y: moves.append((x, y)),
+        measure_screen=lambda: measured.append(1) or SCREEN,
+    )
+    drag.begin(150, 150, 100, 100, (400, 70))
+    for step in range(1, 9):
+        drag.motion(150 + step * 10, 150 + step * 5)
+    assert len(frames) == 1 and moves == []
+
+    frames.pop()()
+    assert moves == [(180, 140)]
+
+    drag.motion(300, 300)
+    assert drag.end() == (250, 250)
+    assert moves[-1] == (250, 250)
+    assert drag.stats()["motion_events"] == 9
+
+    # The screen is measured again only after invalidate()
+    drag.begin(0, 0, 250, 250, (400, 70))
+    assert drag.end() is None
+    drag.invalidate()
+    drag.begin(0, 0, 250, 250, (400, 70))
+    assert len(measured) == 2
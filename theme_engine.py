@@ -0,0 +1,179 @@
+import time
+import weakref
+
+# Colors of each theme mode, by role. Within a palette every role has its
+# own color, so a restyle can tell a widget's role from its color
+PALETTES = {
+    "dark": {
+        "bg_color": "#1a1e2e",  # Dark navy background
+        "card_bg": "#242842",  # Slightly lighter navy for cards
+        "text_color": "#ffffff",  # White text
+        "secondary_text": "#8f96dd",  # Light purple/blue for secondary text
+        "accent_color": "#6978ff",  # Bright purple accent
+        "hover_color": "#535db2",  # Darker purple for hover
+        "border_color": "#323761",  # Border color for cards
+        "highlight_color": "#4b54a6",  # Highlight color for selected items
+        "error_color": "#ff5f5f",  # Red for errors/alerts
+        "success_color": "#5fd587",  # Green for success indicators
+        "shadow_color": "#101425",
+    },
+    "light": {
+        "bg_color": "#f8f9fa",  # Light background
+        "card_bg": "#ffffff",  # White for cards
+        "text_color": "#1a1e2e",  # Dark navy text
+        "secondary_text": "#5f63aa",  # Darker purple/blue for secondary text
+        "accent_color": "#6978ff",  # Same purple accent
+        "hover_color": "#535db2",  # Darker purple for hover
+        "border_color": "#e9ecef",  # Light gray border
+        "highlight_color": "#d8dbff",  # Light purple highlight
+        "error_color": "#ff5f5f",  # Red for errors/alerts
+        "success_color": "#5fd587",  # Green for success indicators
+        "shadow_color": "#e1e4e8",
+    },
+}
+
+# Palette roles of the (background, foreground) colors of widgets in each state
+STATE_COLORS = {
+    "button": {
+        "normal": ("card_bg", "secondary_text"),
+        "hover": ("card_bg", "accent_color"),
+        "active": ("card_bg", "accent_color"),
+    },
+    "text_button": {
+        "normal": ("bg_color", "accent_color"),
+        "hover": ("bg_color", "accent_color"),
+        "active": ("bg_color", "accent_color"),
+    },
+    "tab": {
+        True: ("accent_color", "text_color"),
+        False: ("card_bg", "secondary_text"),
+    },
+}
+
+# Options of plain Tk widgets that hold theme colors
+COLOR_OPTIONS = (
+    "bg", "fg", "activebackground", "activeforeground", "selectcolor",
+    "highlightbackground", "troughcolor", "insertbackground",
+)
+
+class ThemeEngine:
+    """Theme colors, fonts and per-state color tables, switchable while the UI runs.
+
+    Palette colors are attributes of the engine, so widgets holding it
+    always read the current ones. Widgets that draw canvas items or cache
+    colors register and implement apply_theme(). set_mode() swaps the
+    palette in place and restyles everything in one pass: the colors of
+    plain widgets are mapped from the old palette to the new one, then
+    every registered widget redraws, and Tk repaints once when idle.
+    """
+    font_family = "Helvetica"
+    font_sizes = ()  # Sizes whose fonts are created together on first use
+
+    def __init__(self, mode="dark"):
+        self.name = None
+        self.palette = {}
+        self.state_colors = {}
+        self._fonts = {}
+        self._widgets = weakref.WeakSet()
+        self._class_options = {}  # widget class -> the COLOR_OPTIONS it has
+
+        # Counters
+        self.restyles = 0
+        self.last_restyle_ms = 0.0
+        self.last_restyled_widgets = 0
+
+        self._load(mode)
+
+    def _load(self, mode):
+        if mode not in PALETTES:
+            raise ValueError(f"Unknown theme '{mode}' (expected one of {', '.join(PALETTES)})")
+        self.name = mode
+        self.palette = PALETTES[mode]
+        for role, color in self.palette.items():
+            setattr(self, role, color)
+        self.state_colors = {
+            table: {state: (self.palette[bg], self.palette[fg]) for state, (bg, fg) in states.items()}
+            for table, states in STATE_COLORS.items()
+        }
+
+    def colors(self, table, state):
+        """Get the (background, foreground) colors of a widget state, e.g. ("button", "hover")."""
+        return self.state_colors[table][state]
+
+    def get_font(self, size, bold=False):
+        """Get the named Tk font of a size and weight, created once and shared."""
+        if not self._fonts:
+            for font_size in self.font_sizes:
+                self._create_font(font_size, False)
+                self._create_font(font_size, True)
+        key = (size, bold)
+        return self._fonts.get(key) or self._create_font(size, bold)
+
+    def _create_font(self, size, bold):
+        from tkinter import font
+        self._fonts[(size, bold)] = font.Font(
+            family=self.font_family, size=size, weight="bold" if bold else "normal"
+        )
+        return self._fonts[(size, bold)]
+
+    def register(self, widget):
+        """Have widget.apply_theme() called whenever the theme changes."""
+        self._widgets.add(widget)
+
+    def set_mode(self, mode, root=None):
+        """Switch to another palette and restyle the widgets under root; returns the milliseconds taken."""
+        if mode == self.name:
+            return 0.0
+        started = time.perf_counter()
+        old = self.palette
+        self._load(mode)
+
+        mapping = {color: self.palette[role] for role, color in old.items()}
+        count = self._restyle_tree(root, mapping) if root is not None else 0
+
+        from tkinter import TclError
+        for widget in list(self._widgets):
+            try:
+                widget.apply_theme()
+            except TclError:
+                self._widgets.discard(widget)  # Destroyed but not yet collected
+            count += 1
+
+        self.restyles += 1
+        self.last_restyled_widgets = count
+        self.last_restyle_ms = (time.perf_counter() - started) * 1000
+        return self.last_restyle_ms
+
+    def _restyle_tree(self, widget, mapping):
+        """Map the colors of widget and its descendants to the new palette."""
+        count = 0
+        stack = [widget]
+        while stack:
+            widget = stack.pop()
+            stack.extend(widget.children.values())
+            options = self._class_options.get(type(widget))
+            if options is None:
+                try:
+                    keys = set(widget.keys())
+                except Exception:
+                    keys = set()  # e.g. ttk widgets, styled through ttk.Style
+                options = self._class_options[type(widget)] = [o for o in COLOR_OPTIONS if o in keys]
+            changes = {}
+            for option in options:
+                color = str(widget.cget(option))
+                if mapping.get(color, color) != color:
+                    changes[option] = mapping[color]
+            if changes:
+                widget.configure(**changes)
+                count += 1
+        return count
+
+    def stats(self):
+        return {
+            "theme": self.name,
+            "registered_widgets": len(self._widgets),
+            "fonts": len(self._fonts),
+            "restyles": self.restyles,
+            "last_restyle_ms": round(self.last_restyle_ms, 2),
+            "last_restyled_widgets": self.last_restyled_widgets,
+        }
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+
+MINUTE_MS = 60000
+
+# Wake a little after the boundary, so a timer that fires early still sees the new minute
+BOUNDARY_SLACK_MS = 20
+
+# Set to print timer wakeup statistics when the widget quits
+REPORT_ENV_VAR = "DESKTOP_WIDGET_TIMER_REPORT"
+
+def ms_until_next_minute(now):
+    """Get the milliseconds from a wall clock time until just after the next minute starts."""
+    return MINUTE_MS - int(now * 1000) % MINUTE_MS + BOUNDARY_SLACK_MS
+
+class MinuteTimer:
+    """Calls its listeners once at each minute boundary of the wall clock.
+
+    One timer is armed for the next boundary instead of polling every
+    second. While paused, e.g. when the widget is hidden, no timer is
+    armed at all; resuming calls the listeners right away to catch up.
+    """
+    def __init__(self, schedule, cancel, clock=time.time, monotonic=time.monotonic):
+        self.schedule = schedule  # schedule(delay_ms, callback) -> token, e.g. Tk.after
+        self.cancel = cancel  # cancel(token), e.g. Tk.after_cancel
+        self.clock = clock
+        self.monotonic = monotonic
+        self.listeners = []  # listener(now)
+        self.paused = False
+        self._job = None
+
+        # Counters
+        self.wakeups = 0
+        self.paused_count = 0
+        self._started = monotonic()
+
+    def add_listener(self, listener):
+        """Call listener(now) at every minute boundary."""
+        self.listeners.append(listener)
+
+    def start(self):
+        """Call the listeners now and then at every minute boundary."""
+        self._fire()
+
+    def _fire(self):
+        self._job = None
+        self.wakeups += 1
+        now = self.clock()
+        for listener in self.listeners:
+            listener(now)
+        self._arm(now)
+
+    def _arm(self, now):
+        if not self.paused and self._job is None:
+            self._job = self.schedule(ms_until_next_minute(now), self._fire)
+
+    def pause(self):
+        """Stop waking up until resume() is called."""
+        if not self.paused:
+            self.paused = True
+            self.paused_count += 1
+            self._cancel()
+
+    def resume(self):
+        """Catch up on missed minutes and start waking up again."""
+        if self.paused:
+            self.paused = False
+            self._fire()
+
+    def _cancel(self):
+        if self._job is not None:
+            self.cancel(self._job)
+            self._job = None
+
+    def stop(self):
+        """Cancel the pending wakeup."""
+        self._cancel()
+
+    def wakeups_per_hour(self):
+        """Get the average number of wakeups per hour since the timer was created."""
+        hours = (self.monotonic() - self._started) / 3600
+        return self.wakeups / hours if hours > 0 else 0.0
+
+    def stats(self):
+        """Get wakeup counters."""
+        return {
+            "wakeups": self.wakeups,
+            "wakeups_per_hour": self.wakeups_per_hour(),
+            "pauses": self.paused_count,
+            "paused": self.paused,
+        }
+
+    def print_report(self, force=False):
+        """Print the wakeup statistics if they were asked for."""
+        if force or os.environ.get(REPORT_ENV_VAR):
+            stats = self.stats()
+            print(f"timer: {stats['wakeups']} wakeups, {stats['wakeups_per_hour']:.1f} per hour, "
+                  f"paused {stats['pauses']} times", file=sys.stderr)
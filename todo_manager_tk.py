@@ -1,33 +1,54 @@
-import os
-import json
 from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox
-from settings import get_data_path
+from storage import get_storage, new_id
+from reconcile import diff, record_signature
+from reminder_scheduler import ReminderScheduler
+from due_index import DueIndex
+from record_index import RecordIndex
 
 class TodoManager:
-    def __init__(self):
-        self.todos = self.load_todos()
+    def __init__(self, on_reminders=None):
+        self.storage = get_storage()
         self._tooltip = None  # Initialize tooltip attribute
+        
+        # Todos by id; rows are reconciled by id, so every todo needs a unique one
+        self.todo_index = RecordIndex()
+        if self.todo_index.load(self.load_todos()):
+            self.save_todos()
+        
+        # Rendered rows: id -> frame, plus the order and signatures shown
+        self.todo_rows = {}
+        self.rendered_keys = []
+        self.rendered_signatures = {}
+        
+        # Pending reminders; the timer is armed once there is a widget
+        self.on_reminders = on_reminders  # on_reminders(todos)
+        self.reminders = ReminderScheduler(lookup=self.todo_index.get)
+        self.reminders.load(self.todos)
+        
+        # Reminder times, parsed once
+        self.due_index = DueIndex(self.todos)
+    
+    @property
+    def todos(self):
+        """Get the todos in list order."""
+        return self.todo_index.records
     
     def load_todos(self):
-        """Load todos from the JSON file."""
-        todos_file = get_data_path("todos.json")
-        
-        if os.path.exists(todos_file):
-            try:
-                with open(todos_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return []
-        return []
+        """Load todos from storage."""
+        return self.storage.load_todos()
     
-    def save_todos(self):
-        """Save todos to the JSON file."""
-        todos_file = get_data_path("todos.json")
-        
-        with open(todos_file, 'w') as f:
-            json.dump(self.todos, f, indent=2)
+    def save_todos(self, changed=(), deleted=()):
+        """Save todos to storage.
+        
+        When the changed/deleted todos are given, only those records are
+        written by backends that support it.
+        """
+        if changed or deleted:
+            self.storage.commit_todos(self.todos, changed=changed, deleted=deleted)
+        else:
+            self.storage.save_todos(self.todos)
     
     def create_widget(self, parent):
         """Create and return the todo manager widget."""
@@ -59,6 +80,10 @@ class TodoManager:
         # Add todos
         self.refresh_todos()
         
+        # Fire reminders from the Tk event loop
+        if self.on_reminders:
+            self.reminders.start(self.fire_reminders, frame.after, frame.after_cancel)
+        
         # Input frame
         input_frame = ttk.Frame(frame)
         input_frame.pack(fill=tk.X)
@@ -72,79 +97,152 @@ class TodoManager:
         
         return frame
     
-    def refresh_todos(self):
-        """Refresh the todo list display."""
-        # Clear existing todos
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        # Add todos to the layout
-        for todo in self.todos:
-            self.add_todo_item(todo)
+    def refresh_todos(self, changed=(), added=(), removed=()):
+        """Refresh the todo list display, only touching rows that changed.
+        
+        Callers that know what changed pass the changed, added (appended)
+        and removed todos; otherwise the rendered rows are diffed against
+        the todo list by id.
+        """
+        if changed or added or removed:
+            for todo in removed:
+                self.remove_todo_row(todo["id"])
+            for todo in changed:
+                self.update_todo_row(todo)
+            for todo in added:
+                self.add_todo_item(todo)
+            return
+        
+        new = [(todo["id"], record_signature(todo)) for todo in self.todos]
+        patch = diff(
+            [(key, self.rendered_signatures[key]) for key in self.rendered_keys],
+            new
+        )
+        
+        for key in patch.removed:
+            self.todo_rows.pop(key).destroy()
+        for key in patch.updated:
+            self.update_todo_row(self.todo_index.get(key))
+        
+        # Insert and move rows in order, each after its new predecessor
+        for index, key in sorted(patch.inserted + patch.moved):
+            if index > 0:
+                pack_options = {"after": self.todo_rows[new[index - 1][0]]}
+            else:
+                slaves = self.scrollable_frame.pack_slaves()
+                pack_options = {"before": slaves[0]} if slaves else {}
+            
+            if key in self.todo_rows:
+                self.todo_rows[key].pack(fill=tk.X, pady=2, **pack_options)
+            else:
+                self.add_todo_item(self.todo_index.get(key), **pack_options)
+        
+        self.rendered_keys = [key for key, _ in new]
+        self.rendered_signatures = dict(new)
+    
+    def remove_todo_row(self, key):
+        """Remove the row of a deleted todo."""
+        row = self.todo_rows.pop(key, None)
+        if row is not None:
+            row.destroy()
+            self.rendered_keys.remove(key)
+            del self.rendered_signatures[key]
     
-    def add_todo_item(self, todo):
-        """Add a todo item to the layout."""
+    def update_todo_row(self, todo):
+        """Show a changed todo in its existing row."""
+        row = self.todo_rows.get(todo["id"])
+        if row is None:
+            return
+        self.bind_todo_row(row, todo)
+    
+    def add_todo_item(self, todo, **pack_options):
+        """Add a todo item to the layout (at the end unless placed with pack options)."""
         # Create frame for this todo item
         todo_frame = ttk.Frame(self.scrollable_frame)
-        todo_frame.pack(fill=tk.X, pady=2)
+        todo_frame.pack(fill=tk.X, pady=2, **pack_options)
         
-        # Checkbox
-        completed_var = tk.BooleanVar(value=todo.get("completed", False))
-        checkbox = ttk.Checkbutton(
+        # Track the rendered row
+        if todo["id"] not in self.todo_rows and not pack_options:
+            self.rendered_keys.append(todo["id"])
+        self.todo_rows[todo["id"]] = todo_frame
+        
+        # The row's widgets are kept on its frame so a changed todo can be
+        # shown by reconfiguring them; the commands act on the bound todo
+        todo_frame.completed_var = tk.BooleanVar()
+        todo_frame.checkbox = ttk.Checkbutton(
             todo_frame, 
-            text=todo["text"],
-            variable=completed_var,
-            command=lambda t=todo, v=completed_var: self.toggle_todo_completed(t, v)
+            variable=todo_frame.completed_var,
+            command=lambda: self.toggle_todo_completed(todo_frame.todo, todo_frame.completed_var)
         )
-        checkbox.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Apply strikethrough style if completed
-        if todo.get("completed", False):
-            checkbox.state(["selected"])
-            # Tkinter doesn't support strikethrough directly, we'd need 
-            # additional libraries like customtkinter for that
+        todo_frame.checkbox.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        # Reminder indicator
-        if "reminder" in todo and todo["reminder"]:
-            reminder_time = datetime.fromisoformat(todo["reminder"])
-            now = datetime.now()
-            
-            # Choose color based on due state
-            color = "black"
-            if reminder_time < now:
-                color = "red"  # Overdue
-            elif reminder_time < now + timedelta(hours=24):
-                color = "orange"  # Due soon
-            
-            reminder_label = ttk.Label(todo_frame, text="🔔", foreground=color)
-            reminder_label.pack(side=tk.LEFT, padx=2)
-            
-            # Add tooltip
-            self.create_tooltip(reminder_label, 
-                              f"Reminder: {reminder_time.strftime('%Y-%m-%d %H:%M')}")
+        # Reminder indicator (packed when the todo has a reminder)
+        todo_frame.reminder_label = ttk.Label(todo_frame, text="🔔")
+        self.create_tooltip(todo_frame.reminder_label, "")
         
         # Edit button
-        edit_button = ttk.Button(
+        todo_frame.edit_button = ttk.Button(
             todo_frame, 
             text="✎", 
             width=3,
-            command=lambda t=todo: self.edit_todo(t)
+            command=lambda: self.edit_todo(todo_frame.todo)
         )
-        edit_button.pack(side=tk.LEFT, padx=2)
+        todo_frame.edit_button.pack(side=tk.LEFT, padx=2)
         
         # Delete button
         delete_button = ttk.Button(
             todo_frame, 
             text="×", 
             width=3,
-            command=lambda t=todo: self.delete_todo(t)
+            command=lambda: self.delete_todo(todo_frame.todo)
         )
         delete_button.pack(side=tk.LEFT)
+        
+        self.bind_todo_row(todo_frame, todo)
+        return todo_frame
+    
+    def bind_todo_row(self, todo_frame, todo):
+        """Show a todo in a row, reconfiguring the row's widgets."""
+        todo_frame.todo = todo
+        self.rendered_signatures[todo["id"]] = record_signature(todo)
+        
+        # Checkbox
+        completed = todo.get("completed", False)
+        todo_frame.completed_var.set(completed)
+        todo_frame.checkbox.configure(text=todo["text"])
+        
+        # Apply strikethrough style if completed
+        if completed:
+            todo_frame.checkbox.state(["selected"])
+            # Tkinter doesn't support strikethrough directly, we'd need 
+            # additional libraries like customtkinter for that
+        else:
+            todo_frame.checkbox.state(["!selected"])
+        
+        # Reminder indicator
+        due = self.due_index.due_at(todo)
+        if "reminder" in todo and todo["reminder"] and due is not None:
+            reminder_time = datetime.fromtimestamp(due)
+            now = datetime.now()
+            
+            # Choose color based on due state
+            color = "black"
+            if reminder_time < now:
+                color = "red"  # Overdue
+            elif reminder_time < now + timedelta(hours=24):
+                color = "orange"  # Due soon
+            
+            todo_frame.reminder_label.configure(foreground=color)
+            todo_frame.reminder_label.tooltip_text = f"Reminder: {reminder_time.strftime('%Y-%m-%d %H:%M')}"
+            todo_frame.reminder_label.pack(side=tk.LEFT, padx=2, before=todo_frame.edit_button)
+        else:
+            todo_frame.reminder_label.pack_forget()
     
     def create_tooltip(self, widget, text):
-        """Create a simple tooltip for a widget."""
+        """Create a simple tooltip for a widget; its text can be changed through widget.tooltip_text."""
         # Store tooltip window as attribute of the widget instead of self
         tooltip_window = None
+        widget.tooltip_text = text
         
         def enter(event):
             nonlocal tooltip_window
@@ -156,7 +254,7 @@ class TodoManager:
             tooltip_window.wm_overrideredirect(True)
             tooltip_window.wm_geometry(f"+{x}+{y}")
             
-            label = ttk.Label(tooltip_window, text=text, justify='left',
+            label = ttk.Label(tooltip_window, text=widget.tooltip_text, justify='left',
                             background="#ffffe0", relief='solid', borderwidth=1)
             label.pack(ipadx=1)
             
@@ -179,17 +277,17 @@ class TodoManager:
         text = self.todo_entry.get().strip()
         if text:
             todo = {
-                "id": str(len(self.todos) + 1),  # Simple ID generation
+                "id": new_id(),
                 "text": text,
                 "completed": False,
                 "created": datetime.now().isoformat()
             }
             
-            self.todos.append(todo)
-            self.save_todos()
+            self.todo_index.add(todo)
+            self.save_todos(changed=[todo])
             
             # Add to UI
-            self.add_todo_item(todo)
+            self.refresh_todos(added=[todo])
             
             # Clear input
             self.todo_entry.delete(0, tk.END)
@@ -270,6 +368,7 @@ class TodoManager:
             todo["text"] = new_text
             
             # Update reminder
+            old_reminder = todo.get("reminder")
             if reminder_var.get():
                 try:
                     # Validate date format
@@ -284,9 +383,15 @@ class TodoManager:
                 if "reminder" in todo:
                     del todo["reminder"]
             
+            # A moved reminder fires again
+            if todo.get("reminder") != old_reminder:
+                todo.pop("notified", None)
+            self.reminders.update(todo)
+            self.due_index.update(todo)
+            
             # Save and refresh
-            self.save_todos()
-            self.refresh_todos()
+            self.save_todos(changed=[todo])
+            self.refresh_todos(changed=[todo])
             
             dialog.destroy()
         
@@ -303,32 +408,33 @@ class TodoManager:
         """Delete a todo item."""
         if messagebox.askyesno("Confirm Deletion", 
                               f"Are you sure you want to delete this task?\n\n{todo['text']}"):
-            self.todos.remove(todo)
-            self.save_todos()
-            self.refresh_todos()
+            self.todo_index.remove(todo["id"])
+            self.reminders.remove(todo)
+            self.due_index.remove(todo)
+            self.save_todos(deleted=[todo])
+            self.refresh_todos(removed=[todo])
     
     def toggle_todo_completed(self, todo, var):
         """Toggle the completed state of a todo item."""
         todo["completed"] = var.get()
-        self.save_todos()
-        self.refresh_todos()
+        self.save_todos(changed=[todo])
+        self.refresh_todos(changed=[todo])
     
     def check_due_reminders(self):
-        """Check for reminders that are due and return them."""
-        now = datetime.now()
-        due_reminders = []
-        
-        for todo in self.todos:
-            if "reminder" in todo and todo["reminder"] and not todo.get("notified", False):
-                reminder_time = datetime.fromisoformat(todo["reminder"])
-                
-                # If reminder time is within the last minute and not already notified
-                if reminder_time <= now and reminder_time > now - timedelta(minutes=1):
-                    todo["notified"] = True
-                    due_reminders.append(todo)
+        """Check for reminders that are due and return them.
+        
+        Reminders missed while the app was not running fire late, once.
+        """
+        due_reminders = self.reminders.pop_due()
         
         # Save changes to notified status
         if due_reminders:
-            self.save_todos()
+            self.save_todos(changed=due_reminders)
             
-        return due_reminders
\ No newline at end of file
+        return due_reminders
+    
+    def fire_reminders(self, due_reminders):
+        """Save and report reminders fired by the reminder timer."""
+        self.save_todos(changed=due_reminders)
+        if self.on_reminders:
+            self.on_reminders(due_reminders)
\ No newline at end of file
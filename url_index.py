@@ -0,0 +1,169 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track where a link was clicked
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid", "_ga", "ref_src",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# A scheme at the start of a URL; "://" later on may be part of the query
+SCHEME_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+def is_tracking_param(name):
+    """Check whether a query parameter only tracks the click."""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url):
+    """Get the canonical form of a URL, raising ValueError if it is not a valid web URL.
+
+    Adds http:// when no scheme is given, lowercases the scheme and host,
+    drops default ports, tracking parameters and trailing slashes.
+    """
+    url = url.strip()
+    if not url or any(c.isspace() for c in url):
+        raise ValueError(f"not a URL: {url!r}")
+    if not SCHEME_PATTERN.match(url):
+        url = "http://" + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        raise ValueError(f"unsupported scheme: {parts.scheme}")
+    host = (parts.hostname or "").rstrip(".")
+    if not host:
+        raise ValueError(f"missing host: {url}")
+
+    netloc = host
+    if ":" in host:
+        netloc = f"[{host}]"  # IPv6 literal
+    if parts.port is not None and parts.port != DEFAULT_PORTS[scheme]:
+        netloc += f":{parts.port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{credentials}@{netloc}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = parts.query
+    if query:
+        params = parse_qsl(query, keep_blank_values=True)
+        kept = [(name, value) for name, value in params if not is_tracking_param(name)]
+        if len(kept) != len(params):
+            query = urlencode(kept)
+    return urlunsplit((scheme, netloc, path, query, parts.fragment))
+
+def canonicalize_urls(urls):
+    """Canonicalize the URLs of a group, dropping blanks and repeats.
+
+    Returns (canonical URLs in their original order, invalid entries, repeated entries).
+    """
+    canonical = []
+    seen = set()
+    invalid = []
+    repeated = []
+    for url in urls:
+        if not url.strip():
+            continue
+        try:
+            url = canonicalize_url(url)
+        except ValueError:
+            invalid.append(url.strip())
+            continue
+        if url in seen:
+            repeated.append(url)
+        else:
+            seen.add(url)
+            canonical.append(url)
+    return canonical, invalid, repeated
+
+def canonicalize_groups(url_groups):
+    """Canonicalize the URLs of groups saved before URLs were canonicalized.
+
+    Invalid URLs are kept as they are. Returns the groups that changed.
+    """
+    changed = []
+    for group in url_groups:
+        urls = group.get("urls", [])
+        canonical = []
+        seen = set()
+        for url in urls:
+            try:
+                url = canonicalize_url(url)
+            except ValueError:
+                pass
+            if url not in seen:
+                seen.add(url)
+                canonical.append(url)
+        if canonical != urls:
+            group["urls"] = canonical
+            changed.append(group)
+    return changed
+
+
+class URLIndex:
+    """Maps each canonical URL to the groups that contain it.
+
+    Groups are tracked by id, so finding the groups that contain a URL,
+    or the URLs of a group that are already saved in other groups, takes
+    one dictionary lookup per URL.
+    """
+    def __init__(self, url_groups=()):
+        self._groups = {}  # canonical URL -> set of group keys
+        self._urls = {}  # group key -> URLs of the group
+        self.load(url_groups)
+
+    @staticmethod
+    def group_key(url_group):
+        """Get the key a group is tracked under."""
+        return url_group.get("id") or id(url_group)
+
+    def load(self, url_groups):
+        """Index every group."""
+        self._groups = {}
+        self._urls = {}
+        for group in url_groups:
+            self.update(group)
+
+    def update(self, url_group):
+        """Re-index a group that was added or edited."""
+        self.remove(url_group)
+        key = self.group_key(url_group)
+        urls = list(url_group.get("urls", []))
+        self._urls[key] = urls
+        for url in urls:
+            self._groups.setdefault(url, set()).add(key)
+
+    def remove(self, url_group):
+        """Drop a deleted group."""
+        key = self.group_key(url_group)
+        for url in self._urls.pop(key, ()):
+            keys = self._groups.get(url)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[url]
+
+    def groups_containing(self, url):
+        """Get the keys of the groups that contain a URL."""
+        keys = self._groups.get(url)
+        if keys is None:
+            try:
+                keys = self._groups.get(canonicalize_url(url))
+            except ValueError:
+                keys = None
+        return set(keys) if keys else set()
+
+    def duplicates(self, urls, exclude=None):
+        """Get the URLs that are already saved in other groups, with those groups' keys."""
+        found = {}
+        for url in urls:
+            keys = self._groups.get(url, set()) - {exclude}
+            if keys:
+                found[url] = keys
+        return found
+
+    def __len__(self):
+        return len(self._groups)
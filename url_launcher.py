@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+from collections import deque
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SPACING_MS = 100
+POLL_INTERVAL_MS = 50
+
+# Latencies kept for the percentile stats
+LATENCY_SAMPLES = 1000
+
+def default_opener(url):
+    """Open a URL in the default browser."""
+    import webbrowser
+    if not webbrowser.open(url):
+        raise RuntimeError("no browser could open it")
+
+
+class LaunchJob:
+    """Progress of one batch of URLs handed to the launcher.
+
+    Workers put ("progress", job) and ("done", job) events on `events`,
+    which the UI thread drains with poll().
+    """
+    def __init__(self, name, urls):
+        self.name = name
+        self.urls = urls
+        self.events = queue.Queue()
+        self.opened = 0
+        self.failures = []  # (url, error message)
+        self.latencies_ms = []
+
+    def poll(self):
+        """Get the events posted since the last poll, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    @property
+    def finished(self):
+        return self.opened + len(self.failures)
+
+    @property
+    def done(self):
+        return self.finished >= len(self.urls)
+
+    def summary(self):
+        """Describe the outcome of the batch in one message."""
+        text = f"Opened {self.opened} of {len(self.urls)} URLs"
+        if self.name:
+            text += f" in '{self.name}'"
+        if not self.failures:
+            return text + "."
+        lines = [text + f"; {len(self.failures)} failed:"]
+        lines.extend(f"  {url}: {error}" for url, error in self.failures)
+        return "\n".join(lines)
+
+
+class URLLauncher:
+    """Opens URLs on a small pool of worker threads.
+
+    At most `concurrency` opens run at once and consecutive opens start at
+    least `spacing_ms` apart, so a large group does not flood the browser.
+    Workers never touch the UI; they report progress through the queue of
+    each LaunchJob.
+    """
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, spacing_ms=DEFAULT_SPACING_MS,
+                 opener=default_opener, clock=time.monotonic, sleep=time.sleep):
+        self.concurrency = max(1, int(concurrency))
+        self.spacing_ms = max(0, spacing_ms)
+        self.opener = opener
+        self.clock = clock
+        self.sleep = sleep
+
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._workers = []
+
+        # Counters
+        self.launched = 0
+        self.failed = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+
+    def launch(self, urls, name=None):
+        """Queue a batch of URLs to be opened and return its LaunchJob.
+
+        URLs are opened as given; groups store them canonicalized at save time.
+        """
+        job = LaunchJob(name, list(urls))
+        if not job.urls:
+            job.events.put(("done", job))
+            return job
+        for url in job.urls:
+            self._tasks.put((job, url))
+        self._start_workers(min(self.concurrency, len(job.urls)))
+        return job
+
+    def _start_workers(self, count):
+        with self._lock:
+            while len(self._workers) < count:
+                worker = threading.Thread(target=self._run, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _wait_for_slot(self):
+        """Block until this worker may start the next open."""
+        with self._lock:
+            now = self.clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self.spacing_ms / 1000
+        if start > now:
+            self.sleep(start - now)
+
+    def _run(self):
+        while True:
+            try:
+                job, url = self._tasks.get(timeout=1.0)
+            except queue.Empty:
+                # Idle workers exit; launch() starts new ones
+                with self._lock:
+                    if self._tasks.empty():
+                        self._workers.remove(threading.current_thread())
+                        return
+                continue
+            self._wait_for_slot()
+            began = time.perf_counter()
+            error = None
+            try:
+                self.opener(url)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            elapsed_ms = (time.perf_counter() - began) * 1000
+
+            with self._lock:
+                self.latencies_ms.append(elapsed_ms)
+                self.total_latency_ms += elapsed_ms
+                self.max_latency_ms = max(self.max_latency_ms, elapsed_ms)
+                job.latencies_ms.append(elapsed_ms)
+                if error is None:
+                    self.launched += 1
+                    job.opened += 1
+                else:
+                    self.failed += 1
+                    job.failures.append((url, error))
+                done = job.done
+            job.events.put(("progress", job))
+            if done:
+                job.events.put(("done", job))
+
+    def wait(self, job, timeout=None):
+        """Block until a job is done; for callers without an event loop."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not job.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Get per-URL launch latency statistics."""
+        with self._lock:
+            latencies = sorted(self.latencies_ms)
+            opens = self.launched + self.failed
+            return {
+                "launched": self.launched,
+                "failed": self.failed,
+                "avg_latency_ms": self.total_latency_ms / opens if opens else 0.0,
+                "p95_latency_ms": latencies[int((len(latencies) - 1) * 0.95)] if latencies else 0.0,
+                "max_latency_ms": self.max_latency_ms,
+            }
+
+
+_launcher = None
+
+def get_url_launcher():
+    """Get the launcher shared by the widget, the URL manager and the CLI."""
+    global _launcher
+    if _launcher is None:
+        from settings import load_settings
+        try:
+            settings = load_settings()
+        except Exception as e:
+            print(f"Error loading launcher settings: {e}")
+            settings = {}
+        _launcher = URLLauncher(
+            concurrency=settings.get("launch_concurrency", DEFAULT_CONCURRENCY),
+            spacing_ms=settings.get("launch_spacing_ms", DEFAULT_SPACING_MS),
+        )
+    return _launcher
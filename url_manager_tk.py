@@ -1,33 +1,34 @@
-import os
-import json
-import webbrowser
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from settings import get_data_path
+from storage import get_storage
+from url_launcher import get_url_launcher, POLL_INTERVAL_MS
+from url_index import URLIndex, canonicalize_urls, canonicalize_groups
 
 class URLManager:
     def __init__(self):
+        self.storage = get_storage()
         self.urls = self.load_urls()
+        self.url_index = URLIndex(self.urls)
         self._tooltip = None  # Initialize tooltip attribute
     
     def load_urls(self):
-        """Load URLs from the JSON file."""
-        urls_file = get_data_path("urls.json")
-        
-        if os.path.exists(urls_file):
-            try:
-                with open(urls_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return []
-        return []
+        """Load URL groups from storage, canonicalizing ones saved by older versions."""
+        urls = self.storage.load_urls()
+        changed = canonicalize_groups(urls)
+        if changed:
+            self.storage.commit_urls(urls, changed=changed)
+        return urls
     
-    def save_urls(self):
-        """Save URLs to the JSON file."""
-        urls_file = get_data_path("urls.json")
-        
-        with open(urls_file, 'w') as f:
-            json.dump(self.urls, f, indent=2)
+    def save_urls(self, changed=(), deleted=()):
+        """Save URL groups to storage.
+        
+        When the changed/deleted groups are given, only those records are
+        written by backends that support it.
+        """
+        if changed or deleted:
+            self.storage.commit_urls(self.urls, changed=changed, deleted=deleted)
+        else:
+            self.storage.save_urls(self.urls)
     
     def create_widget(self, parent):
         """Create and return the URL manager widget."""
@@ -123,12 +124,17 @@ class URLManager:
         widget.bind("<Leave>", leave)
     
     def open_urls(self, urls):
-        """Open a list of URLs in the default browser."""
-        for url in urls:
-            try:
-                webbrowser.open(url)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to open URL: {url}\nError: {str(e)}")
+        """Open a list of URLs in the default browser without blocking the UI."""
+        job = get_url_launcher().launch(urls)
+        self.button_frame.after(POLL_INTERVAL_MS, self.poll_launch, job)
+    
+    def poll_launch(self, job):
+        """Wait for a launch to finish, then report all of its failures at once."""
+        if not any(kind == "done" for kind, _ in job.poll()):
+            self.button_frame.after(POLL_INTERVAL_MS, self.poll_launch, job)
+            return
+        if job.failures:
+            messagebox.showerror("Error", job.summary())
     
     def add_url_group(self):
         """Add a new URL group."""
@@ -170,12 +176,16 @@ class URLManager:
         
         def save():
             name = name_var.get().strip()
-            urls = [url.strip() for url in url_text.get("1.0", tk.END).split('\n') if url.strip()]
+            urls, invalid, repeated = canonicalize_urls(url_text.get("1.0", tk.END).split('\n'))
             
             if not name:
                 messagebox.showerror("Error", "Please enter a group name.")
                 return
             
+            if invalid:
+                messagebox.showerror("Error", "These URLs are not valid:\n" + "\n".join(invalid))
+                return
+            
             if not urls:
                 messagebox.showerror("Error", "Please enter at least one URL.")
                 return
@@ -184,17 +194,32 @@ class URLManager:
             url_group = {"name": name, "urls": urls}
             
             if edit_index is not None:
+                # Keep the record id so the stored row is updated in place
+                if self.urls[edit_index].get("id"):
+                    url_group["id"] = self.urls[edit_index]["id"]
+                self.url_index.remove(self.urls[edit_index])
                 self.urls[edit_index] = url_group
             else:
                 self.urls.append(url_group)
             
-            # Save to file
-            self.save_urls()
+            # URLs that other groups already open are saved, but flagged
+            duplicates = self.url_index.duplicates(urls)
+            self.url_index.update(url_group)
+            
+            # Save to storage
+            self.save_urls(changed=[url_group])
             
             # Update UI
             self.refresh_url_buttons()
             
             dialog.destroy()
+            
+            if duplicates or repeated:
+                lines = [f"{url} was listed more than once; it is kept once" for url in repeated]
+                for url, keys in duplicates.items():
+                    names = [group["name"] for group in self.urls if URLIndex.group_key(group) in keys]
+                    lines.append(f"{url} is also in {', '.join(names)}")
+                messagebox.showwarning("Duplicate URLs", "\n".join(lines))
         
         def cancel():
             dialog.destroy()
@@ -259,8 +284,9 @@ class URLManager:
                 name = self.urls[index]["name"]
                 
                 if messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete '{name}'?"):
-                    del self.urls[index]
-                    self.save_urls()
+                    deleted_group = self.urls.pop(index)
+                    self.url_index.remove(deleted_group)
+                    self.save_urls(deleted=[deleted_group])
                     self.url_listbox.delete(index)
                     self.refresh_url_buttons()
         
@@ -0,0 +1,230 @@
+import math
+import tkinter as tk
+from reconcile import record_key, record_signature
+
+class RowPool:
+    """The row bookkeeping of a virtual list, independent of any toolkit.
+
+    A fixed pool of rows is created on demand and rebound to different
+    items as the list scrolls, so refreshing or scrolling costs time in
+    proportion to the viewport, not to the number of items.
+
+    Rows are matched to items by key: a row whose item only moved is just
+    placed at its new position, and it is rebound only when the item's
+    signature changed.
+    """
+    def __init__(self, row_height, create_row, bind_row, place_row, hide_row,
+                 overscan=2, key=record_key, signature=record_signature):
+        self.row_height = row_height  # Height of one row including spacing
+        self.create_row = create_row  # create_row() -> row
+        self.bind_row = bind_row  # bind_row(row, item)
+        self.place_row = place_row  # place_row(row, y)
+        self.hide_row = hide_row  # hide_row(row)
+        self.overscan = overscan
+        self.key = key
+        self.signature = signature
+
+        self.items = []
+        self.offset = 0  # Scroll position in pixels
+        self.viewport_height = 0
+
+        # Pool of rows and the item each one currently shows
+        self.rows = []
+        self.bound_keys = []
+        self.bound_signatures = []
+        self.slot_by_key = {}
+        self.bind_count = 0
+
+    @property
+    def content_height(self):
+        return len(self.items) * self.row_height
+
+    def set_items(self, items):
+        """Show a new (or changed) list of items, rebinding only rows that differ."""
+        self.items = items
+        self.clamp_offset()
+        self.layout()
+
+    def refresh_items(self, items):
+        """Rebind the visible rows showing the given items."""
+        for item in items:
+            slot = self.slot_by_key.get(self.key(item))
+            if slot is not None:
+                self._bind(slot, item)
+
+    def _bind(self, slot, item):
+        key = self.key(item)
+        self.bind_row(self.rows[slot], item)
+        self.bound_keys[slot] = key
+        self.bound_signatures[slot] = self.signature(item)
+        self.slot_by_key[key] = slot
+        self.bind_count += 1
+
+    def clamp_offset(self):
+        max_offset = max(0, self.content_height - self.viewport_height)
+        self.offset = max(0, min(self.offset, max_offset))
+
+    def _ensure_pool(self, count):
+        """Create rows until the pool holds at least count rows."""
+        while len(self.rows) < count:
+            self.rows.append(self.create_row())
+            self.bound_keys.append(None)
+            self.bound_signatures.append(None)
+
+    def layout(self, rebind=False):
+        """Bind and place the rows that intersect the viewport.
+
+        Rows already showing an item are reused for it wherever it moved;
+        they are rebound only if the item changed or rebind is set.
+        """
+        first = max(0, self.offset // self.row_height - self.overscan)
+        visible = math.ceil(self.viewport_height / self.row_height) + 1
+        count = min(visible + 2 * self.overscan, max(0, len(self.items) - first))
+        self._ensure_pool(count)
+
+        visible_items = self.items[first:first + count]
+        visible_keys = {self.key(item) for item in visible_items}
+
+        # Rows whose item scrolled out of view or was removed can be reused
+        free_slots = []
+        for slot, key in enumerate(self.bound_keys):
+            if key not in visible_keys:
+                if key is not None:
+                    del self.slot_by_key[key]
+                free_slots.append(slot)
+
+        for index, item in enumerate(visible_items, start=first):
+            slot = self.slot_by_key.get(self.key(item))
+            if slot is None:
+                slot = free_slots.pop()
+                self._bind(slot, item)
+            elif rebind or self.bound_signatures[slot] != self.signature(item):
+                self._bind(slot, item)
+            self.place_row(self.rows[slot], index * self.row_height - self.offset)
+
+        # Hide rows that are not needed
+        for slot in free_slots:
+            if self.bound_keys[slot] is not None:
+                self.hide_row(self.rows[slot])
+                self.bound_keys[slot] = None
+                self.bound_signatures[slot] = None
+
+    def scroll_to(self, offset):
+        """Scroll to a pixel offset; returns whether the position changed."""
+        old_offset = self.offset
+        self.offset = offset
+        self.clamp_offset()
+        if self.offset == old_offset:
+            return False
+        self.layout()
+        return True
+
+class VirtualList(tk.Frame):
+    """A scrollable list that only builds widgets for the visible rows (see RowPool)."""
+    def __init__(self, parent, theme, row_height, create_row, bind_row,
+                 row_spacing=10, overscan=2, key=record_key,
+                 signature=record_signature, **kwargs):
+        self.theme = theme
+        self.row_height = row_height
+        self.row_spacing = row_spacing
+        self.pool = RowPool(
+            row_height,
+            lambda: self._create_row(create_row),  # create_row(parent) -> widget
+            bind_row,  # bind_row(widget, item)
+            self._place_row,
+            lambda row: row.place_forget(),
+            overscan, key, signature
+        )
+
+        super().__init__(parent, bg=theme.card_bg, **kwargs)
+
+        # Viewport holding the placed rows
+        self.viewport = tk.Frame(self, bg=theme.card_bg)
+        self.viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = tk.Scrollbar(
+            self,
+            orient=tk.VERTICAL,
+            command=self.yview,
+            bg=theme.card_bg,
+            troughcolor=theme.card_bg,
+            activebackground=theme.accent_color,
+            highlightthickness=0,
+            bd=0,
+            width=8
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.viewport.bind("<Configure>", self.on_configure)
+        self._bind_wheel(self.viewport)
+
+    def _bind_wheel(self, widget):
+        """Scroll the list with the mouse wheel over a widget and its children."""
+        widget.bind("<MouseWheel>", self.on_mouse_wheel, add="+")
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-self.row_height // 2), add="+")
+        widget.bind("<Button-5>", lambda e: self.scroll_by(self.row_height // 2), add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _create_row(self, create_row):
+        row = create_row(self.viewport)
+        self._bind_wheel(row)
+        return row
+
+    def _place_row(self, row, y):
+        row.place(x=0, y=y, relwidth=1, height=self.row_height - self.row_spacing)
+
+    @property
+    def items(self):
+        return self.pool.items
+
+    def set_items(self, items):
+        """Show a new (or changed) list of items, rebinding only rows that differ."""
+        self.pool.set_items(items)
+        self._update_scrollbar()
+
+    def refresh_items(self, items):
+        """Rebind the visible rows showing the given items."""
+        self.pool.refresh_items(items)
+
+    def layout(self, rebind=False):
+        """Bind and place the visible rows, rebinding all of them if rebind is set."""
+        self.pool.layout(rebind)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = self.pool.content_height
+        offset = self.pool.offset
+        if total <= self.pool.viewport_height or total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(offset / total, (offset + self.pool.viewport_height) / total)
+
+    def scroll_by(self, pixels):
+        """Scroll the list by a number of pixels."""
+        if self.pool.scroll_to(self.pool.offset + pixels):
+            self._update_scrollbar()
+
+    def yview(self, *args):
+        """Scrollbar protocol ("moveto" / "scroll")."""
+        offset = self.pool.offset
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * self.pool.content_height)
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            step = self.pool.viewport_height if args[2] == "pages" else self.row_height
+            offset += amount * step
+        self.pool.scroll_to(offset)
+        self._update_scrollbar()
+
+    def on_mouse_wheel(self, event):
+        """Handle mouse wheel scrolling (Windows and macOS)."""
+        direction = -1 if event.delta > 0 else 1
+        self.scroll_by(direction * self.row_height // 2)
+
+    def on_configure(self, event):
+        """Relayout when the viewport is resized."""
+        if event.height != self.pool.viewport_height:
+            self.pool.viewport_height = event.height
+            self.pool.clamp_offset()
+            self.layout()
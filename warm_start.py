@@ -0,0 +1,58 @@
+import marshal
+import os
+import tempfile
+from safe_io import match_mode
+from settings import get_data_path
+
+SNAPSHOT_FILE = "startup.snapshot"
+SNAPSHOT_VERSION = 1
+
+# Rows kept per list: enough to fill the first viewport of the expanded view
+SNAPSHOT_ROWS = 8
+
+def snapshot_path():
+    """Get the path of the warm start snapshot."""
+    return get_data_path(SNAPSHOT_FILE)
+
+def save_snapshot(view_model, path=None):
+    """Write the view model the next launch paints before loading any data.
+
+    The snapshot is only a cache, so it is written with marshal (fast, but
+    tied to the Python version) and without an fsync.
+    """
+    path = path or snapshot_path()
+    data = marshal.dumps({"version": SNAPSHOT_VERSION, **view_model})
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=SNAPSHOT_FILE + ".", suffix=".tmp", dir=directory)
+    try:
+        match_mode(fd, path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error saving startup snapshot: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_snapshot(path=None):
+    """Load the view model saved by the last run, or None if there is no usable one."""
+    path = path or snapshot_path()
+    try:
+        with open(path, 'rb') as f:
+            view_model = marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        print(f"Ignoring unreadable startup snapshot: {e}")
+        return None
+    if not isinstance(view_model, dict) or view_model.get("version") != SNAPSHOT_VERSION:
+        return None
+    return view_model
+
+def build_view_model(urls, todos, x, y):
+    """Get the parts of the widget state needed to paint it on the next launch."""
+    return {
+        "position": (x, y),
+        "urls": [dict(group) for group in urls[:SNAPSHOT_ROWS]],
+        "todos": [dict(todo) for todo in todos[:SNAPSHOT_ROWS]],
+    }
@@ -0,0 +1,129 @@
+# Windows closer than this to a screen edge or another window snap to it
+SNAP_DISTANCE = 12
+
+# Pixels of the window that always stay on screen
+MIN_VISIBLE = 40
+
+def snap_axis(start, size, edges, distance=SNAP_DISTANCE):
+    """Shift a span so whichever of its edges is nearest to a guide edge lands on it."""
+    best = None
+    for edge in edges:
+        for offset in (edge - start, edge - (start + size)):
+            if abs(offset) <= distance and (best is None or abs(offset) < abs(best)):
+                best = offset
+    return start + (best or 0)
+
+def snap_position(x, y, size, bounds, targets=(), distance=SNAP_DISTANCE):
+    """Snap a window to the screen edges and other windows, keeping part of it on screen.
+
+    bounds and targets are (x, y, width, height) rectangles. A target only
+    counts on one axis if the window is next to it on the other.
+    """
+    width, height = size
+    left, top, screen_width, screen_height = bounds
+    x_edges = [left, left + screen_width]
+    y_edges = [top, top + screen_height]
+    for tx, ty, tw, th in targets:
+        if ty - distance < y + height and y - distance < ty + th:
+            x_edges += [tx, tx + tw]
+        if tx - distance < x + width and x - distance < tx + tw:
+            y_edges += [ty, ty + th]
+
+    x = snap_axis(x, width, x_edges, distance)
+    y = snap_axis(y, height, y_edges, distance)
+    x = max(min(x, left + screen_width - MIN_VISIBLE), left - width + MIN_VISIBLE)
+    y = max(min(y, top + screen_height - MIN_VISIBLE), top)
+    return x, y
+
+class DragController:
+    """Moves a window with the pointer, at most once per frame.
+
+    Motion events only record the latest pointer position; a frame timer
+    applies it, so a high-rate mouse does not cost a window move per
+    event. Screen bounds are measured once and kept until invalidate()
+    is called, e.g. when the screen configuration changes.
+    """
+    def __init__(self, schedule, move, measure_screen, frame_ms=16, snap_distance=SNAP_DISTANCE):
+        self.schedule = schedule  # schedule(delay_ms, callback), e.g. Tk.after
+        self.move = move  # move(x, y)
+        self.measure_screen = measure_screen  # measure_screen() -> (x, y, width, height)
+        self.frame_ms = frame_ms
+        self.snap_distance = snap_distance
+
+        self.dragging = False
+        self.position = None  # Where the window was last moved to
+        self._start = None
+        self._bounds = None
+        self._targets = ()
+        self._size = (0, 0)
+        self._offset = (0, 0)
+        self._pointer = None
+        self._frame_pending = False
+
+        # Counters
+        self.motion_events = 0
+        self.moves = 0
+        self.screen_measurements = 0
+
+    def invalidate(self):
+        """Measure the screen again before the next drag."""
+        self._bounds = None
+
+    def bounds(self):
+        """Get the cached screen bounds, measuring them if needed."""
+        if self._bounds is None:
+            self._bounds = self.measure_screen()
+            self.screen_measurements += 1
+        return self._bounds
+
+    def begin(self, pointer_x, pointer_y, window_x, window_y, size, targets=()):
+        """Start a drag from the window's current position; targets are rectangles to snap to."""
+        self.bounds()
+        self.dragging = True
+        self.position = self._start = (window_x, window_y)
+        self._size = size
+        self._targets = targets
+        self._offset = (pointer_x - window_x, pointer_y - window_y)
+        self._pointer = None
+
+    def motion(self, pointer_x, pointer_y):
+        """Record a pointer position; the window follows on the next frame."""
+        if not self.dragging:
+            return
+        self.motion_events += 1
+        self._pointer = (pointer_x, pointer_y)
+        if not self._frame_pending:
+            self._frame_pending = True
+            self.schedule(self.frame_ms, self._frame)
+
+    def _frame(self):
+        self._frame_pending = False
+        self._apply()
+
+    def _apply(self):
+        if self._pointer is None:
+            return
+        x = self._pointer[0] - self._offset[0]
+        y = self._pointer[1] - self._offset[1]
+        self._pointer = None
+        position = snap_position(x, y, self._size, self.bounds(), self._targets, self.snap_distance)
+        if position != self.position:
+            self.position = position
+            self.moves += 1
+            self.move(*position)
+
+    def end(self):
+        """Finish the drag; returns the final position, or None if the window did not move."""
+        if not self.dragging:
+            return None
+        self._apply()
+        self.dragging = False
+        self._targets = ()
+        return self.position if self.position != self._start else None
+
+    def stats(self):
+        return {
+            "motion_events": self.motion_events,
+            "moves": self.moves,
+            "screen_measurements": self.screen_measurements,
+        }